@@ -0,0 +1,17 @@
+"""
+基准脚本与 tools/ 下工具脚本的公共引导：插件各模块使用相对导入，需作为包导入。
+将插件目录的上级目录加入 sys.path，再以插件目录名作为包名导入子模块。
+"""
+import importlib
+import os
+import sys
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.basename(PLUGIN_DIR)
+
+if os.path.dirname(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, os.path.dirname(PLUGIN_DIR))
+
+def plugin_module(name: str):
+    """导入插件包中的子模块，例如 plugin_module("events")。"""
+    return importlib.import_module(f"{PACKAGE}.{name}")
@@ -0,0 +1,112 @@
+"""
+astrbot.api.all 的最小替身，仅供基准脚本在没有 AstrBot 的环境中加载 RPGPlugin。
+
+install() 会在 sys.modules 中注册 astrbot、astrbot.api 与 astrbot.api.all，
+必须在导入插件 main 模块之前调用。被 @rpg.command 注册的处理器记录在 COMMANDS 中。
+"""
+import asyncio
+import sys
+import time
+import types
+
+# 命令名 -> 处理器函数（未绑定）
+COMMANDS = {}
+
+class EventMessageType:
+    ALL = "all"
+
+class Star:
+    def __init__(self, context):
+        self.context = context
+
+class _Response:
+    def __init__(self, text: str):
+        self.completion_text = text
+
+class FakeProvider:
+    """模拟 LLM 提供商，按固定延迟返回叙事文本。"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    async def text_chat(self, prompt: str, session_id: str = ""):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return _Response(f"叙事（提示长度 {len(prompt)}）")
+
+class Context:
+    def __init__(self, llm_latency: float = 0.0):
+        self.provider = FakeProvider(llm_latency)
+
+    def get_using_provider(self):
+        return self.provider
+
+class _MessageObject:
+    def __init__(self, raw_message):
+        self.raw_message = raw_message
+
+class AstrMessageEvent:
+    """模拟消息事件：plain_result 直接返回文本，便于收集回复。"""
+
+    def __init__(self, session_id: str, sender_id: str, sender_name: str = None,
+                 message_str: str = "", admin: bool = False):
+        self.session_id = session_id
+        self._sender_id = sender_id
+        self._sender_name = sender_name or sender_id
+        self.message_str = message_str
+        self.message_obj = _MessageObject({"text": message_str})
+        self.timestamp = int(time.time())
+        self._admin = admin
+
+    def get_sender_id(self) -> str:
+        return self._sender_id
+
+    def get_sender_name(self) -> str:
+        return self._sender_name
+
+    def is_admin(self) -> bool:
+        return self._admin
+
+    def plain_result(self, text: str) -> str:
+        return text
+
+class _CommandGroup:
+    def __init__(self, name: str):
+        self.name = name
+
+    def command(self, name: str):
+        def decorator(func):
+            COMMANDS[name] = func
+            return func
+        return decorator
+
+def register(*args, **kwargs):
+    return lambda cls: cls
+
+def command_group(name: str):
+    return lambda func: _CommandGroup(name)
+
+def event_message_type(message_type):
+    return lambda func: func
+
+def install() -> None:
+    """在 sys.modules 中注册替身模块。"""
+    if "astrbot.api.all" in sys.modules:
+        return
+    api_all = types.ModuleType("astrbot.api.all")
+    for name in ("Star", "Context", "AstrMessageEvent", "EventMessageType",
+                 "register", "command_group", "event_message_type"):
+        setattr(api_all, name, globals()[name])
+    api_all.__all__ = ["Star", "Context", "AstrMessageEvent", "EventMessageType",
+                       "register", "command_group", "event_message_type"]
+    astrbot = types.ModuleType("astrbot")
+    api = types.ModuleType("astrbot.api")
+    astrbot.api = api
+    api.all = api_all
+    sys.modules["astrbot"] = astrbot
+    sys.modules["astrbot.api"] = api
+    sys.modules["astrbot.api.all"] = api_all
+
+async def run_command(plugin, name: str, event: AstrMessageEvent, *args) -> list:
+    """调用一个已注册的命令处理器并收集全部回复。"""
+    return [reply async for reply in COMMANDS[name](plugin, event, *args)]
@@ -0,0 +1,122 @@
+"""
+事件循环响应性基准：用 astrbot 替身加载 RPGPlugin，若干“重”会话（高等级角色）并发地连续战斗，
+同时若干“轻”会话不断执行 /rpg character 与 /rpg move，并由一个心跳协程测量事件循环的调度延迟。
+分别在关闭与启用命令执行器（executor.enabled）时运行，对比心跳延迟与轻命令的尾延迟。
+
+用法：
+    python benchmarks/bench_loop_latency.py [--heavy 4] [--light 8] [--battles 30] [--level 100] [--workers 2]
+                                            [--heartbeat-ms 1] [--json result.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import astrbot_stub
+from _bootstrap import plugin_module
+
+from load_test import default_config, percentile
+
+astrbot_stub.install()
+main_module = plugin_module("main")
+
+async def heavy_session(plugin, index: int, battles: int, level: int) -> None:
+    event = astrbot_stub.AstrMessageEvent(f"heavy_{index}", f"hero_{index}")
+    await astrbot_stub.run_command(plugin, "startgame", event)
+    await astrbot_stub.run_command(plugin, "create_character", event)
+    # 直接抬高等级与属性：怪物按角色等级生成，攻击力只比怪物防御上限（等级 × 3）高 1，
+    # 遇到高防御怪物时每回合只造成个位数伤害，一场战斗要打上千回合；防御力使怪物几乎无法造成伤害
+    char = plugin.game_sessions[event.session_id]["characters"][event.get_sender_id()]
+    char.update(level=level, max_hp=level * 1000, hp=level * 1000, defense=level * 7,
+                attack=level * 3 + 1 - char["weapon"]["damage"])
+    for _ in range(battles):
+        await astrbot_stub.run_command(plugin, "battle", event)
+        char["hp"] = char["max_hp"]
+        # 让出事件循环，模拟消息间隔
+        await asyncio.sleep(0)
+
+async def light_session(plugin, index: int, latencies: list, stop: asyncio.Event) -> None:
+    event = astrbot_stub.AstrMessageEvent(f"light_{index}", f"player_{index}")
+    await astrbot_stub.run_command(plugin, "startgame", event)
+    await astrbot_stub.run_command(plugin, "create_character", event)
+    directions = ["north", "east", "south", "west"]
+    step = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        if step % 2:
+            await astrbot_stub.run_command(plugin, "move", event, directions[step // 2 % 4])
+        else:
+            await astrbot_stub.run_command(plugin, "character", event)
+        latencies.append(time.perf_counter() - start)
+        step += 1
+        await asyncio.sleep(0.002)
+
+async def heartbeat(interval: float, lags: list, stop: asyncio.Event) -> None:
+    """每隔 interval 秒醒来一次，记录实际醒来时间超出预期的部分。"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+async def run(args, enabled: bool) -> dict:
+    config = default_config()
+    config["event_log"] = {"enabled": False}
+    config["throttle"] = {"enabled": False}
+    config["executor"] = {"enabled": enabled, "max_workers": args.workers}
+    plugin = main_module.RPGPlugin(astrbot_stub.Context(), config)
+    await plugin.ready.wait()
+    stop = asyncio.Event()
+    lags, latencies = [], []
+    background = [asyncio.create_task(heartbeat(args.heartbeat_ms / 1000, lags, stop))]
+    background += [asyncio.create_task(light_session(plugin, i, latencies, stop)) for i in range(args.light)]
+    start = time.perf_counter()
+    await asyncio.gather(*(heavy_session(plugin, i, args.battles, args.level) for i in range(args.heavy)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*background)
+    await plugin.terminate()
+    result = {"executor": enabled, "elapsed_s": elapsed, "light_commands": len(latencies)}
+    for name, samples in (("heartbeat_lag_ms", lags), ("light_latency_ms", latencies)):
+        ordered = sorted(samples)
+        result[name] = {q: percentile(ordered, p) * 1000 for q, p in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))}
+        result[name]["max"] = ordered[-1] * 1000
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--heavy", type=int, default=4, help="并发连续战斗的会话数")
+    parser.add_argument("--light", type=int, default=8, help="执行轻命令的会话数")
+    parser.add_argument("--battles", type=int, default=30, help="每个重会话的战斗场数")
+    parser.add_argument("--level", type=int, default=100, help="重会话角色等级")
+    parser.add_argument("--workers", type=int, default=2, help="启用执行器时的工作线程数")
+    parser.add_argument("--heartbeat-ms", type=float, default=1.0)
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    json_path = os.path.abspath(args.json) if args.json else None
+    results = []
+    for enabled in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            # 插件的存档写在当前目录，切换到临时目录避免污染工作区
+            os.chdir(tmp)
+            try:
+                results.append(asyncio.run(run(args, enabled)))
+            finally:
+                os.chdir(cwd)
+
+    print(f"{args.heavy} 个重会话 × {args.battles} 场战斗（等级 {args.level}），{args.light} 个轻会话")
+    print("执行器 | 耗时 (s) | 轻命令数 | 心跳延迟 p50 / p95 / p99 / max (ms) | 轻命令延迟 p50 / p95 / p99 / max (ms)")
+    for result in results:
+        lag, light = result["heartbeat_lag_ms"], result["light_latency_ms"]
+        print(f"{'启用' if result['executor'] else '关闭'} | {result['elapsed_s']:.2f} | {result['light_commands']} | "
+              f"{lag['p50']:.2f} / {lag['p95']:.2f} / {lag['p99']:.2f} / {lag['max']:.2f} | "
+              f"{light['p50']:.2f} / {light['p95']:.2f} / {light['p99']:.2f} / {light['max']:.2f}")
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
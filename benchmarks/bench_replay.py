@@ -0,0 +1,88 @@
+"""
+事件重放基准：生成一段随机命令序列写入事件日志，再从快照重建会话并统计每秒重放事件数。
+
+用法：
+    python benchmarks/bench_replay.py [--sessions 20] [--events 500] [--snapshot-interval 100]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from _bootstrap import plugin_module
+
+character = plugin_module("character")
+map_gen = plugin_module("map_gen")
+combat = plugin_module("combat")
+commands = plugin_module("commands")
+events = plugin_module("events")
+rng = plugin_module("rng")
+storage = plugin_module("storage")
+
+def build_event_log(path: str, snapshot_interval: int) -> tuple:
+    config = {"event_log": {"enabled": True, "snapshot_interval": snapshot_interval}}
+    character_manager = character.CharacterManager(config)
+    map_manager = map_gen.MapManager(config)
+    sessions = {}
+    combat_manager = combat.CombatManager(config, sessions, character_manager, map_manager)
+    command_manager = commands.CommandManager(config, character_manager, map_manager, combat_manager)
+    rng_service = rng.RNGService(master_seed=2024)
+    return sessions, events.EventLog(config, command_manager, rng_service, path=path)
+
+def generate(log, sessions: dict, num_sessions: int, num_events: int) -> None:
+    picker = random.Random(7)
+    for i in range(num_sessions):
+        session_id = f"session_{i}"
+        log.dispatch(sessions, session_id, "startgame", "player", "玩家")
+        log.dispatch(sessions, session_id, "create_character", "player", "勇者")
+        for _ in range(num_events - 2):
+            roll = picker.random()
+            if roll < 0.6:
+                log.dispatch(sessions, session_id, "move", "player", picker.choice(map_gen.DIRECTIONS))
+            elif roll < 0.7:
+                log.dispatch(sessions, session_id, "battle", "player", "physical")
+            elif roll < 0.85:
+                log.dispatch(sessions, session_id, "cast", "player", picker.choice(["fire", "ice", "poison"]), 15)
+            else:
+                log.dispatch(sessions, session_id, "narrative", "player", "一段叙事")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--events", type=int, default=500, help="每个会话的事件数")
+    parser.add_argument("--snapshot-interval", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.jsonl")
+        sessions, log = build_event_log(path, args.snapshot_interval)
+        start = time.perf_counter()
+        generate(log, sessions, args.sessions, args.events)
+        record_time = time.perf_counter() - start
+        total_events = args.sessions * args.events
+
+        # 从初始快照完整重放，衡量纯重放吞吐
+        replayed = 0
+        replay_time = 0.0
+        for session_id in sessions:
+            snapshots, session_events = log.read(session_id)
+            start = time.perf_counter()
+            rebuilt = log.replay(snapshots[0][1], session_events, snapshots[0][2])
+            replay_time += time.perf_counter() - start
+            replayed += len(session_events)
+            assert storage.dumps_session(rebuilt) == storage.dumps_session(sessions[session_id]), session_id
+
+        # 从最近快照重建最新状态（含读取日志）
+        start = time.perf_counter()
+        for session_id in sessions:
+            log.rebuild(session_id)
+        rebuild_time = time.perf_counter() - start
+
+        print(f"事件总数: {total_events}，日志大小: {os.path.getsize(path) / 1024:.1f} KiB")
+        print(f"记录吞吐: {total_events / record_time:,.0f} 事件/秒")
+        print(f"完整重放: {replayed / replay_time:,.0f} 事件/秒（重建结果与原始状态一致）")
+        print(f"从最近快照重建 {len(sessions)} 个会话: {rebuild_time * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+插件冷启动基准：
+1. 在全新的解释器中以 python -X importtime 导入插件 main 模块（使用 astrbot 替身），
+   统计插件包的累计导入耗时及自身耗时最高的模块；
+2. 以给定规模的合成存档构造 RPGPlugin，分别测量无事件循环时（同步加载存档）与在事件循环中
+   （后台加载存档）__init__ 的返回耗时，以及后者直到存档就绪的耗时。
+
+用法：
+    python benchmarks/bench_startup.py [--runs 5] [--save-sessions 1000] [--top 10]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import astrbot_stub
+from _bootstrap import PACKAGE, plugin_module
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_SNIPPET = (
+    f"import sys; sys.path.insert(0, {BENCH_DIR!r}); "
+    "import astrbot_stub; astrbot_stub.install(); "
+    f"import _bootstrap, {PACKAGE}.main"
+)
+
+def import_profile() -> dict:
+    """在子进程中导入插件，返回 {模块名: (自身耗时us, 累计耗时us)}。"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET],
+                          capture_output=True, text=True, check=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def bench_imports(runs: int, top: int) -> None:
+    profiles = [import_profile() for _ in range(runs)]
+    # 各次运行取最小值，减少磁盘缓存与调度噪声
+    names = set.intersection(*(set(p) for p in profiles))
+    best = {name: (min(p[name][0] for p in profiles), min(p[name][1] for p in profiles)) for name in names}
+    plugin_modules = {name: times for name, times in best.items() if name.startswith(f"{PACKAGE}.")}
+    plugin_self = sum(self_us for self_us, _ in plugin_modules.values())
+    print(f"插件 main 模块累计导入耗时: {best[f'{PACKAGE}.main'][1] / 1000:.2f} ms"
+          f"（插件模块自身合计 {plugin_self / 1000:.2f} ms，{runs} 次取最小值）")
+    print(f"自身耗时最高的 {top} 个模块（含标准库依赖）:")
+    heaviest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    for name, (self_us, cumulative_us) in heaviest:
+        print(f"  {name:40s} 自身 {self_us / 1000:7.2f} ms  累计 {cumulative_us / 1000:7.2f} ms")
+
+def bench_init(save_sessions: int, main_module) -> None:
+    from microbench import make_state
+    storage = plugin_module("storage")
+    storage.save_game_data(make_state(save_sessions))
+    size_kib = os.path.getsize(storage.DATA_FILE) / 1024
+    config = {"metrics": {"prometheus_file": ""}}
+
+    start = time.perf_counter()
+    plugin = main_module.RPGPlugin(astrbot_stub.Context(), config)
+    sync_ms = (time.perf_counter() - start) * 1000
+    asyncio.run(plugin.terminate())
+
+    async def async_init():
+        start = time.perf_counter()
+        plugin = main_module.RPGPlugin(astrbot_stub.Context(), config)
+        init_ms = (time.perf_counter() - start) * 1000
+        await plugin.ready.wait()
+        ready_ms = (time.perf_counter() - start) * 1000
+        await plugin.terminate()
+        return init_ms, ready_ms, len(plugin.game_sessions)
+
+    init_ms, ready_ms, loaded = asyncio.run(async_init())
+    print(f"存档: {save_sessions} 个会话，{size_kib:,.0f} KiB")
+    print(f"无事件循环（同步加载）: __init__ {sync_ms:.1f} ms")
+    print(f"事件循环中（后台加载）: __init__ {init_ms:.1f} ms，存档就绪 {ready_ms:.1f} ms，已加载 {loaded} 个会话")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="导入耗时的测量次数")
+    parser.add_argument("--save-sessions", type=int, default=1000, help="合成存档的会话数")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    bench_imports(args.runs, args.top)
+    astrbot_stub.install()
+    main_module = plugin_module("main")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            bench_init(args.save_sessions, main_module)
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    main()
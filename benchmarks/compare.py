@@ -0,0 +1,61 @@
+"""
+对比两份 microbench.py 的结果，按中位数耗时变化标记回归。任一基准变慢超过阈值时以退出码 1 结束，
+可直接用于 CI 门禁。
+
+用法：
+    python benchmarks/compare.py baseline.json current.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["benchmarks"]
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Returns:
+        list: [(名称, 基线中位数, 当前中位数, 变化比例, 状态)]，状态为 "回归"、"提升"、"持平"、"新增" 或 "缺失"。
+    """
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        if name not in current:
+            rows.append((name, baseline[name]["median_us"], None, None, "缺失"))
+            continue
+        if name not in baseline:
+            rows.append((name, None, current[name]["median_us"], None, "新增"))
+            continue
+        before = baseline[name]["median_us"]
+        after = current[name]["median_us"]
+        change = (after - before) / before if before else 0.0
+        if change > threshold:
+            status = "回归"
+        elif change < -threshold:
+            status = "提升"
+        else:
+            status = "持平"
+        rows.append((name, before, after, change, status))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="判定回归的相对变慢比例，默认 0.10（10%%）")
+    args = parser.parse_args()
+
+    rows = compare(load(args.baseline), load(args.current), args.threshold)
+    fmt = lambda v: f"{v:12.2f}" if v is not None else f"{'-':>12s}"
+    print(f"{'基准':40s} {'基线(us)':>12s} {'当前(us)':>12s} {'变化':>8s}  状态")
+    for name, before, after, change, status in rows:
+        change_text = f"{change:+8.1%}" if change is not None else f"{'-':>8s}"
+        print(f"{name:40s} {fmt(before)} {fmt(after)} {change_text}  {status}")
+    regressions = [row for row in rows if row[4] == "回归"]
+    if regressions:
+        print(f"\n{len(regressions)} 项基准回归超过 {args.threshold:.0%}。")
+        sys.exit(1)
+    print("\n未发现超过阈值的回归。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+端到端负载测试：用 astrbot 替身加载 RPGPlugin，在同一事件循环上并发驱动大量模拟会话，
+每个会话依次执行 startgame、create_character，再混合执行 move/battle/cast/narrative/character。
+输出吞吐、各命令尾延迟与内存增长，可用 --json 保存结果作为基线对比。
+
+用法：
+    python benchmarks/load_test.py [--sessions 200] [--commands 20] [--concurrency 50]
+                                   [--llm-latency 0.005] [--seed 1] [--json result.json] [--tracemalloc]
+                                   [--storage json|sqlite] [--throttle]
+
+模拟会话的命令间隔远小于默认限流速率，因此默认关闭限流；--throttle 按默认配置启用，结果中记录放行与拒绝次数。
+默认以最大 RSS 的增长衡量内存；--tracemalloc 可得到更精确的 Python 堆增长，但会显著拖慢执行、放大延迟。
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+
+import astrbot_stub
+from _bootstrap import PLUGIN_DIR, plugin_module
+
+astrbot_stub.install()
+main_module = plugin_module("main")
+storage = plugin_module("storage")
+
+# 混合命令的权重
+COMMAND_MIX = [("move", 0.4), ("battle", 0.2), ("cast", 0.2), ("narrative", 0.1), ("character", 0.1)]
+
+def default_config() -> dict:
+    """按 _conf_schema.json 的默认值构造配置（与 AstrBot 首次加载插件时一致）。"""
+    with open(os.path.join(PLUGIN_DIR, "_conf_schema.json"), encoding="utf-8") as f:
+        schema = json.load(f)
+    config = {key: spec.get("default") for key, spec in schema.items()}
+    config["metrics"] = {"prometheus_file": "", "export_interval": 60}
+    return config
+
+def pick_command(rng: random.Random) -> tuple:
+    roll = rng.random()
+    cumulative = 0.0
+    for name, weight in COMMAND_MIX:
+        cumulative += weight
+        if roll < cumulative:
+            break
+    if name == "move":
+        return name, (rng.choice(["north", "south", "east", "west"]),)
+    if name == "cast":
+        return name, (rng.choice(["fire", "ice", "poison"]), 15)
+    if name == "narrative":
+        return name, ("继续冒险",)
+    return name, ()
+
+async def drive_session(plugin, index: int, commands: int, seed: int, latencies: dict, semaphore) -> None:
+    rng = random.Random(seed * 100003 + index)
+    session_id = f"group_{index}"
+    event = astrbot_stub.AstrMessageEvent(session_id, f"user_{index}", f"玩家{index}")
+    plan = [("startgame", ()), ("create_character", ())] + [pick_command(rng) for _ in range(commands)]
+    async with semaphore:
+        for name, args in plan:
+            start = time.perf_counter()
+            await astrbot_stub.run_command(plugin, name, event, *args)
+            latencies.setdefault(name, []).append(time.perf_counter() - start)
+            # 让出事件循环，模拟消息间隔并允许其它会话交错执行
+            await asyncio.sleep(0)
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def run(args) -> dict:
+    config = default_config()
+    config["storage"] = dict(config["storage"], engine=args.storage)
+    config["throttle"] = dict(config["throttle"], enabled=args.throttle)
+    plugin = main_module.RPGPlugin(astrbot_stub.Context(args.llm_latency), config)
+    latencies = {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if args.tracemalloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        drive_session(plugin, i, args.commands, args.seed, latencies, semaphore)
+        for i in range(args.sessions)
+    ))
+    elapsed = time.perf_counter() - start
+    heap_growth, heap_peak = tracemalloc.get_traced_memory() if args.tracemalloc else (None, None)
+    tracemalloc.stop()
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    await plugin.terminate()
+
+    total = sum(len(v) for v in latencies.values())
+    save_file = config["storage"]["sqlite_file"] if args.storage == "sqlite" else storage.DATA_FILE
+    result = {
+        "sessions": args.sessions,
+        "commands": total,
+        "elapsed_s": elapsed,
+        "throughput_cmd_per_s": total / elapsed,
+        "rss_growth_kib": rss_after - rss_before,
+        "max_rss_kib": rss_after,
+        "heap_growth_kib": heap_growth / 1024 if args.tracemalloc else None,
+        "heap_peak_kib": heap_peak / 1024 if args.tracemalloc else None,
+        "storage": args.storage,
+        "save_file_kib": os.path.getsize(save_file) / 1024 if os.path.exists(save_file) else None,
+        "throttle": plugin.throttle.stats() if args.throttle else None,
+        "latency_ms": {}
+    }
+    for name, samples in sorted(latencies.items()):
+        ordered = sorted(samples)
+        result["latency_ms"][name] = {
+            "count": len(ordered),
+            "p50": percentile(ordered, 0.5) * 1000,
+            "p95": percentile(ordered, 0.95) * 1000,
+            "p99": percentile(ordered, 0.99) * 1000,
+            "max": ordered[-1] * 1000
+        }
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--commands", type=int, default=20, help="每个会话在建档之后执行的命令数")
+    parser.add_argument("--concurrency", type=int, default=50, help="同时活跃的会话数")
+    parser.add_argument("--llm-latency", type=float, default=0.005, help="模拟 LLM 响应延迟（秒）")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json", help="存档引擎")
+    parser.add_argument("--throttle", action="store_true", help="按默认配置启用命令限流")
+    parser.add_argument("--tracemalloc", action="store_true", help="用 tracemalloc 统计 Python 堆增长")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    json_path = os.path.abspath(args.json) if args.json else None
+    with tempfile.TemporaryDirectory() as tmp:
+        # 插件的存档与事件日志均写在当前目录，切换到临时目录避免污染工作区
+        os.chdir(tmp)
+        try:
+            result = asyncio.run(run(args))
+        finally:
+            os.chdir(cwd)
+
+    print(f"会话数: {result['sessions']}，命令数: {result['commands']}，耗时: {result['elapsed_s']:.2f} s")
+    print(f"吞吐: {result['throughput_cmd_per_s']:,.0f} 命令/秒")
+    print(f"RSS 增长: {result['rss_growth_kib']:,} KiB，最大 RSS: {result['max_rss_kib']:,} KiB，"
+          f"存档大小: {result['save_file_kib'] or 0:,.0f} KiB")
+    if result["heap_growth_kib"] is not None:
+        print(f"Python 堆增长: {result['heap_growth_kib']:,.0f} KiB，峰值: {result['heap_peak_kib']:,.0f} KiB")
+    if result["throttle"] is not None:
+        print(f"限流：放行 {result['throttle']['admitted']} 次，拒绝 {result['throttle']['rejected']} 次")
+    print("命令 | 次数 | p50 / p95 / p99 / max (ms)")
+    for name, stat in result["latency_ms"].items():
+        print(f"{name} | {stat['count']} | {stat['p50']:.2f} / {stat['p95']:.2f} / {stat['p99']:.2f} / {stat['max']:.2f}")
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
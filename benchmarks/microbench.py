@@ -0,0 +1,249 @@
+"""
+各管理器热点函数的微基准。使用标准库 timeit：每项先自动确定循环次数（单次测量约 0.2 秒），
+再重复测量若干轮，记录每次调用的中位数、最小值与标准差（微秒），结果写入 JSON，
+可用 benchmarks/compare.py 与基线对比。
+
+用法：
+    python benchmarks/microbench.py [--output bench.json] [--repeat 5] [--filter combat]
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+from _bootstrap import plugin_module
+
+character = plugin_module("character")
+combat = plugin_module("combat")
+dice = plugin_module("dice")
+element = plugin_module("element")
+leaderboard = plugin_module("leaderboard")
+loot = plugin_module("loot")
+map_gen = plugin_module("map_gen")
+pathfinding = plugin_module("pathfinding")
+settings = plugin_module("settings")
+skill = plugin_module("skill")
+status = plugin_module("status")
+storage = plugin_module("storage")
+sqlite_storage = plugin_module("sqlite_storage")
+weapon = plugin_module("weapon")
+
+# 配置只编译一次，避免把编译开销计入构造角色等基准
+CONFIG = settings.compile_settings({"exp_growth_factor": 1.2})
+
+def make_character(level: int = 1) -> dict:
+    char = character.CharacterManager(CONFIG).create_character(
+        "基准勇者", 100 * level, 10 * level, 5 * level, 8 * level, 5 * level,
+        {"poison": 0, "fire": 0, "ice": 0}, "neutral")
+    char["level"] = level
+    return char
+
+def make_state(num_sessions: int, rooms_per_session: int = 20) -> dict:
+    """构造一份包含 num_sessions 个会话、每个会话若干房间与一个角色的存档状态。"""
+    rng = random.Random(num_sessions)
+    map_manager = map_gen.MapManager(CONFIG)
+    state = {}
+    for i in range(num_sessions):
+        session = {"players": [f"玩家{i}"], "log": ["游戏开始！"], "characters": {f"user_{i}": make_character()},
+                   "world": {(0, 0): map_manager.generate_room((0, 0), rng=rng)}}
+        for _ in range(rooms_per_session):
+            map_manager.move_character(session, f"user_{i}", rng.choice(map_gen.DIRECTIONS), rng=rng)
+        state[f"group_{i}"] = session
+    return state
+
+def build_benchmarks() -> dict:
+    """返回 {名称: 无参可调用对象}。"""
+    rng = random.Random(42)
+    map_manager = map_gen.MapManager(CONFIG)
+    combat_manager = combat.CombatManager(CONFIG, {}, None, map_manager)
+    loot_manager = loot.LootManager(CONFIG)
+    skill_manager = skill.SkillManager(CONFIG)
+    weapon_manager = weapon.WeaponManager(CONFIG)
+    benchmarks = {}
+
+    benchmarks["map.generate_room"] = lambda: map_manager.generate_room((3, 4), entry_direction="north", rng=rng)
+
+    move_session = {"log": [], "characters": {"p": make_character()},
+                    "world": {(0, 0): map_manager.generate_room((0, 0), rng=rng)}}
+
+    def move():
+        # 在 4x4 范围内随机游走，地图规模保持稳定，测量的是稳态移动成本
+        char = move_session["characters"]["p"]
+        x, y = char["position"]
+        direction = rng.choice(map_gen.DIRECTIONS)
+        if abs(x) > 2 or abs(y) > 2:
+            char["position"] = (0, 0)
+        map_manager.move_character(move_session, "p", direction, rng=rng)
+        del move_session["log"][:]
+    benchmarks["map.move_character"] = move
+
+    # 30x30 全连通的已探索地图：冷启动（每次作废缓存、重建邻接索引并搜索）与缓存命中
+    grid = {(x, y): {"doors": 0b1111} for x in range(30) for y in range(30)}
+    grid_session = {"world": grid, "world_rev": 0}
+    finder = pathfinding.PathFinder()
+
+    def find_path_cold():
+        grid_session["world_rev"] += 1
+        finder.find_path(grid_session, (0, 0), (29, 29))
+    benchmarks["pathfinding.find_path[30x30,cold]"] = find_path_cold
+    benchmarks["pathfinding.find_path[30x30,cached]"] = lambda: finder.find_path(grid_session, (29, 0), (0, 29))
+
+    # 小地图：随机游走出的地图上以缓存图块渲染，以及每次作废中心分块后的渲染
+    map_session = {"log": [], "characters": {"p": {"position": (0, 0)}}}
+    map_manager.start_world(map_session, rng=rng)
+    for _ in range(2000):
+        map_manager.move_character(map_session, "p", rng.choice(map_gen.DIRECTIONS), rng=rng)
+    map_center = map_session["characters"]["p"]["position"]
+    benchmarks["minimap.render[cached]"] = lambda: map_manager.minimap.render(map_session, map_center)
+
+    def render_invalidated():
+        map_manager.minimap.invalidate(map_session, map_center)
+        map_manager.minimap.render(map_session, map_center)
+    benchmarks["minimap.render[1 chunk dirty]"] = render_invalidated
+
+    for level in (1, 10, 50):
+        template = {"characters": {"p": make_character(level)}}
+
+        def battle(template=template):
+            session = copy.deepcopy(template)
+            combat_manager.start_battle(session, "p", rng=rng)
+        benchmarks[f"combat.start_battle[L{level}]"] = battle
+        benchmarks[f"combat._generate_monster[L{level}]"] = lambda level=level: combat_manager._generate_monster(level, rng=rng)
+        benchmarks[f"loot.generate_loot[L{level}]"] = lambda level=level: loot_manager.generate_loot(level, rng=rng)
+    benchmarks["combat.deepcopy_overhead"] = lambda: copy.deepcopy({"characters": {"p": make_character(1)}})
+
+    benchmarks["dice.roll_dice[3d6]"] = lambda: dice.roll_dice(3, 6, rng=rng)
+    benchmarks["dice.skill_check"] = lambda: dice.skill_check(5, 15, rng=rng)
+
+    skill_char = make_character()
+    skill_char["skills"] = {"斩击", "火球术"}
+    target = {"name": "木桩", "hp": 10 ** 9, "physical_defense": 3, "magic_defense": 3}
+    def use_skill():
+        # 每次补满法力，测量的是完整的效果管线而非法力不足的提前返回
+        skill_char["mp"] = 100
+        skill_manager.use_skill(skill_char, "火球术", target, 15, rng=rng)
+    benchmarks["skill.use_skill"] = use_skill
+
+    elements = CONFIG.elements
+    hit_attack = [6, 2, 3]
+    hit_resist = (1, 4, 0)
+    benchmarks["element.damage"] = lambda: elements.damage(hit_attack, hit_resist)
+    batch_rng = random.Random(7)
+    batch_attacks = [[batch_rng.randint(0, 10) for _ in elements.elements] for _ in range(1000)]
+    batch_resists = [[batch_rng.randint(0, 5) for _ in elements.elements] for _ in range(1000)]
+    benchmarks["element.batch_damage[1000]"] = lambda: elements.batch_damage(batch_attacks, batch_resists)
+
+    def status_rounds():
+        # 100 个战斗者各带三种元素状态，推进到全部到期；每回合只处理当回合到期的事件
+        board = status.StatusBoard()
+        log = []
+        for i in range(100):
+            target = {"name": f"怪物{i}", "hp": 10 ** 6, "physical_attack": 20}
+            for element in ("poison", "fire", "ice"):
+                status.apply_element(board, target, element, 3, log)
+        while board:
+            board.advance(log)
+    benchmarks["status.advance[100x3]"] = status_rounds
+
+    def upgrade():
+        weapon_manager.upgrade_weapon({"damage": 10, "level": 1, "upgrade_level": 0}, 3)
+    benchmarks["weapon.upgrade_weapon"] = upgrade
+
+    for size in (10, 100, 1000):
+        state = make_state(size)
+
+        def save(state=state):
+            storage.save_game_data(state)
+        benchmarks[f"storage.save_game_data[{size}]"] = save
+        benchmarks[f"storage.load_game_data[{size}]"] = (
+            lambda state=state: storage.load_game_data(), state)
+
+        # 一条命令之后的保存：只有一个会话的一个字段变化
+        json_engine = storage.JSONStorage(f"persist_{size}.json")
+        sqlite_engine = sqlite_storage.SQLiteStorage(f"persist_{size}.db")
+        for engine in (json_engine, sqlite_engine):
+            engine.save(state)
+        sqlite_engine.flush()
+
+        def persist(engine, state=state):
+            state["group_0"]["characters"]["user_0"]["money"] += 1
+            engine.save(state, "group_0")
+            if isinstance(engine, sqlite_storage.SQLiteStorage):
+                engine.flush()
+        benchmarks[f"storage.persist_one[json,{size}]"] = lambda persist=persist, engine=json_engine: persist(engine)
+        benchmarks[f"storage.persist_one[sqlite,{size}]"] = lambda persist=persist, engine=sqlite_engine: persist(engine)
+
+        # 排行榜：一条命令之后的增量更新与前 10 名查询，对比每次查询全量排序
+        board = leaderboard.LeaderboardManager(CONFIG, state)
+
+        def update(board=board, state=state):
+            state["group_0"]["characters"]["user_0"]["money"] += 1
+            board.update_session("group_0")
+        benchmarks[f"leaderboard.update_session[{size}]"] = update
+        benchmarks[f"leaderboard.top10[{size}]"] = lambda board=board: board.top("money", 10)
+        benchmarks[f"leaderboard.full_scan_top10[{size}]"] = lambda state=state: sorted(
+            (-char["money"], session_id, sender_id) for session_id, session in state.items()
+            for sender_id, char in session["characters"].items())[:10]
+    return benchmarks
+
+def measure(func, repeat: int) -> dict:
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    loops = max(1, loops)
+    runs = [t / loops * 1e6 for t in timer.repeat(repeat=repeat, number=loops)]
+    return {
+        "median_us": statistics.median(runs),
+        "min_us": min(runs),
+        "stdev_us": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+        "loops": loops,
+        "repeat": repeat
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="bench.json", help="结果 JSON 路径")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="只运行名称包含该子串的基准")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # 存档读写基准在临时目录中进行
+        os.chdir(tmp)
+        try:
+            for name, func in build_benchmarks().items():
+                if args.filter not in name:
+                    continue
+                if isinstance(func, tuple):
+                    # 读取基准需要先写出对应规模的存档
+                    func, state = func
+                    storage.save_game_data(state)
+                results[name] = measure(func, args.repeat)
+                print(f"{name:40s} {results[name]['median_us']:12.2f} us  (±{results[name]['stdev_us']:.2f})")
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "benchmarks": results
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,27 @@
 import random
+from .prototype import PROTOTYPES
+from .settings import resolve_settings
+
+def _starter_weapon_prototype() -> tuple:
+    """角色初始武器的原型。"""
+    return "初始剑", "基础伤害 {damage}", None
+
+PROTOTYPES.register_builder("starter_weapon", _starter_weapon_prototype)
 
 class CharacterManager:
-    def __init__(self, config: dict):
+    def __init__(self, config):
         """
         初始化角色管理器
 
         Args:
-            config (dict): 配置字典，包含默认武器伤害、初始技能列表等参数
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），
+                使用其中的默认武器伤害与初始技能
         """
-        self.config = config
+        self.configure(resolve_settings(config))
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.character
 
     def create_character(self,
                          name: str,
@@ -39,6 +52,7 @@ class CharacterManager:
         Returns:
             dict: 角色数据字典，包含以下字段：
                 - name, hp, max_hp
+                - mp, max_mp: 法力值，用于支付技能消耗（初始值取自配置）
                 - attack: 物理攻击
                 - defense: 物理防御
                 - magic_attack: 法术攻击
@@ -48,8 +62,8 @@ class CharacterManager:
                 - attack_type: 攻击类型
                 - level, exp: 等级与经验
                 - position: 当前位置，初始为 (0, 0)
-                - weapon: 初始武器数据（由配置决定，若无则使用默认）
-                - skills: 角色拥有的技能列表（默认取配置中的第一个技能）
+                - weapon: 初始武器实例（紧凑格式，名称与描述由原型注册表渲染）
+                - skills: 角色拥有的技能集合（默认取配置中的第一个技能），存档时写为列表
                 - inventory: 物品库存，初始为空列表
                 - money: 金币数量，初始为 0
         """
@@ -57,22 +71,18 @@ class CharacterManager:
         exp = 0
         position = (0, 0)
         
-        # 初始武器：使用配置中的默认武器伤害，若未配置则默认 5
-        default_weapon_damage = self.config.get("default_weapon_damage", 5)
-        weapon = {
-            "name": "初始剑",
-            "damage": default_weapon_damage,
-            "description": f"基础伤害 {default_weapon_damage}"
-        }
+        # 初始武器：使用配置中的默认武器伤害
+        weapon = PROTOTYPES.create(PROTOTYPES.resolve("starter_weapon"), damage=self.settings.default_weapon_damage)
         
-        # 初始技能：默认使用配置中的第一个技能，如果没有则使用 "斩击"
-        skill_list = self.config.get("skill_list", ["斩击"])
-        skills = [skill_list[0]]
+        # 初始技能：使用配置技能列表中的第一个技能
+        skills = {self.settings.starting_skill}
         
         character = {
             "name": name,
             "hp": hp,
             "max_hp": hp,
+            "mp": self.settings.mp,
+            "max_mp": self.settings.mp,
             "attack": phys_attack,          # 物理攻击
             "defense": phys_defense,        # 物理防御
             "magic_attack": mag_attack,     # 法术攻击
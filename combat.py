@@ -1,104 +1,156 @@
 import random
 from .dice import roll_dice, skill_check
+from .prototype import PROTOTYPES
+from .metrics import timed
+from .settings import resolve_settings
+from .skill_engine import SkillContext
+from .element import elemental_power
+from .status import StatusBoard, apply_element
+from . import loot  # 注册掉落物原型
 
 class CombatManager:
-    def __init__(self, config: dict, game_sessions: dict, character_manager, map_manager):
+    def __init__(self, config, game_sessions: dict, character_manager, map_manager):
         """
         初始化战斗管理器。
 
         Args:
-            config (dict): 配置字典，包含升级曲线、伤害系数等参数。
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），使用其中的升级曲线等参数。
             game_sessions (dict): 当前游戏会话数据。
             character_manager: 角色管理器实例，用于访问角色数据。
             map_manager: 地图管理器实例，用于访问房间等信息。
         """
-        self.config = config
+        self.configure(resolve_settings(config))
         self.game_sessions = game_sessions
         self.character_manager = character_manager
         self.map_manager = map_manager
 
-    def start_battle(self, session: dict, sender_id: str, attack_mode: str = "physical") -> list:
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.combat
+        self.progression = settings.progression
+        self.skills = settings.skill.compiled
+        self.default_mp = settings.character.mp
+        self.elements = settings.elements
+
+    @timed("combat.start_battle")
+    def start_battle(self, session: dict, sender_id: str, attack_mode: str = "physical", rng=None, skill: str = None) -> list:
         """
         开始一场物理战斗（近战或远程），返回战斗过程日志列表。
 
         物理伤害计算公式示例：
-          damage = max(0, (角色物理攻击 + 武器伤害 + 属性加成) - 怪物物理防御 + 随机浮动)
+          damage = max(0, (角色物理攻击 + 武器伤害 + 属性加成) - 怪物物理防御 + 随机浮动) + 元素伤害
+        元素伤害由角色的元素攻击向量（额外属性与武器符文）与怪物抗性向量经元素模型计算，整场战斗只计算一次。
+        指定技能时，每回合只要法力足够且技能不在冷却中，就以该技能编译好的效果管线代替普通攻击；
+        普通攻击命中时，角色的元素额外属性与武器符文按元素对怪物施加状态（中毒、灼烧、减速）。
+        技能与元素附带的持续伤害、增益登记在本场战斗的 StatusBoard 中，每回合末只结算到期的状态，
+        增益与减速在到期或战斗结束时还原。
 
         Args:
             session (dict): 当前游戏会话数据。
             sender_id (str): 玩家ID。
             attack_mode (str): 攻击模式，默认为 "physical"（可扩展为 "ranged"）。
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
+            skill (str, optional): 战斗中使用的技能名称。
 
         Returns:
             list: 战斗过程中的详细日志信息列表。
         """
+        rng = rng or random
         char = session["characters"][sender_id]
+        # 早期创建的角色没有法力字段，首次战斗时按配置补齐
+        char.setdefault("max_mp", self.default_mp)
+        char.setdefault("mp", char["max_mp"])
+        compiled = self.skills.get(skill) if skill else None
+        statuses = StatusBoard()
+        on_hit = elemental_power(char)
+        cooldowns = {}
         # 生成怪物数据（物理和法术属性均包含在内）
-        monster = self._generate_monster(char["level"])
+        monster = self._generate_monster(char["level"], rng=rng)
+        elemental_damage = self.elements.damage(self.elements.vector(on_hit), monster["elemental_resistances"])
         log = []
         log.append(f"战斗开始！你遇到了 Lv{monster['level']} 的 {monster['name']}。")
         round_num = 1
-        while char["hp"] > 0 and monster["hp"] > 0:
-            log.append(f"【回合 {round_num}】")
-            # 计算属性加成（例如角色可能有额外的物理攻击加成，默认值 0）
-            attr_bonus = char.get("physical_bonus", 0)
-            base_damage = char["attack"] + char["weapon"]["damage"] + attr_bonus
-            # 随机波动，模拟战斗中的随机性
-            rand_factor = random.randint(-2, 2)
-            damage = max(0, base_damage - monster.get("physical_defense", 0) + rand_factor)
-            monster["hp"] -= damage
-            log.append(f"你攻击 {monster['name']}，造成 {damage} 点物理伤害。（怪物剩余 HP: {max(monster['hp'], 0)})")
-            if monster["hp"] <= 0:
-                log.append(f"你击败了 {monster['name']}！")
-                gained_exp = monster["level"] * 15
-                char["exp"] += gained_exp
-                log.append(f"获得经验：{gained_exp} 点。")
-                # 升级判定：所需经验 = 100 * (当前等级 ^ exp_growth_factor)
-                exp_growth = self.config.get("exp_growth_factor", 1.2)
-                required_exp = int(100 * (char["level"] ** exp_growth))
-                if char["exp"] >= required_exp:
-                    char["level"] += 1
-                    char["exp"] -= required_exp
-                    char["max_hp"] += 10
-                    char["hp"] += 10
-                    char["attack"] += 2
-                    char["defense"] += 1
-                    log.append(f"恭喜升级！你现在等级 {char['level']}。（升级所需经验：{required_exp}）")
-                # 掉落奖励示例：50%概率获得一件武器
-                if random.random() < 0.5:
-                    loot = {"name": "掉落武器", "damage": random.randint(5, 10), "description": "蕴含神秘力量"}
-                    char["inventory"].append(loot)
-                    log.append(f"战斗奖励：获得武器 {loot['name']}（{loot['description']}）")
-                break
-            # 怪物回击：同样考虑随机波动
-            m_rand = random.randint(-2, 2)
-            m_damage = max(0, monster["physical_attack"] - char["defense"] + m_rand)
-            char["hp"] -= m_damage
-            log.append(f"{monster['name']} 回击你，造成 {m_damage} 点伤害。（你剩余 HP: {max(char['hp'], 0)})")
-            if char["hp"] <= 0:
-                log.append("你被击败了！战斗结束。")
-                break
-            round_num += 1
+        # 技能增益直接修改角色属性，战斗中途出错时也必须在 finally 中还原，否则增益会永久留在角色身上
+        try:
+            while char["hp"] > 0 and monster["hp"] > 0:
+                log.append(f"【回合 {round_num}】")
+                if compiled is not None and compiled.ready(char, cooldowns, round_num):
+                    compiled.apply(SkillContext(char, monster, rng, log, statuses), cooldowns, round_num)
+                    log.append(f"（怪物剩余 HP: {max(monster['hp'], 0)}，你剩余 MP: {char['mp']}）")
+                else:
+                    # 计算属性加成（例如角色可能有额外的物理攻击加成，默认值 0）
+                    attr_bonus = char.get("physical_bonus", 0)
+                    base_damage = char["attack"] + char["weapon"]["damage"] + attr_bonus
+                    # 随机波动，模拟战斗中的随机性
+                    rand_factor = rng.randint(-2, 2)
+                    damage = max(0, base_damage - monster.get("physical_defense", 0) + rand_factor)
+                    monster["hp"] -= damage + elemental_damage
+                    if elemental_damage:
+                        log.append(f"你攻击 {monster['name']}，造成 {damage} 点物理伤害和 {elemental_damage} 点元素伤害。（怪物剩余 HP: {max(monster['hp'], 0)})")
+                    else:
+                        log.append(f"你攻击 {monster['name']}，造成 {damage} 点物理伤害。（怪物剩余 HP: {max(monster['hp'], 0)})")
+                    if damage > 0 and monster["hp"] > 0:
+                        for element, power in on_hit.items():
+                            apply_element(statuses, monster, element, power, log)
+                if monster["hp"] <= 0:
+                    break
+                # 怪物回击：同样考虑随机波动
+                m_rand = rng.randint(-2, 2)
+                m_damage = max(0, monster["physical_attack"] - char["defense"] + m_rand)
+                char["hp"] -= m_damage
+                log.append(f"{monster['name']} 回击你，造成 {m_damage} 点伤害。（你剩余 HP: {max(char['hp'], 0)})")
+                if char["hp"] <= 0:
+                    log.append("你被击败了！战斗结束。")
+                    break
+                # 回合末：结算持续效果并恢复法力
+                if statuses:
+                    statuses.advance(log)
+                char["mp"] = min(char["max_mp"], char["mp"] + self.settings.mp_regen)
+                round_num += 1
+        finally:
+            statuses.clear()
+        if monster["hp"] <= 0 and char["hp"] > 0:
+            log.append(f"你击败了 {monster['name']}！")
+            gained_exp = monster["level"] * 15
+            log.append(f"获得经验：{gained_exp} 点。")
+            # 升级判定：按预先计算的经验曲线结算，一次获得的经验可跨越多级
+            old_level, new_level = self.progression.gain_exp(char, gained_exp)
+            if new_level > old_level:
+                log.append(f"恭喜升级！你从等级 {old_level} 升到等级 {new_level}。"
+                           f"（下一级所需经验：{self.progression.required_exp(new_level)}）")
+            # 掉落奖励示例：50%概率获得一件武器
+            if rng.random() < 0.5:
+                drop = PROTOTYPES.create(PROTOTYPES.resolve("drop_weapon", "mystic"), damage=rng.randint(5, 10))
+                char["inventory"].append(drop)
+                log.append(f"战斗奖励：获得武器 {PROTOTYPES.name(drop)}（{PROTOTYPES.description(drop)}）")
         return log
 
-    def cast_spell(self, session: dict, sender_id: str, element: str, difficulty: int = 15) -> list:
+    @timed("combat.cast_spell")
+    def cast_spell(self, session: dict, sender_id: str, element: str, difficulty: int = 15, rng=None) -> list:
         """
         进行一次法术攻击。使用骰子模块进行技能检定，
         计算法术伤害，考虑角色魔法攻击、人格影响和目标怪物的魔法防御及该元素抗性。
 
         法术伤害计算公式示例：
-          damage = max(0, (角色魔法攻击 + 检定总值) - (怪物魔法防御 + 怪物该元素抗性))
+          damage = max(0, 元素伤害(法术攻击向量, 怪物抗性向量) - 怪物魔法防御)
+        法术攻击向量为角色的元素攻击向量（额外属性与武器符文），其中法术元素的分量再加上 角色魔法攻击 + 检定总值；
+        元素伤害按元素模型的抗性矩阵计算。
+        法术随后对怪物施加该元素的状态，强度为角色该元素的强度（额外属性与武器符文），检定成功时再加上角色等级；
+        持续伤害在法术结算后逐回合结算完毕。
 
         Args:
             session (dict): 当前会话数据。
             sender_id (str): 玩家ID。
-            element (str): 法术元素（例如 fire, ice, poison）。
+            element (str): 法术元素（例如 fire, ice, poison），须为配置的元素之一。
             difficulty (int): 技能检定难度。
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
 
         Returns:
             list: 法术攻击过程日志列表。
         """
         element = element.lower()
+        if element not in self.elements.index:
+            return [f"未知的法术元素 {element}，可用元素：{'、'.join(self.elements.elements)}。"]
         char = session["characters"][sender_id]
         base_modifier = char["magic_attack"]
         # 根据人格调整修正： calm +2, irritable -2, neutral 0
@@ -109,56 +161,66 @@ class CombatManager:
             modifier = base_modifier - 2
         else:
             modifier = base_modifier
-        check = skill_check(modifier, difficulty, dice_sides=20)
+        check = skill_check(modifier, difficulty, dice_sides=20, rng=rng)
         log = []
-        log.append(f"法术检定：骰子 {check['roll']} + 修正 {modifier} = {check['total']}（难度 {difficulty}）")
-        if check["fumble"]:
+        log.append(f"法术检定：骰子 {check.roll} + 修正 {modifier} = {check.total}（难度 {difficulty}）")
+        if check.fumble:
             log.append("致命失败！法术完全失效。")
             return log
-        if not check["success"]:
+        if not check.success:
             log.append("检定失败，法术效果大打折扣。")
             bonus = 0
         else:
-            if check["critical"]:
+            if check.critical:
                 log.append("暴击成功！法术效果大幅提升。")
-                bonus = check["total"] * 2
+                bonus = check.total * 2
             else:
-                bonus = check["total"]
+                bonus = check.total
         # 生成怪物目标数据
-        monster = self._generate_monster(char["level"])
-        monster_mag_def = monster.get("magic_defense", 0)
-        monster_resist = monster.get("elemental_resistances", {}).get(element, 0)
-        damage = max(0, (char["magic_attack"] + bonus) - (monster_mag_def + monster_resist))
+        monster = self._generate_monster(char["level"], rng=rng)
+        power = elemental_power(char)
+        spell = self.elements.vector(power)
+        spell[self.elements.index[element]] += char["magic_attack"] + bonus
+        damage = max(0, self.elements.damage(spell, monster["elemental_resistances"]) - monster.get("magic_defense", 0))
+        monster["hp"] -= damage
         log.append(f"你施放 {element} 法术，对 {monster['name']} 造成 {damage} 点法术伤害。")
-        if damage >= monster["hp"]:
+        if monster["hp"] > 0:
+            power = power.get(element, 0) + (char["level"] if check.success else 0)
+            statuses = StatusBoard()
+            apply_element(statuses, monster, element, power, log)
+            while statuses and monster["hp"] > 0:
+                statuses.advance(log)
+            statuses.clear()
+        if monster["hp"] <= 0:
             log.append(f"你击败了 {monster['name']}！")
         else:
-            log.append(f"{monster['name']} 受到攻击后剩余 HP: {max(monster['hp'] - damage, 0)}。")
+            log.append(f"{monster['name']} 受到攻击后剩余 HP: {monster['hp']}。")
         return log
 
-    def _generate_monster(self, level: int) -> dict:
+    def _generate_monster(self, level: int, rng=None) -> dict:
         """
         生成怪物数据，包含物理和法术属性、以及各元素抗性。
 
+        Args:
+            level (int): 怪物等级。
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
+
         Returns:
             dict: 包含以下字段：
                 - name, level, hp
                 - physical_attack, physical_defense
                 - magic_attack, magic_defense
-                - elemental_resistances: dict，包含 "fire", "ice", "poison"
+                - elemental_resistances: 按元素模型的元素顺序排列的抗性向量（tuple）
         """
+        rng = rng or random
         monster_names = ["哥布林", "骷髅", "恶魔", "巨魔", "吸血鬼"]
-        name = random.choice(monster_names)
-        hp = level * random.randint(20, 30)
-        physical_attack = level * random.randint(3, 7)
-        physical_defense = level * random.randint(1, 3)
-        magic_attack = level * random.randint(1, 5)
-        magic_defense = level * random.randint(1, 5)
-        elemental_resistances = {
-            "fire": random.randint(0, 5),
-            "ice": random.randint(0, 5),
-            "poison": random.randint(0, 5)
-        }
+        name = rng.choice(monster_names)
+        hp = level * rng.randint(20, 30)
+        physical_attack = level * rng.randint(3, 7)
+        physical_defense = level * rng.randint(1, 3)
+        magic_attack = level * rng.randint(1, 5)
+        magic_defense = level * rng.randint(1, 5)
+        elemental_resistances = tuple(rng.randint(0, 5) for _ in self.elements.elements)
         return {
             "name": name,
             "level": level,
@@ -183,10 +245,14 @@ if __name__ == "__main__":
         "defense": 5,
         "magic_attack": 8,
         "magic_defense": 5,
+        "level": 1,
+        "exp": 0,
         "physical_bonus": 3,  # 额外物理攻击加成
+        "extra_attributes": {"poison": 2, "fire": 0, "ice": 1},
         "temperament": "irritable",
-        "skills": ["斩击"],
-        "weapon": {"name": "初始剑", "damage": 5, "description": "伤害 5"},
+        "skills": {"斩击", "火球术"},
+        "weapon": {"name": "初始剑", "damage": 5, "description": "伤害 5",
+                   "extra_effects": [{"name": "火焰符文", "effect": "fire_bonus", "bonus": 4}]},
         "position": (0, 0),
         "inventory": [],
         "money": 0
@@ -197,7 +263,7 @@ if __name__ == "__main__":
         "characters": {"test_id": char},
         "world": {(0, 0): {
             "description": "起始房间",
-            "doors": {"north": True, "south": False, "east": True, "west": False},
+            "doors": 0b0101,  # north | east
             "items": []
         }}
     }
@@ -208,6 +274,10 @@ if __name__ == "__main__":
     battle_log = cm.start_battle(session, "test_id", attack_mode="physical")
     for line in battle_log:
         print(line)
+    print("\n=== 技能战斗测试 ===")
+    char["hp"] = char["max_hp"]
+    for line in cm.start_battle(session, "test_id", skill="火球术"):
+        print(line)
     print("\n=== 法术攻击测试 ===")
     spell_log = cm.cast_spell(session, "test_id", element="fire", difficulty=15)
     for line in spell_log:
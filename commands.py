@@ -0,0 +1,90 @@
+from .executor import cpu_heavy
+from .settings import resolve_settings
+
+class CommandManager:
+    def __init__(self, config, character_manager, map_manager, combat_manager):
+        """
+        初始化命令管理器。
+
+        每个会改变会话状态的 /rpg 命令在这里对应一个确定性的状态转换方法：
+        给定相同的会话状态、参数与随机数流，结果完全一致。RPGPlugin 的命令处理器只负责
+        校验与回复，状态修改统一经由 EventLog 分发到这些方法，从而可以被记录与重放。
+
+        Args:
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），使用其中的角色初始属性。
+            character_manager: 角色管理器实例。
+            map_manager: 地图管理器实例。
+            combat_manager: 战斗管理器实例。
+        """
+        self.configure(resolve_settings(config))
+        self.character_manager = character_manager
+        self.map_manager = map_manager
+        self.combat_manager = combat_manager
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.character
+
+    def startgame(self, session: dict, sender_id: str, rng, sender_name: str) -> str:
+        """初始化新会话：记录玩家、日志并生成起始房间。"""
+        session["players"] = [sender_name]
+        session["log"] = ["游戏开始！"]
+        session["characters"] = {}
+        self.map_manager.start_world(session, rng=rng)
+        return "新游戏会话已启动！欢迎踏入这无限广阔的世界。"
+
+    def create_character(self, session: dict, sender_id: str, rng, name: str) -> dict:
+        """
+        按配置中的基础属性创建角色并加入会话。
+
+        Returns:
+            dict: 新创建的角色数据。
+        """
+        # 从配置中获取基础属性
+        settings = self.settings
+        # 额外属性：毒、火、冰初始抗性或伤害加成，默认设置（后续模块中可扩展升级）
+        extra_attributes = {
+            "poison": settings.poison,
+            "fire": settings.fire,
+            "ice": settings.ice
+        }
+        temperament = rng.choice(["calm", "neutral", "irritable"])
+        # 调用 CharacterManager 接口创建角色（具体实现在 character.py 中）
+        char = self.character_manager.create_character(
+            name=name,
+            hp=settings.hp,
+            phys_attack=settings.attack,
+            phys_defense=settings.defense,
+            mag_attack=settings.magic_attack,
+            mag_defense=settings.magic_defense,
+            extra_attributes=extra_attributes,
+            temperament=temperament,
+            # 默认近战攻击类型，可后续通过装备或指令更改为远程
+            attack_type="melee",
+            # 初始武器、技能等由 character_manager 内部处理
+        )
+        session["characters"][sender_id] = char
+        return char
+
+    def move(self, session: dict, sender_id: str, rng, direction: str) -> str:
+        """移动角色，返回移动结果描述。"""
+        return self.map_manager.move_character(session, sender_id, direction, rng=rng)
+
+    def goto(self, session: dict, sender_id: str, rng, x: int, y: int) -> str:
+        """沿已探索的路线快速旅行到 (x, y)，整段路线作为一个事件记录，返回旅行结果描述。"""
+        return self.map_manager.travel(session, sender_id, (x, y))
+
+    @cpu_heavy
+    def battle(self, session: dict, sender_id: str, rng, attack_mode: str = "physical", skill: str = None) -> list:
+        """进行一场战斗（可指定战斗中使用的技能），返回战斗日志。"""
+        return self.combat_manager.start_battle(session, sender_id, attack_mode=attack_mode, rng=rng, skill=skill)
+
+    @cpu_heavy
+    def cast(self, session: dict, sender_id: str, rng, element: str, difficulty: int) -> list:
+        """施放法术，返回法术日志。"""
+        return self.combat_manager.cast_spell(session, sender_id, element, difficulty, rng=rng)
+
+    def narrative(self, session: dict, sender_id: str, rng, text: str) -> str:
+        """将已生成的叙事文本追加到游戏日志。LLM 输出不可复现，因此事件中记录的是生成结果本身。"""
+        session["log"].append(text)
+        return text
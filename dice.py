@@ -1,20 +1,71 @@
 import random
+import re
+from functools import lru_cache
+from typing import NamedTuple
 
-def roll_dice(num_dice: int, dice_sides: int) -> dict:
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时批量投掷退回纯 Python 实现
+    np = None
+
+# 骰子表达式，例如 "d20"、"3d6"、"4d6kh3+2"、"2d20kl1-1"
+DICE_PATTERN = re.compile(r"^\s*(\d*)d(\d+)(?:k([hl])(\d+))?\s*([+-]\s*\d+)?\s*$", re.IGNORECASE)
+
+class DiceSpec(NamedTuple):
+    """解析后的骰子表达式：count 个 sides 面骰，保留最高/最低 keep 个，再加上 modifier。"""
+    count: int
+    sides: int
+    keep: int
+    keep_highest: bool
+    modifier: int
+
+class RollResult(NamedTuple):
+    """一次骰子表达式投掷的结果：rolls 为全部骰子点数，total 为保留骰子之和加修正值。"""
+    rolls: tuple
+    total: int
+
+class CheckResult(NamedTuple):
+    """
+    一次技能检定的结果记录。
+
+    为兼容旧代码，除属性访问外也支持 check["roll"] 形式的按名取值。
+    """
+    roll: int
+    modifier: int
+    total: int
+    difficulty: int
+    success: bool
+    critical: bool
+    fumble: bool
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+class CheckOdds(NamedTuple):
+    """技能检定的精确概率：成功、暴击与致命失败的概率。"""
+    success: float
+    critical: float
+    fumble: float
+
+def roll_dice(num_dice: int, dice_sides: int, rng=None) -> dict:
     """
     投掷指定数量和面数的骰子。
 
     Args:
         num_dice (int): 投掷骰子的数量。
         dice_sides (int): 骰子的面数。
+        rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
 
     Returns:
         dict: 包含"results"（每个骰子的结果列表）和"total"（所有骰子结果之和）。
     """
-    results = [random.randint(1, dice_sides) for _ in range(num_dice)]
+    randint = (rng or random).randint
+    results = [randint(1, dice_sides) for _ in range(num_dice)]
     return {"results": results, "total": sum(results)}
 
-def skill_check(modifier: int, difficulty: int, dice_sides: int = 20) -> dict:
+def skill_check(modifier: int, difficulty: int, dice_sides: int = 20, rng=None) -> CheckResult:
     """
     进行一次技能检定。使用单个骰子（默认为 d20），将结果加上修正值后与难度比较，
     同时判断是否为暴击（骰子结果等于骰子面数）或致命失败（骰子结果为 1）。
@@ -23,32 +74,176 @@ def skill_check(modifier: int, difficulty: int, dice_sides: int = 20) -> dict:
         modifier (int): 技能修正值（例如角色的属性加成）。
         difficulty (int): 检定难度值。
         dice_sides (int, optional): 骰子面数，默认为20。
+        rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
 
     Returns:
-        dict: 包含以下信息：
-            - "roll": 投掷骰子的结果（单个数值）。
-            - "modifier": 修正值。
-            - "total": 骰子结果与修正值之和。
-            - "difficulty": 检定难度。
-            - "success": 布尔值，表示是否成功（total >= difficulty）。
-            - "critical": 布尔值，表示是否暴击（roll == dice_sides）。
-            - "fumble": 布尔值，表示是否致命失败（roll == 1）。
-    """
-    roll_result = random.randint(1, dice_sides)
+        CheckResult: 紧凑的检定记录，包含以下字段：
+            - roll: 投掷骰子的结果（单个数值）。
+            - modifier: 修正值。
+            - total: 骰子结果与修正值之和。
+            - difficulty: 检定难度。
+            - success: 布尔值，表示是否成功（total >= difficulty）。
+            - critical: 布尔值，表示是否暴击（roll == dice_sides）。
+            - fumble: 布尔值，表示是否致命失败（roll == 1）。
+    """
+    roll_result = (rng or random).randint(1, dice_sides)
     total = roll_result + modifier
-    success = total >= difficulty
-    critical = (roll_result == dice_sides)
-    fumble = (roll_result == 1)
-    return {
-        "roll": roll_result,
-        "modifier": modifier,
-        "total": total,
-        "difficulty": difficulty,
-        "success": success,
-        "critical": critical,
-        "fumble": fumble
-    }
+    return CheckResult(roll_result, modifier, total, difficulty,
+                       total >= difficulty, roll_result == dice_sides, roll_result == 1)
+
+@lru_cache(maxsize=256)
+def parse_dice(notation: str) -> DiceSpec:
+    """
+    解析骰子表达式，例如 "4d6kh3+2" 表示投掷 4 个 d6、保留最高的 3 个再加 2。
+
+    Args:
+        notation (str): 骰子表达式，支持 NdS、khK/klK 保留以及 +M/-M 修正。
+
+    Returns:
+        DiceSpec: 解析结果。
+
+    Raises:
+        ValueError: 表达式格式不合法。
+    """
+    match = DICE_PATTERN.match(notation)
+    if not match:
+        raise ValueError(f"无效的骰子表达式：{notation}")
+    count_str, sides_str, keep_mode, keep_str, modifier_str = match.groups()
+    count = int(count_str) if count_str else 1
+    sides = int(sides_str)
+    if count < 1 or sides < 1:
+        raise ValueError(f"无效的骰子表达式：{notation}")
+    keep = int(keep_str) if keep_str else count
+    if keep < 1 or keep > count:
+        raise ValueError(f"保留数量必须在 1 到 {count} 之间：{notation}")
+    modifier = int(modifier_str.replace(" ", "")) if modifier_str else 0
+    return DiceSpec(count, sides, keep, keep_mode != "l", modifier)
+
+def roll(notation: str, rng=None) -> RollResult:
+    """
+    按骰子表达式投掷一次。
+
+    Args:
+        notation (str): 骰子表达式，例如 "4d6kh3+2"。
+        rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
+
+    Returns:
+        RollResult: 全部骰子点数与最终总值。
+    """
+    spec = parse_dice(notation)
+    randint = (rng or random).randint
+    rolls = tuple(randint(1, spec.sides) for _ in range(spec.count))
+    if spec.keep < spec.count:
+        kept = sorted(rolls, reverse=spec.keep_highest)[:spec.keep]
+    else:
+        kept = rolls
+    return RollResult(rolls, sum(kept) + spec.modifier)
+
+def roll_batch(notation: str, n: int, rng=None):
+    """
+    批量投掷 n 次骰子表达式，仅返回每次的总值，供模拟器与平衡工具使用。
+
+    安装了 NumPy 时一次性生成 (n, count) 的点数矩阵并向量化求和，返回 numpy 数组；
+    否则退回纯 Python 实现并返回列表。
+
+    Args:
+        notation (str): 骰子表达式。
+        n (int): 投掷次数。
+        rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
+
+    Returns:
+        numpy.ndarray | list: 长度为 n 的总值序列。
+    """
+    spec = parse_dice(notation)
+    rng = rng or random
+    if np is not None:
+        rolls = np.random.default_rng(rng.getrandbits(64)).integers(
+            1, spec.sides + 1, size=(n, spec.count))
+        if spec.keep < spec.count:
+            rolls.sort(axis=1)
+            rolls = rolls[:, -spec.keep:] if spec.keep_highest else rolls[:, :spec.keep]
+        return rolls.sum(axis=1) + spec.modifier
+    randint = rng.randint
+    sides, count, keep, modifier = spec.sides, spec.count, spec.keep, spec.modifier
+    if keep == count:
+        return [sum(randint(1, sides) for _ in range(count)) + modifier for _ in range(n)]
+    return [sum(sorted((randint(1, sides) for _ in range(count)), reverse=spec.keep_highest)[:keep]) + modifier
+            for _ in range(n)]
+
+def _convolve(a: list, b: list) -> list:
+    """两个点数分布（下标为点数偏移）的卷积。"""
+    out = [0.0] * (len(a) + len(b) - 1)
+    for i, pa in enumerate(a):
+        if pa:
+            for j, pb in enumerate(b):
+                out[i + j] += pa * pb
+    return out
+
+@lru_cache(maxsize=256)
+def dice_distribution(notation: str) -> dict:
+    """
+    计算骰子表达式总值的精确概率分布（结果已缓存）。
+
+    不保留骰子时通过逐骰卷积计算；带 kh/kl 保留时按“当前保留的骰子多重集”做动态规划，
+    状态数为 C(sides + keep - 1, keep)，对常见的 4d6kh3 之类表达式很小。
+
+    Args:
+        notation (str): 骰子表达式。
+
+    Returns:
+        dict: {总值: 概率}。
+    """
+    spec = parse_dice(notation)
+    p_face = 1.0 / spec.sides
+    if spec.keep == spec.count:
+        single = [p_face] * spec.sides
+        dist = [1.0]
+        for _ in range(spec.count):
+            dist = _convolve(dist, single)
+        # dist[i] 对应总点数 count + i
+        offset = spec.count + spec.modifier
+        return {offset + i: p for i, p in enumerate(dist) if p}
+    states = {(): 1.0}
+    for _ in range(spec.count):
+        next_states = {}
+        for kept, p in states.items():
+            for face in range(1, spec.sides + 1):
+                merged = sorted(kept + (face,), reverse=spec.keep_highest)[:spec.keep]
+                key = tuple(merged)
+                next_states[key] = next_states.get(key, 0.0) + p * p_face
+        states = next_states
+    dist = {}
+    for kept, p in states.items():
+        total = sum(kept) + spec.modifier
+        dist[total] = dist.get(total, 0.0) + p
+    return dict(sorted(dist.items()))
+
+@lru_cache(maxsize=1024)
+def check_odds(modifier: int, difficulty: int, dice_sides: int = 20) -> CheckOdds:
+    """
+    计算一次 skill_check 的精确成功、暴击与致命失败概率（结果已缓存）。
+
+    与 skill_check 的判定一致：成功为 roll + modifier >= difficulty，
+    暴击为 roll == dice_sides，致命失败为 roll == 1。
+
+    Args:
+        modifier (int): 技能修正值。
+        difficulty (int): 检定难度。
+        dice_sides (int, optional): 骰子面数，默认为20。
+
+    Returns:
+        CheckOdds: 各结果的概率。
+    """
+    need = difficulty - modifier
+    successes = dice_sides - max(need, 1) + 1
+    successes = min(max(successes, 0), dice_sides)
+    face = 1.0 / dice_sides
+    return CheckOdds(successes * face, face, face)
 
 if __name__ == "__main__":
     print("投掷 3 个 6 面骰：", roll_dice(3, 6))
     print("技能检定（modifier 3, difficulty 15）：", skill_check(3, 15))
+    print("投掷 4d6kh3+2：", roll("4d6kh3+2"))
+    print("批量投掷 2d6 五次：", list(roll_batch("2d6", 5)))
+    print("4d6kh3 期望：", sum(t * p for t, p in dice_distribution("4d6kh3").items()))
+    print("检定概率（modifier 3, difficulty 15）：", check_odds(3, 15))
@@ -0,0 +1,32 @@
+# 房间的门以 4 位掩码保存：每个方向占一位，有门则该位为 1
+DOOR_BITS = {"north": 1, "south": 2, "east": 4, "west": 8}
+ALL_DOORS = 0b1111
+
+# 方向 -> 反方向对应的位，用于检查相邻房间朝向本房间的门
+OPPOSITE_BITS = {"north": 2, "south": 1, "east": 8, "west": 4}
+
+# 方向 -> 坐标偏移
+OFFSETS = {"north": (0, -1), "south": (0, 1), "east": (1, 0), "west": (-1, 0)}
+
+# 掩码 -> 有门的方向（按 north, south, east, west 顺序），16 种掩码预先展开
+DOOR_DIRECTIONS = tuple(tuple(d for d, bit in DOOR_BITS.items() if mask & bit) for mask in range(ALL_DOORS + 1))
+
+def to_mask(doors) -> int:
+    """将门数据转换为掩码：整数原样返回，旧存档中的 {方向: 布尔值} 字典逐方向换算。"""
+    if isinstance(doors, int):
+        return doors
+    mask = 0
+    for direction, is_open in doors.items():
+        if is_open:
+            mask |= DOOR_BITS[direction]
+    return mask
+
+def has_door(mask: int, direction: str) -> bool:
+    """该方向是否有门。"""
+    return bool(mask & DOOR_BITS[direction])
+
+if __name__ == "__main__":
+    # 简单测试：旧格式转换与方向展开
+    mask = to_mask({"north": True, "south": False, "east": True, "west": False})
+    print("掩码：", bin(mask), "方向：", DOOR_DIRECTIONS[mask])
+    print("可向东：", has_door(mask, "east"), "可向西：", has_door(mask, "west"))
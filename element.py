@@ -0,0 +1,155 @@
+from .prototype import PROTOTYPES
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时批量计算退回纯 Python
+    np = None
+
+# 默认元素顺序，与早期怪物抗性的生成顺序一致
+DEFAULT_ELEMENTS = ("fire", "ice", "poison")
+
+def rune_element(rune) -> str:
+    """符文所属元素：紧凑符文的效果即符文类型，旧格式符文的效果形如 "fire_bonus"。"""
+    return (PROTOTYPES.effect(rune) or "").split("_")[0]
+
+def elemental_power(char: dict) -> dict:
+    """
+    汇总角色的元素强度：额外属性（poison/fire/ice）加上武器所附符文的加成。
+
+    Returns:
+        dict: {元素: 强度}，只包含强度大于 0 的元素。
+    """
+    power = {element: value for element, value in char.get("extra_attributes", {}).items() if value > 0}
+    weapon = char.get("weapon")
+    if isinstance(weapon, dict):
+        for rune in weapon.get("extra_effects", ()):
+            bonus = rune.get("bonus", 0)
+            if bonus > 0:
+                element = rune_element(rune)
+                power[element] = power.get(element, 0) + bonus
+    return power
+
+class ElementModel:
+    """
+    元素伤害模型：攻击向量 × 抗性矩阵。
+
+    攻击与抗性都是按 elements 顺序排列的向量。matrix[i][j] 为抗性 j 抵御元素 i 伤害的权重，
+    默认为单位矩阵（每种抗性只抵御同名元素），可通过配置加入交叉项，例如冰抗性部分抵御火焰。
+    单次命中的元素伤害为 sum(max(0, attack[i] - (matrix · resist)[i]))。
+    矩阵每行只保存非零项，新增元素只需加入配置，调用方不需要为每种元素写分支或查表。
+    """
+    __slots__ = ("elements", "index", "matrix", "rows", "_array")
+
+    def __init__(self, elements: tuple = DEFAULT_ELEMENTS, cross: dict = None):
+        """
+        Args:
+            elements (tuple): 元素名称，顺序即向量分量顺序。
+            cross (dict, optional): 交叉抗性权重 {攻击元素: {抗性元素: 权重}}，覆盖单位矩阵中的对应项。
+        """
+        self.elements = tuple(elements)
+        self.index = {element: i for i, element in enumerate(self.elements)}
+        size = len(self.elements)
+        matrix = [[1.0 if i == j else 0.0 for j in range(size)] for i in range(size)]
+        for attack, row in (cross or {}).items():
+            for resist, weight in row.items():
+                matrix[self.index[attack]][self.index[resist]] = float(weight)
+        self.matrix = tuple(tuple(row) for row in matrix)
+        self.rows = tuple(tuple((j, weight) for j, weight in enumerate(row) if weight) for row in matrix)
+        self._array = np.array(self.matrix, dtype=float) if np is not None else None
+
+    def vector(self, mapping: dict) -> list:
+        """将 {元素: 数值} 转换为按元素顺序排列的向量，缺少的元素为 0。"""
+        return [mapping.get(element, 0) for element in self.elements]
+
+    def attack_vector(self, char: dict) -> list:
+        """角色的元素攻击向量（额外属性与武器符文）。"""
+        return self.vector(elemental_power(char))
+
+    def resistance_vector(self, target: dict):
+        """
+        目标的元素抗性向量。怪物直接以向量保存 elemental_resistances；
+        旧式的 {元素: 抗性} 字典会被转换。
+        """
+        resist = target.get("elemental_resistances")
+        if resist is None:
+            return (0,) * len(self.elements)
+        if isinstance(resist, dict):
+            return self.vector(resist)
+        return resist
+
+    def effective_resistance(self, resist) -> tuple:
+        """抗性向量经矩阵变换后对每种元素的实际抵御值。"""
+        return tuple(sum(weight * resist[j] for j, weight in row) for row in self.rows)
+
+    def resist_against(self, element: str, resist) -> float:
+        """单一元素的实际抵御值；未知元素为 0。"""
+        i = self.index.get(element)
+        if i is None:
+            return 0
+        return sum(weight * resist[j] for j, weight in self.rows[i])
+
+    def damage(self, attack, resist) -> int:
+        """
+        单次命中的元素伤害。
+
+        Args:
+            attack: 元素攻击向量。
+            resist: 目标抗性向量。
+
+        Returns:
+            int: 各元素伤害之和。只有攻击值大于 0 的元素造成伤害，每种元素的伤害不低于 0
+                 （交叉抗性权重为负时，没有攻击的元素也不会因负抵御值产生伤害）。
+        """
+        total = 0
+        for value, row in zip(attack, self.rows):
+            if value > 0:
+                for j, weight in row:
+                    value -= weight * resist[j]
+                if value > 0:
+                    total += value
+        return int(total)
+
+    def batch_damage(self, attacks, resists):
+        """
+        批量计算元素伤害，供平衡性模拟等一次评估大量对局的场景使用。
+
+        Args:
+            attacks: 形状为 (N, 元素数) 的攻击向量序列。
+            resists: 形状为 (N, 元素数) 的抗性向量序列（与 attacks 逐行对应）。
+
+        Returns:
+            NumPy 可用时为 numpy.ndarray (N,)，否则为 list；每项与 damage() 的结果一致。
+        """
+        if self._array is None:
+            return [self.damage(attack, resist) for attack, resist in zip(attacks, resists)]
+        attacks = np.asarray(attacks, dtype=float)
+        resists = np.asarray(resists, dtype=float)
+        effective = resists @ self._array.T
+        # 与 damage() 相同：攻击值不大于 0 的元素不造成伤害
+        per_element = np.where(attacks > 0, np.maximum(attacks - effective, 0), 0)
+        return per_element.sum(axis=1).astype(int)
+
+# 未提供配置时使用的默认模型
+DEFAULT_MODEL = ElementModel()
+
+if __name__ == "__main__":
+    # 简单测试：冰抗性以 0.5 的权重抵御火焰
+    model = ElementModel(("fire", "ice", "poison", "thunder"), cross={"fire": {"ice": 0.5}})
+    char = {"extra_attributes": {"poison": 3, "fire": 0, "ice": 2},
+            "weapon": {"extra_effects": [{"name": "火焰符文", "effect": "fire_bonus", "bonus": 6}]}}
+    attack = model.attack_vector(char)
+    resist = model.resistance_vector({"elemental_resistances": {"fire": 1, "ice": 4, "poison": 0}})
+    print("攻击向量：", attack, "抗性向量：", resist)
+    print("实际抵御：", model.effective_resistance(resist))
+    print("单次伤害：", model.damage(attack, resist))
+    print("批量伤害：", model.batch_damage([attack] * 3, [resist, (0, 0, 0, 0), (9, 9, 9, 9)]))
+
+    # 负交叉权重（火抗性削弱冰）下，NumPy 批量路径与逐次计算的结果必须一致
+    import random
+    rng = random.Random(1)
+    model = ElementModel(("fire", "ice", "poison", "thunder"), cross={"ice": {"fire": -0.5}, "fire": {"ice": 0.5}})
+    attacks = [[rng.choice((0, 0, rng.randint(1, 20))) for _ in range(4)] for _ in range(1000)]
+    resists = [[rng.randint(0, 10) for _ in range(4)] for _ in range(1000)]
+    scalar = [model.damage(attack, resist) for attack, resist in zip(attacks, resists)]
+    assert [int(value) for value in model.batch_damage(attacks, resists)] == scalar
+    print("批量与逐次一致（NumPy %s）" % ("可用" if np is not None else "不可用"))
@@ -0,0 +1,311 @@
+import json
+import os
+import threading
+
+from .logger import get_logger
+from .rng import SessionRNG
+from .settings import resolve_settings
+from .shared_world import SHARED_WORLD, SharedWorld, WorldView, decode_rooms, encode_rooms
+from .storage import dumps_session, json_default, loads_session
+
+# 事件日志文件（JSON Lines，仅追加）
+EVENT_FILE = "game_events.jsonl"
+
+# 会新建会话的命令：分发前先创建空会话并记录初始快照
+SESSION_CREATING_COMMANDS = {"startgame"}
+
+class EventLog:
+    def __init__(self, config, command_manager, rng_service, path: str = EVENT_FILE):
+        """
+        初始化事件日志。
+
+        每条修改会话状态的 /rpg 命令都被记录为一条紧凑事件
+        ["e", 会话ID, 序号, 命令, 发送者ID, 参数列表, 随机数流位置(, 新探索的规范房间)]，
+        并每隔 snapshot_interval 条事件追加一份会话快照 ["s", 会话ID, 序号, 会话JSON, 元数据]。
+        重建时从不晚于目标序号的最近快照出发，依次重放事件即可得到任意时刻的会话状态。
+
+        日志是自包含的重放来源：快照元数据记录配置摘要，共享世界模式的会话还记录世界种子与已探索的规范房间，
+        事件记录该命令新探索的规范房间，重放不读取插件全局的共享世界（其它会话之后生成的相邻房间会影响新房间的门）。
+        文件句柄在首次写入时打开并一直保持；文件超过 max_file_mb 时压缩，
+        每个会话只保留最近一份快照及其后的事件，因此只能重建到最近快照之后的状态。
+
+        Args:
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），读取其中 event_log 分组：
+                - enabled: 是否写入事件日志（默认 False）
+                - snapshot_interval: 快照间隔事件数（默认 100）
+                - max_file_mb: 触发压缩的文件大小（MiB，默认 64，0 表示不限制）
+            command_manager: CommandManager 实例，事件按命令名分发到其同名方法。
+            rng_service: RNGService 实例，为每条命令推进会话随机数流。
+            path (str, optional): 事件日志文件路径。
+        """
+        self.command_manager = command_manager
+        self.rng_service = rng_service
+        self.path = path
+        self.logger = get_logger("events")
+        # 命令可能在执行器的工作线程中分发，追加写入需要互斥，避免不同会话的记录交错
+        self._append_lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self.max_bytes = 0
+        self.configure(resolve_settings(config))
+
+    def configure(self, settings):
+        """
+        应用（热重载）编译后的配置快照：启用状态、快照间隔与压缩阈值立即生效，之后的快照记录新配置的摘要。
+        关闭日志时关闭文件句柄；重新启用后，此前未记录的会话从下一份快照起才能重建。
+        """
+        group = settings.event_log
+        with self._append_lock:
+            self.enabled = group.enabled
+            self.snapshot_interval = group.snapshot_interval
+            max_bytes = group.max_file_mb * 1024 * 1024
+            if max_bytes != self.max_bytes:
+                self.max_bytes = max_bytes
+                # 下一次压缩的文件大小阈值；压缩后仍较大时放宽，避免每次追加都触发压缩
+                self._compact_at = max_bytes
+            if not self.enabled and self._file is not None:
+                self._file.close()
+                self._file = None
+            self.fingerprint = settings.fingerprint
+
+    def _append(self, record: list) -> None:
+        if not self.enabled:
+            return
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=json_default) + "\n"
+        with self._append_lock:
+            if self._file is None:
+                # 行缓冲：每条记录写完即落到文件，read 总能读到最新记录
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._size = self._file.tell()
+            self._file.write(line)
+            self._size += len(line.encode("utf-8"))
+            if self.max_bytes and self._size >= self._compact_at:
+                self._compact()
+
+    def close(self) -> None:
+        """关闭日志文件句柄；之后的写入会重新打开文件。"""
+        with self._append_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def compact(self) -> None:
+        """压缩日志文件：每个会话只保留最近一份快照及其后的事件（没有快照的会话保留全部记录）。"""
+        with self._append_lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        # 调用方持有 _append_lock
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if not os.path.exists(self.path):
+            return
+        # 按行号而非序号定位每个会话最近的快照：会话被删除后重新开始时序号从 0 重新计数
+        latest = {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f):
+                if line.startswith('["s"'):
+                    latest[json.loads(line)[1]] = number
+        tmp_path = self.path + ".tmp"
+        with open(self.path, "r", encoding="utf-8") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+            for number, line in enumerate(src):
+                if line.strip() and number >= latest.get(json.loads(line)[1], 0):
+                    dst.write(line)
+        os.replace(tmp_path, self.path)
+        size = os.path.getsize(self.path)
+        self._compact_at = max(self.max_bytes, size + self.max_bytes // 2)
+        self.logger.info("事件日志已压缩：%.1f MiB", size / 1024 / 1024)
+
+    def _snapshot(self, session_id: str, seq: int, session: dict) -> None:
+        """追加会话快照；元数据记录配置摘要，共享世界模式还记录世界种子与已探索的规范房间。"""
+        meta = {"settings": self.fingerprint}
+        world = session.get("world")
+        if isinstance(world, WorldView):
+            canonical = world.canonical
+            meta["world_seed"] = canonical.seed
+            meta["rooms"] = encode_rooms({coord: canonical.room(coord) for coord in world.explored})
+        self._append(["s", session_id, seq, dumps_session(session), meta])
+
+    def dispatch(self, sessions: dict, session_id: str, command: str, sender_id: str, *args):
+        """
+        推进会话随机数流，执行命令对应的状态转换并记录事件。
+
+        Args:
+            sessions (dict): 全部会话数据；建会话命令会在其中新建会话。
+            session_id (str): 会话ID。
+            command (str): 命令名，对应 CommandManager 的方法名。
+            sender_id (str): 发送者ID。
+            *args: 命令参数，必须可 JSON 序列化。
+
+        Returns:
+            命令方法的返回值。
+        """
+        session = sessions.get(session_id)
+        if session is None and command in SESSION_CREATING_COMMANDS:
+            session = sessions[session_id] = {"event_seq": 0}
+            self.rng_service.drop(session_id)
+            self.rng_service.for_session(session_id, session)
+            self._snapshot(session_id, 0, session)
+        before = session.get("world")
+        explored = set(before.explored) if isinstance(before, WorldView) else set()
+        rng = self.rng_service.begin_command(session_id, session)
+        result = getattr(self.command_manager, command)(session, sender_id, rng, *args)
+        seq = session.get("event_seq", 0) + 1
+        session["event_seq"] = seq
+        record = ["e", session_id, seq, command, sender_id, list(args), rng.counter]
+        world = session.get("world")
+        if isinstance(world, WorldView):
+            # 命令新探索（或新建视图时全部）的坐标，记录其规范房间
+            added = world.explored - explored if world is before else world.explored
+            if added:
+                record.append(encode_rooms({coord: world.canonical.room(coord) for coord in added}))
+        self._append(record)
+        if seq % self.snapshot_interval == 0:
+            self._snapshot(session_id, seq, session)
+        return result
+
+    def read(self, session_id: str) -> tuple:
+        """
+        读取某个会话的全部快照与事件记录。
+
+        Returns:
+            tuple: (snapshots, events)，snapshots 为 [(序号, 会话JSON, 元数据)]，events 为事件记录列表，均按序号排列。
+        """
+        snapshots, events = [], []
+        if not os.path.exists(self.path):
+            return snapshots, events
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record[1] != session_id:
+                    continue
+                if record[0] == "s":
+                    snapshots.append((record[2], record[3], record[4] if len(record) > 4 else {}))
+                else:
+                    events.append(record)
+        snapshots.sort(key=lambda s: s[0])
+        events.sort(key=lambda e: e[2])
+        return snapshots, events
+
+    def _replay_world(self, meta: dict, events: list) -> SharedWorld:
+        """为重放建立私有的规范世界：房间取自快照与事件中的记录，只有缺失的房间才按记录的种子生成。"""
+        world = SharedWorld(SHARED_WORLD.path)
+        world.factory = self.command_manager.map_manager.generate_room
+        if meta.get("world_seed") is not None:
+            world.seed = meta["world_seed"]
+            world.loaded = True
+        # 旧版日志没有记录种子时，缺失的房间回退为读取共享世界文件
+        world.rooms.update(decode_rooms(meta.get("rooms", {})))
+        for record in events:
+            if len(record) > 7:
+                world.rooms.update(decode_rooms(record[7]))
+        return world
+
+    def replay(self, snapshot: str, events: list, meta: dict = None) -> dict:
+        """
+        从快照出发依次重放事件，返回重建后的会话数据。每条事件按记录的随机数流位置重新定位随机数，
+        共享世界模式的会话读取日志中记录的规范房间，因此结果与原始执行完全一致。
+
+        Args:
+            snapshot (str): dumps_session 生成的快照。
+            events (list): 快照之后、按序号排列的事件记录。
+            meta (dict, optional): 快照元数据（见 read）；配置摘要与当前配置不一致时记录警告。
+
+        Returns:
+            dict: 重建的会话数据。
+        """
+        meta = meta or {}
+        if meta.get("settings") not in (None, self.fingerprint):
+            self.logger.warning("快照记录于不同的配置（%s，当前 %s），重放结果可能与原始执行不一致",
+                                meta["settings"], self.fingerprint)
+        session = loads_session(snapshot)
+        canonical = None
+        if isinstance(session.get("world"), WorldView) or any(len(record) > 7 for record in events):
+            canonical = self._replay_world(meta, events)
+            self._bind(session, canonical)
+        seed = session["rng"]["seed"]
+        for record in events:
+            _, session_id, seq, command, sender_id, args, counter = record[:7]
+            rng = SessionRNG(seed, counter)
+            session["rng"] = rng.checkpoint()
+            getattr(self.command_manager, command)(session, sender_id, rng, *args)
+            session["event_seq"] = seq
+            if len(record) > 7:
+                self._bind(session, canonical, record[7])
+        return session
+
+    @staticmethod
+    def _bind(session: dict, canonical: SharedWorld, rooms: dict = None) -> None:
+        """把会话的共享世界视图指向重放用的规范世界；记录时为共享模式而当前配置已关闭时，按记录的房间还原视图。"""
+        world = session.get("world")
+        if isinstance(world, WorldView):
+            world.canonical = canonical
+        elif rooms is not None:
+            session["world"] = WorldView(canonical, decode_rooms(rooms))
+            session["world_mode"] = "shared"
+
+    def rebuild(self, session_id: str, upto: int = None) -> dict:
+        """
+        重建会话在第 upto 条事件之后的状态；upto 为空时重建到最新状态。
+
+        Args:
+            session_id (str): 会话ID。
+            upto (int, optional): 目标事件序号，不能早于日志中保留的最早快照（见压缩）。
+
+        Returns:
+            dict: 重建的会话数据；若没有可用快照则返回 None。
+        """
+        snapshots, events = self.read(session_id)
+        if upto is not None:
+            snapshots = [s for s in snapshots if s[0] <= upto]
+            events = [e for e in events if e[2] <= upto]
+        if not snapshots:
+            return None
+        base_seq, snapshot, meta = snapshots[-1]
+        return self.replay(snapshot, [e for e in events if e[2] > base_seq], meta)
+
+if __name__ == "__main__":
+    # 简单测试：共享世界模式的会话在全局共享世界被替换后仍能从日志重建；压缩后仍能重建最新状态
+    import random
+    import tempfile
+    from .character import CharacterManager
+    from .combat import CombatManager
+    from .commands import CommandManager
+    from .map_gen import MapManager, DIRECTIONS, SHARED_WORLD as PLUGIN_WORLD
+    from .rng import RNGService
+    from .settings import compile_settings
+    from .storage import dumps_session as dump
+    tmp = tempfile.mkdtemp()
+    PLUGIN_WORLD.path = os.path.join(tmp, "shared_world.json")
+    config = {"map": {"shared_world": True}, "event_log": {"enabled": True, "snapshot_interval": 25, "max_file_mb": 0}}
+    map_manager = MapManager(config)
+    sessions = {}
+    character_manager = CharacterManager(config)
+    commands = CommandManager(config, character_manager, map_manager,
+                              CombatManager(config, sessions, character_manager, map_manager))
+    log = EventLog(config, commands, RNGService(master_seed=1), path=os.path.join(tmp, EVENT_FILE))
+    picker = random.Random(3)
+    for session_id in ("a", "b"):
+        log.dispatch(sessions, session_id, "startgame", "player", "玩家")
+        log.dispatch(sessions, session_id, "create_character", "player", "勇者")
+    for _ in range(200):
+        log.dispatch(sessions, picker.choice("ab"), "move", "player", picker.choice(DIRECTIONS))
+    # 模拟共享世界文件丢失：全局共享世界以新种子重新开始
+    PLUGIN_WORLD.__init__(os.path.join(tmp, "other_world.json"))
+    PLUGIN_WORLD.configure(map_manager.generate_room, seed=99)
+    snapshots, events = log.read("a")
+    print("从初始快照重放一致：", dump(log.replay(snapshots[0][1], events, snapshots[0][2])) == dump(sessions["a"]))
+    print("快照元数据：", {key: value for key, value in snapshots[-1][2].items() if key != "rooms"})
+    before = os.path.getsize(log.path)
+    log.compact()
+    print(f"压缩：{before} -> {os.path.getsize(log.path)} 字节，",
+          "重建一致：", all(dump(log.rebuild(sid)) == dump(sessions[sid]) for sid in sessions))
+    # 热重载关闭日志：文件句柄关闭，之后的命令不再写入
+    log.configure(compile_settings(dict(config, event_log={"enabled": False})))
+    size = os.path.getsize(log.path)
+    log.dispatch(sessions, "a", "move", "player", "north")
+    print("关闭后不再写入：", log._file is None and os.path.getsize(log.path) == size)
+    log.close()
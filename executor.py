@@ -0,0 +1,167 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .settings import resolve_settings
+
+# 耗时估计每次更新时的衰减比例：估计取本次耗时与衰减后的旧估计中的较大者，
+# 会话偶尔出现一场长时间战斗后，之后一段时间的命令都会放到工作线程
+COST_DECAY = 0.8
+
+def cpu_heavy(func):
+    """
+    声明 CPU 密集的命令方法（装饰 CommandManager 的状态转换方法）：
+    启用执行器时，这些命令在工作线程中执行，不阻塞事件循环。
+
+    被声明的命令只能修改自己会话的数据，不得生成共享世界房间或访问其它会话，
+    因为同一时刻可能有多个会话的命令在不同线程中执行。
+    """
+    func.cpu_heavy = True
+    return func
+
+def is_cpu_heavy(func) -> bool:
+    """判断命令方法是否被声明为 CPU 密集。"""
+    return getattr(func, "cpu_heavy", False)
+
+class CommandExecutor:
+    def __init__(self, config):
+        """
+        初始化命令执行器。
+
+        声明为 CPU 密集的命令（如战斗、施法）按会话记录实际 CPU 耗时的估计（按比例衰减的峰值）：
+        估计达到阈值的会话（例如高等级角色的长时间战斗）通过 run_in_executor 放到有界线程池中执行，
+        事件循环在此期间继续处理其它会话的消息；耗时很短的命令仍直接执行，
+        避免在繁忙的事件循环中让出后重新排队。调用方在等待期间一直持有会话锁，
+        因此同一会话的命令仍然严格按顺序执行。存档文本在事件循环中编码，
+        写文件交给单独的写入线程，积压时只写最新的版本。
+
+        纯 Python 的计算不会因线程而并行，但解释器每隔几毫秒切换一次线程，
+        事件循环的最长停顿从整场战斗的耗时降到几个切换间隔；同时运行的工作线程越多，
+        事件循环分到的时间片越少，因此线程数保持较小。
+
+        线程池在插件启动时按配置创建，executor 分组的修改需重启插件后生效。
+
+        Args:
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），读取其中 executor 分组：
+                - enabled: 是否启用工作线程（默认 True，关闭时所有命令在事件循环中直接执行）
+                - max_workers: 工作线程数上限（默认 2）
+                - offload_threshold_ms: 放到工作线程的估计耗时阈值（默认 5 毫秒，0 表示总是放到工作线程）
+        """
+        settings = resolve_settings(config).executor
+        self.enabled = settings.enabled
+        self.max_workers = settings.max_workers
+        self.threshold = settings.offload_threshold_ms / 1000
+        # 会话ID -> CPU 密集命令的估计耗时（秒）
+        self.costs = {}
+        # 正在工作线程中执行命令的会话ID
+        self.running = set()
+        self.offloaded = 0
+        self._pool = None
+        self._writer = None
+        self._write_lock = threading.Lock()
+        # 写入函数 -> 尚未开始的最新负载；不同的写入目标（存档、共享世界）互不覆盖
+        self._pending_writes = {}
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rpg-command")
+        return self._pool
+
+    async def run(self, session_id: str, heavy: bool, func, *args):
+        """
+        执行一条命令：heavy 为真、启用了执行器且会话的估计耗时达到阈值时在工作线程中执行，否则直接调用。
+
+        Args:
+            session_id (str): 会话ID，执行期间记录在 running 中。
+            heavy (bool): 命令是否为 CPU 密集。
+            func: 要执行的同步函数。
+            *args: 函数参数。
+
+        Returns:
+            函数的返回值。
+        """
+        if not (heavy and self.enabled):
+            return func(*args)
+        if self.costs.get(session_id, 0.0) < self.threshold:
+            return self._measure(session_id, func, args)
+        loop = asyncio.get_running_loop()
+        self.running.add(session_id)
+        self.offloaded += 1
+        try:
+            return await loop.run_in_executor(self.pool, functools.partial(self._measure, session_id, func, args))
+        finally:
+            self.running.discard(session_id)
+
+    def _measure(self, session_id: str, func, args: tuple):
+        # 以线程 CPU 时间计量，不计入工作线程等待 GIL 的时间
+        start = time.thread_time()
+        try:
+            return func(*args)
+        finally:
+            cost = time.thread_time() - start
+            self.costs[session_id] = max(cost, self.costs.get(session_id, 0.0) * COST_DECAY)
+
+    def submit_write(self, write, payload) -> None:
+        """
+        在写入线程中执行 write(payload)。同一写入函数尚未开始的旧写入被新的覆盖，不同写入函数各自保留最新的一次。
+        未启用执行器时直接写入。
+        """
+        if not self.enabled:
+            write(payload)
+            return
+        with self._write_lock:
+            idle = not self._pending_writes
+            self._pending_writes[write] = payload
+        if idle:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rpg-writer")
+            self._writer.submit(self._flush)
+
+    def _flush(self) -> None:
+        with self._write_lock:
+            pending = self._pending_writes
+            self._pending_writes = {}
+        for write, payload in pending.items():
+            write(payload)
+
+    def shutdown(self) -> None:
+        """等待已提交的命令与写入完成并关闭线程池。"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+
+if __name__ == "__main__":
+    # 简单测试：CPU 密集的命令在工作线程中执行时，事件循环的心跳间隔保持平稳
+    import time
+
+    @cpu_heavy
+    def busy(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+        return threading.current_thread().name
+
+    async def demo():
+        executor = CommandExecutor({"executor": {"offload_threshold_ms": 0}})
+        gaps = []
+
+        async def heartbeat():
+            last = time.perf_counter()
+            for _ in range(50):
+                await asyncio.sleep(0.002)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        names = await asyncio.gather(heartbeat(), *(executor.run(f"s{i}", is_cpu_heavy(busy), busy, 0.05) for i in range(3)))
+        print("执行线程：", names[1:])
+        print(f"心跳最大间隔：{max(gaps) * 1000:.1f} ms")
+        executor.shutdown()
+
+    asyncio.run(demo())
@@ -1,24 +1,45 @@
 import random
+from .prototype import PROTOTYPES
+from .settings import resolve_settings
+
+# 各类物品的 (名称模板, 描述模板, 效果)，名称与描述均以实例的 value 渲染
+ITEM_TEMPLATES = {
+    "potion": ("药水 (+{value} HP)", "恢复 {value} 点 HP", "heal"),
+    "scroll": ("卷轴 ({value})", "学习技能 {value}", "skill"),
+    "treasure": ("宝箱 (价值 {value})", "价值 {value}", "loot"),
+    "gold": ("{value} 金币", "{value} 金币", "money"),
+    "misc": ("神秘物品 (+{value})", "神秘物品", None),
+}
+
+def _item_prototype(item_type: str) -> tuple:
+    """通用物品原型，未知类型按杂项处理。"""
+    return ITEM_TEMPLATES.get(item_type, ITEM_TEMPLATES["misc"])
+
+PROTOTYPES.register_builder("item", _item_prototype)
 
 class ItemManager:
-    def __init__(self, config: dict):
+    def __init__(self, config):
         """
         初始化物品管理器。
 
         Args:
-            config (dict): 配置字典，包含生成物品相关参数，例如：
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），使用其中的物品分组：
                 - "potion_range": [min, max]，药水回复值范围
                 - "gold_range": [min, max]，金币生成数量范围
                 - "skill_list": 可生成卷轴的技能列表
                 - "item_types": 可生成的物品类型列表，例如 ["potion", "scroll", "treasure", "gold", "misc"]
         """
-        self.config = config
-        self.potion_range = config.get("potion_range", [10, 50])
-        self.gold_range = config.get("gold_range", [5, 20])
-        self.skill_list = config.get("skill_list", ["斩击", "火球术", "穿刺"])
-        self.item_types = config.get("item_types", ["potion", "scroll", "treasure", "gold", "misc"])
+        self.configure(resolve_settings(config))
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.item
+        self.potion_range = self.settings.potion_range
+        self.gold_range = self.settings.gold_range
+        self.skill_list = self.settings.skill_list
+        self.item_types = self.settings.item_types
 
-    def generate_item(self, item_type: str = None) -> dict:
+    def generate_item(self, item_type: str = None, rng=None) -> dict:
         """
         随机生成一个物品数据字典。
 
@@ -30,31 +51,28 @@ class ItemManager:
                 - "gold": 金币，效果为增加金钱
                 - "misc": 其他杂项
               若未指定，则随机选择。
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
 
         Returns:
-            dict: 物品数据字典，包含以下字段：
-                - "type": 物品类型
-                - "name": 物品名称
-                - "effect": 物品效果（例如 "heal", "skill", "loot", "money"）
+            dict: 紧凑的物品实例，名称与效果由原型注册表（ITEM_TEMPLATES）惰性渲染，包含以下字段：
+                - "proto": 原型ID，对应物品类型
                 - "value": 数值，视具体效果而定（例如恢复的HP、金币数量、奖励数值）
         """
+        rng = rng or random
         if not item_type:
-            item_type = random.choice(self.item_types)
+            item_type = rng.choice(self.item_types)
         if item_type == "potion":
-            heal_value = random.randint(self.potion_range[0], self.potion_range[1])
-            return {"type": "potion", "name": f"药水 (+{heal_value} HP)", "effect": "heal", "value": heal_value}
+            value = rng.randint(self.potion_range[0], self.potion_range[1])
         elif item_type == "scroll":
-            skill = random.choice(self.skill_list)
-            return {"type": "scroll", "name": f"卷轴 ({skill})", "effect": "skill", "value": skill}
+            value = rng.choice(self.skill_list)
         elif item_type == "treasure":
-            bonus = random.randint(1, 10)
-            return {"type": "treasure", "name": f"宝箱 (价值 {bonus})", "effect": "loot", "value": bonus}
+            value = rng.randint(1, 10)
         elif item_type == "gold":
-            amount = random.randint(self.gold_range[0], self.gold_range[1])
-            return {"type": "gold", "name": f"{amount} 金币", "effect": "money", "value": amount}
+            value = rng.randint(self.gold_range[0], self.gold_range[1])
         else:
-            bonus = random.randint(1, 5)
-            return {"type": "misc", "name": f"神秘物品 (+{bonus})", "effect": None, "value": bonus}
+            item_type = "misc"
+            value = rng.randint(1, 5)
+        return PROTOTYPES.create(PROTOTYPES.resolve("item", item_type), value=value)
 
     def use_item(self, character: dict, item: dict) -> str:
         """
@@ -67,20 +85,22 @@ class ItemManager:
         Returns:
             str: 使用结果描述信息。
         """
-        if item["effect"] == "heal":
+        effect = PROTOTYPES.effect(item)
+        name = PROTOTYPES.name(item)
+        if effect == "heal":
             old_hp = character["hp"]
             character["hp"] = min(character["hp"] + item["value"], character["max_hp"])
-            return f"你使用了 {item['name']}，HP 从 {old_hp} 恢复到 {character['hp']}。"
-        elif item["effect"] == "money":
+            return f"你使用了 {name}，HP 从 {old_hp} 恢复到 {character['hp']}。"
+        elif effect == "money":
             character["money"] += item["value"]
             return f"你获得了 {item['value']} 金币。"
-        elif item["effect"] == "skill":
+        elif effect == "skill":
             # 卷轴学习技能由技能模块进一步处理，这里只返回提示信息
-            return f"你使用了 {item['name']}，可通过 /rpg learn_skill 命令学习技能 {item['value']}。"
-        elif item["effect"] == "loot":
-            return f"你打开了 {item['name']}，发现了一些宝物！"
+            return f"你使用了 {name}，可通过 /rpg learn_skill 命令学习技能 {item['value']}。"
+        elif effect == "loot":
+            return f"你打开了 {name}，发现了一些宝物！"
         else:
-            return f"你使用了 {item['name']}，但似乎没有产生任何效果。"
+            return f"你使用了 {name}，但似乎没有产生任何效果。"
 
     def describe_item(self, item: dict) -> str:
         """
@@ -92,9 +112,10 @@ class ItemManager:
         Returns:
             str: 描述字符串。
         """
-        desc = f"{item['name']}"
-        if item.get("effect"):
-            desc += f" (效果: {item['effect']}, 数值: {item['value']})"
+        desc = PROTOTYPES.name(item)
+        effect = PROTOTYPES.effect(item)
+        if effect:
+            desc += f" (效果: {effect}, 数值: {item['value']})"
         return desc
 
 if __name__ == "__main__":
@@ -0,0 +1,222 @@
+from bisect import bisect_left, insort
+
+from .metrics import timed
+from .settings import resolve_settings
+
+# 排行榜：名称 -> 显示名
+BOARDS = {"level": "等级", "exp": "累计经验", "money": "金币"}
+
+# 默认与最多显示的名次数
+DEFAULT_TOP = 10
+MAX_TOP = 50
+
+# 有序索引每块的目标长度：块长超过两倍时对半拆分
+CHUNK_SIZE = 512
+
+class SortedIndex:
+    """
+    分块的有序索引：chunks 为若干段各自有序、首尾相接的列表，元素为 (排序键, 成员)；
+    maxes 记录每块的最大元素，先在 maxes 上二分定位块，再在块内二分，
+    插入与删除只移动一个块（至多 2 * CHUNK_SIZE 个元素），而不是整个列表。
+    keys 记录每个成员当前的排序键。排序键取负值，升序排列即为数值从高到低；
+    数值相同时按成员（会话ID, 发送者ID）排列，名次稳定。
+    """
+    __slots__ = ("chunks", "maxes", "keys")
+
+    def __init__(self):
+        self.chunks = []
+        self.maxes = []
+        self.keys = {}
+
+    def _insert(self, entry: tuple) -> None:
+        chunks, maxes = self.chunks, self.maxes
+        if not chunks:
+            chunks.append([entry])
+            maxes.append(entry)
+            return
+        i = min(bisect_left(maxes, entry), len(chunks) - 1)
+        chunk = chunks[i]
+        insort(chunk, entry)
+        maxes[i] = chunk[-1]
+        if len(chunk) > 2 * CHUNK_SIZE:
+            chunks[i:i + 1] = [chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:]]
+            maxes[i:i + 1] = [chunks[i][-1], chunks[i + 1][-1]]
+
+    def _delete(self, entry: tuple) -> None:
+        i = bisect_left(self.maxes, entry)
+        chunk = self.chunks[i]
+        del chunk[bisect_left(chunk, entry)]
+        if chunk:
+            self.maxes[i] = chunk[-1]
+        else:
+            del self.chunks[i], self.maxes[i]
+
+    def set(self, member: tuple, key: tuple) -> None:
+        """设置成员的排序键；键未变化时不做任何事。"""
+        old = self.keys.get(member)
+        if old == key:
+            return
+        if old is not None:
+            self._delete((old, member))
+        self.keys[member] = key
+        self._insert((key, member))
+
+    def remove(self, member: tuple) -> None:
+        old = self.keys.pop(member, None)
+        if old is not None:
+            self._delete((old, member))
+
+    def rank(self, member: tuple) -> int:
+        """成员的名次（从 1 开始），不在索引中时返回 0。"""
+        key = self.keys.get(member)
+        if key is None:
+            return 0
+        entry = (key, member)
+        i = bisect_left(self.maxes, entry)
+        return sum(len(chunk) for chunk in self.chunks[:i]) + bisect_left(self.chunks[i], entry) + 1
+
+    def head(self, k: int) -> list:
+        """按顺序返回前 k 个元素。"""
+        result = []
+        for chunk in self.chunks:
+            result.extend(chunk[:k - len(result)])
+            if len(result) >= k:
+                break
+        return result
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+class LeaderboardManager:
+    def __init__(self, config, game_sessions: dict):
+        """
+        初始化跨会话排行榜。
+
+        为等级、累计经验与金币各维护一个分块有序索引，查询前 k 名只需读取开头的块，查询某个角色的名次只需两次二分查找。
+        索引在创建时全量建立一次，之后每条命令执行完毕由 RPGPlugin 调用 update_session，
+        只重新计算该会话中的角色（战斗获得经验、物品改变金币都发生在命令之内）。
+
+        Args:
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），使用其中的升级曲线计算累计经验。
+            game_sessions (dict): 全部会话数据。
+        """
+        self.game_sessions = game_sessions
+        self.indexes = {board: SortedIndex() for board in BOARDS}
+        # 会话ID -> 已编入索引的发送者ID 集合
+        self.members = {}
+        # (会话ID, 发送者ID) -> 编入索引时的 (角色名, 等级)；渲染时不读取其它会话的实时数据（那些会话的锁未被持有）
+        self.profiles = {}
+        self.configure(resolve_settings(config))
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照；经验曲线可能变化，因此重建索引"""
+        self.progression = settings.progression
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """全量重建索引。"""
+        self.indexes = {board: SortedIndex() for board in BOARDS}
+        self.members = {}
+        self.profiles = {}
+        for session_id in self.game_sessions:
+            self.update_session(session_id)
+
+    def _keys(self, char: dict) -> dict:
+        level = char.get("level", 1)
+        return {"level": (-level, -char.get("exp", 0)),
+                "exp": (-self.progression.total_exp(char),),
+                "money": (-char.get("money", 0),)}
+
+    @timed("leaderboard.update_session")
+    def update_session(self, session_id: str) -> None:
+        """
+        按会话当前的角色数据更新索引（会话被删除时移除其角色）。
+
+        Args:
+            session_id (str): 会话ID。
+        """
+        session = self.game_sessions.get(session_id)
+        characters = session.get("characters", {}) if session else {}
+        for sender_id in self.members.get(session_id, set()) - characters.keys():
+            for index in self.indexes.values():
+                index.remove((session_id, sender_id))
+            del self.profiles[(session_id, sender_id)]
+        for sender_id, char in characters.items():
+            member = (session_id, sender_id)
+            for board, key in self._keys(char).items():
+                self.indexes[board].set(member, key)
+            self.profiles[member] = (char["name"], char.get("level", 1))
+        if characters:
+            self.members[session_id] = set(characters)
+        else:
+            self.members.pop(session_id, None)
+
+    def top(self, board: str, k: int = DEFAULT_TOP) -> list:
+        """
+        返回排行榜前 k 名。
+
+        Returns:
+            list: [(名次, 会话ID, 发送者ID, 数值)]，数值为排序键的第一项。
+        """
+        return [(rank, session_id, sender_id, -key[0])
+                for rank, (key, (session_id, sender_id)) in enumerate(self.indexes[board].head(k), 1)]
+
+    def rank(self, board: str, session_id: str, sender_id: str) -> int:
+        """角色在排行榜中的名次（从 1 开始），没有角色时返回 0。"""
+        return self.indexes[board].rank((session_id, sender_id))
+
+    def render(self, board: str, session_id: str, sender_id: str, k: int = DEFAULT_TOP) -> str:
+        """
+        渲染排行榜文本：前 k 名，以及查询者自己的名次（不在前 k 名时）。
+
+        Args:
+            board (str): 排行榜名称，见 BOARDS。
+            session_id (str): 查询者所在会话ID，前 k 名中同一会话的角色标注“本群”。
+            sender_id (str): 查询者ID。
+            k (int, optional): 显示的名次数，限制在 1 到 MAX_TOP 之间。
+
+        Returns:
+            str: 排行榜文本。
+        """
+        k = min(max(1, k), MAX_TOP)
+        index = self.indexes[board]
+        if not index:
+            return "还没有任何角色上榜。"
+        lines = [f"【{BOARDS[board]}排行榜】共 {len(index)} 名角色"]
+        for rank, sid, uid, value in self.top(board, k):
+            name, level = self.profiles[(sid, uid)]
+            mark = "（本群）" if sid == session_id else ""
+            lines.append(f"{rank}. {name}{mark} Lv{level} — {BOARDS[board]} {value}")
+        mine = self.rank(board, session_id, sender_id)
+        if mine > k:
+            lines.append(f"你的名次：第 {mine} 名")
+        return "\n".join(lines)
+
+if __name__ == "__main__":
+    # 简单测试：建立索引，修改一个角色后只更新其所在会话，并与全量排序对比
+    import random
+    import timeit
+    rng = random.Random(1)
+    sessions = {f"group_{i}": {"characters": {f"user_{j}": {"name": f"角色{i}-{j}", "level": rng.randint(1, 50),
+                                                             "exp": rng.randint(0, 99), "money": rng.randint(0, 1000)}
+                                              for j in range(5)}}
+                for i in range(2000)}
+    leaderboard = LeaderboardManager({}, sessions)
+    sessions["group_7"]["characters"]["user_0"].update(level=99, money=10 ** 6)
+    leaderboard.update_session("group_7")
+    print(leaderboard.render("money", "group_7", "user_1", 5))
+    scan = sorted(((-c["money"], (sid, uid)) for sid, s in sessions.items() for uid, c in s["characters"].items()))
+    print("与全量排序一致：", [m for _, m in scan[:50]] == [(sid, uid) for _, sid, uid, _ in leaderboard.top("money", 50)])
+    # 大量随机更新后（经历多次分块拆分与删空），名次仍与全量排序一致
+    for _ in range(20000):
+        sid = f"group_{rng.randrange(2000)}"
+        sessions[sid]["characters"][f"user_{rng.randrange(5)}"]["money"] = rng.randint(0, 10 ** 5)
+        leaderboard.update_session(sid)
+    scan = sorted(((-c["money"], (sid, uid)) for sid, s in sessions.items() for uid, c in s["characters"].items()))
+    print("随机更新后名次一致：", all(leaderboard.rank("money", *m) == i for i, (_, m) in enumerate(scan, 1)),
+          "块数：", len(leaderboard.indexes["money"].chunks))
+    update = timeit.timeit(lambda: leaderboard.update_session("group_7"), number=1000) / 1000
+    query = timeit.timeit(lambda: leaderboard.top("level", 10), number=1000) / 1000
+    full = timeit.timeit(lambda: sorted(((-c["level"], -c["exp"]), sid, uid) for sid, s in sessions.items()
+                                        for uid, c in s["characters"].items())[:10], number=10) / 10
+    print(f"前 10 名查询：索引 {query * 1e6:.1f} 微秒，全量扫描 {full * 1e6:.0f} 微秒；单会话更新 {update * 1e6:.1f} 微秒")
@@ -1,18 +1,28 @@
+from .doors import DOOR_BITS, DOOR_DIRECTIONS
+from .logger import get_logger
+from .metrics import timed
+from .settings import resolve_settings
+
 class LLMIntegration:
-    def __init__(self, context, config: dict):
+    def __init__(self, context, config):
         """
         初始化 LLM 集成模块。
 
         Args:
             context: 上下文对象，包含 logger、get_using_provider() 等接口。
-            config (dict): 配置字典，可能包含 LLM 调用相关参数，例如系统提示、温度等。
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），使用其中的 LLM 分组（系统提示、温度）。
         """
         self.context = context
-        self.config = config
-        # 可从配置中加载额外的 LLM 参数（例如系统提示、温度等），示例：
-        self.system_prompt = config.get("llm_system_prompt", "你是一位优秀的游戏叙事编写者，请根据给定提示生成引人入胜的叙事。")
-        self.temperature = config.get("llm_temperature", 0.7)
+        self.logger = get_logger("llm")
+        self.configure(resolve_settings(config))
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.llm
+        self.system_prompt = self.settings.system_prompt
+        self.temperature = self.settings.temperature
 
+    @timed("llm.generate_narrative")
     async def generate_narrative(self, session: dict, sender_id: str, prompt: str) -> str:
         """
         根据当前会话和玩家提示生成一段叙事文本。
@@ -30,7 +40,7 @@ class LLMIntegration:
         """
         provider = self.context.get_using_provider()
         if not provider:
-            self.context.logger.error("LLM 提供商不可用。")
+            self.logger.error("LLM 提供商不可用。")
             return "LLM 提供商不可用。"
 
         # 提取角色所在房间信息
@@ -38,8 +48,7 @@ class LLMIntegration:
         pos = char.get("position", (0, 0))
         room = session["world"].get(pos, {})
         room_desc = room.get("description", "未知")
-        doors = room.get("doors", {})
-        available_doors = ", ".join([d for d, open_ in doors.items() if open_])
+        available_doors = ", ".join(DOOR_DIRECTIONS[room.get("doors", 0)])
         # 整合游戏日志（若没有日志则为空字符串）
         context_log = "\n".join(session.get("log", []))
         # 构造完整提示文本
@@ -50,11 +59,11 @@ class LLMIntegration:
             f"玩家提示：{prompt}\n"
             "请生成一段引人入胜的游戏叙事。"
         )
-        self.context.logger.debug(f"LLM 输入提示：{full_prompt}")
+        self.logger.debug("LLM 输入提示：%s", full_prompt)
         # 调用 LLM 提供商生成文本，注意 session_id 可用于上下文关联（若平台支持）
         response = await provider.text_chat(full_prompt, session_id=session.get("session_id", ""))
         narrative = response.completion_text.strip()
-        self.context.logger.debug(f"LLM 生成文本：{narrative}")
+        self.logger.debug("LLM 生成文本：%s", narrative)
         return narrative
 
 if __name__ == "__main__":
@@ -89,7 +98,7 @@ if __name__ == "__main__":
         "world": {
             (0, 0): {
                 "description": "起始房间，光线昏暗。",
-                "doors": {"north": True, "south": False, "east": True, "west": False},
+                "doors": DOOR_BITS["north"] | DOOR_BITS["east"],
                 "items": []
             }
         },
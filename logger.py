@@ -1,34 +1,140 @@
 import logging
+import logging.handlers
+import queue
 import sys
 
-def get_logger(name: str = "RPGPlugin") -> logging.Logger:
+# 插件根日志记录器名称，各模块的日志记录器挂在其下（例如 "RPGPlugin.combat"）
+ROOT_LOGGER = "RPGPlugin"
+
+# 后台输出线程，仅在 logging.console 启用时由 configure_logging 创建
+_listener = None
+# 是否已调用过 configure_logging，以及按模块设置过级别的日志记录器名称（热重载时还原不再配置的模块）
+_configured = False
+_module_levels = set()
+
+def _qualified_name(name: str) -> str:
+    if name == ROOT_LOGGER or name.startswith(ROOT_LOGGER + "."):
+        return name
+    return f"{ROOT_LOGGER}.{name}"
+
+def configure_logging(config=None) -> None:
+    """
+    配置插件日志管线，可重复调用（/rpg reload 时按新配置重新调用）。
+
+    默认插件日志向上传播，由宿主（AstrBot）的日志处理器输出到其文件日志与网页控制台，插件不添加任何处理器。
+    启用 logging.console 时改为插件自行输出：所有插件日志记录器共用根记录器上的 QueueHandler，
+    调用方只把日志记录放入队列，写 stdout 等 I/O 在 QueueListener 的后台线程完成，不阻塞事件循环，
+    且不再传播到宿主，避免重复打印。
+
+    Args:
+        config (GameSettings | dict, optional): 编译后的配置快照，或原始配置字典（将先被编译），读取其中 logging 分组：
+            - level: 插件默认日志级别（默认 "INFO"）
+            - levels: 各模块日志级别，例如 {"combat": "DEBUG", "llm": "WARNING"}
+            - console: 是否由插件自行在后台线程输出到 stdout（默认 False）
+            为空时使用默认配置（配置编译本身也要记录日志，此时尚无配置快照）。
+    """
+    global _listener, _configured
+    _configured = True
+    root = logging.getLogger(ROOT_LOGGER)
+    if config is None:
+        level, levels, console = logging.INFO, {}, False
+    else:
+        # settings 模块本身使用本模块记录日志，在调用时才导入
+        from .settings import resolve_settings
+        settings = resolve_settings(config).logging
+        level, levels, console = settings.level, settings.levels, settings.console
+    root.setLevel(level)
+    for name in _module_levels - levels.keys():
+        logging.getLogger(_qualified_name(name)).setLevel(logging.NOTSET)
+    for name, module_level in levels.items():
+        logging.getLogger(_qualified_name(name)).setLevel(module_level)
+    _module_levels.clear()
+    _module_levels.update(levels)
+
+    if not console:
+        _stop_listener()
+        root.propagate = True
+        return
+    if _listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(
+        '[%(levelname)s] %(asctime)s - %(name)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.propagate = False
+    _listener = logging.handlers.QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _listener.start()
+
+def _stop_listener() -> None:
+    """停止后台输出线程、刷新队列中剩余的日志并移除 QueueHandler。"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+
+def shutdown_logging() -> None:
+    """停止后台输出线程并刷新队列中剩余的日志（插件卸载时调用）。"""
+    _stop_listener()
+    logging.getLogger(ROOT_LOGGER).propagate = True
+
+def get_logger(name: str = ROOT_LOGGER) -> logging.Logger:
     """
     获取一个配置好的 Logger 实例。
 
     Args:
-        name (str): 日志记录器名称，默认 "RPGPlugin"。
+        name (str): 日志记录器名称，默认 "RPGPlugin"；其它名称会挂在 "RPGPlugin." 之下，
+                    从而继承插件日志级别与输出管线。
 
     Returns:
-        logging.Logger: 配置好的 Logger 实例，日志级别为 DEBUG。
+        logging.Logger: Logger 实例。级别与输出方式由 configure_logging 按配置设置，未配置时为 INFO 且交给宿主输出。
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
-    # 避免重复添加 Handler
-    if not logger.handlers:
-        # 创建控制台 Handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter(
-            '[%(levelname)s] %(asctime)s - %(name)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-    return logger
+    if not _configured:
+        configure_logging()
+    return logging.getLogger(_qualified_name(name))
+
+class LogSampler:
+    def __init__(self, config):
+        """
+        日志采样器：对高频日志（例如全量消息钩子）每 1/rate 次只放行一次。
+
+        Args:
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），
+                读取 logging.message_sample_rate 作为采样率 rate：0~1，1 表示全部记录，0 表示全部丢弃。
+        """
+        from .settings import resolve_settings
+        rate = resolve_settings(config).logging.message_sample_rate
+        self.interval = round(1 / rate) if rate > 0 else 0
+        self._count = 0
+
+    def should_log(self) -> bool:
+        """本次是否记录。"""
+        if not self.interval:
+            return False
+        self._count += 1
+        if self._count >= self.interval:
+            self._count = 0
+            return True
+        return False
 
 if __name__ == "__main__":
     # 简单测试
+    configure_logging({"logging": {"level": "INFO", "levels": {"TestLogger": "DEBUG"}, "console": True}})
     logger = get_logger("TestLogger")
     logger.debug("这是一条 DEBUG 级别日志。")
     logger.info("这是一条 INFO 级别日志。")
-    logger.error("这是一条 ERROR 级别日志。")
+    logger.error("这是一条 ERROR 级别日志，参数延迟格式化：%s", {"key": "value"})
+    sampler = LogSampler({"logging": {"message_sample_rate": 0.25}})
+    print("采样结果：", [sampler.should_log() for _ in range(8)])
+    # 热重载为默认配置：交还宿主输出，之前单独设置的模块级别被还原
+    configure_logging({})
+    root = logging.getLogger(ROOT_LOGGER)
+    print("交给宿主输出：", root.propagate, root.handlers, "模块级别：", logger.level)
+    shutdown_logging()
@@ -1,59 +1,82 @@
 import random
+from bisect import bisect_right
+from .prototype import PROTOTYPES
+from .settings import resolve_settings
+from . import item  # 注册通用物品原型（药水、金币等）
+
+# 掉落武器的风味：原型ID 中的标识 -> 描述；旧存档的原型ID 中直接保存了描述文本，按原样显示
+DROP_WEAPON_FLAVORS = {"mystic": "蕴含神秘力量"}
+
+def _drop_weapon_prototype(flavor: str = "") -> tuple:
+    """掉落武器的原型；带风味描述的掉落武器不显示伤害数值。"""
+    return "掉落武器", DROP_WEAPON_FLAVORS.get(flavor, flavor) or "伤害 {damage}", None
+
+def _drop_rune_prototype() -> tuple:
+    """掉落符文的原型，value 为符文加成。"""
+    return "掉落符文", "符文加成 {value}", "rune"
+
+def _treasure_prototype() -> tuple:
+    """掉落宝箱的原型。"""
+    return "宝箱", "价值 {value}", "loot"
+
+def _misc_drop_prototype() -> tuple:
+    """掉落杂项物品的原型。"""
+    return "神秘物品", "神秘物品", None
+
+PROTOTYPES.register_builder("drop_weapon", _drop_weapon_prototype)
+PROTOTYPES.register_builder("drop_rune", _drop_rune_prototype)
+PROTOTYPES.register_builder("drop_treasure", _treasure_prototype)
+PROTOTYPES.register_builder("drop_misc", _misc_drop_prototype)
 
 class LootManager:
-    def __init__(self, config: dict):
+    def __init__(self, config):
         """
         初始化掉落管理器。
 
         Args:
-            config (dict): 配置字典，包含掉落相关参数，例如：
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），使用其中的掉落分组：
                 - "drop_rates": 掉落概率字典，键为物品类型，值为概率（0-1）
                   例如 {"weapon": 0.2, "rune": 0.15, "gold": 0.4, "potion": 0.15, "treasure": 0.1}
                 - "gold_range": 金币生成数量范围，例如 [5, 20]
                 - "potion_range": 药水回复值范围，例如 [20, 50]
         """
-        self.config = config
-        self.drop_rates = config.get("drop_rates", {
-            "weapon": 0.2,
-            "rune": 0.15,
-            "gold": 0.4,
-            "potion": 0.15,
-            "treasure": 0.1
-        })
-        self.gold_range = config.get("gold_range", [5, 20])
-        self.potion_range = config.get("potion_range", [20, 50])
-
-    def generate_loot(self, monster_level: int) -> list:
+        self.configure(resolve_settings(config))
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.loot
+        self.drop_rates = self.settings.drop_rates
+        self.drop_thresholds = self.settings.drop_thresholds
+        self.drop_types = self.settings.drop_types
+        self.gold_range = self.settings.gold_range
+        self.potion_range = self.settings.potion_range
+
+    def generate_loot(self, monster_level: int, rng=None) -> list:
         """
         根据怪物等级生成掉落物列表。掉落次数可能与怪物等级有关，
         每次掉落根据配置概率选择掉落物类型，然后生成具体物品数据。
 
         Args:
             monster_level (int): 怪物等级，用于决定掉落物的数量和质量。
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
 
         Returns:
             list: 掉落物列表，每个掉落物为一个数据字典。
         """
+        rng = rng or random
         loot = []
         # 定义掉落次数，示例：怪物等级加上随机1-3次
-        num_drops = monster_level + random.randint(1, 3)
+        num_drops = monster_level + rng.randint(1, 3)
         for _ in range(num_drops):
-            roll = random.random()
-            cumulative = 0.0
-            item_type = None
-            for t, rate in self.drop_rates.items():
-                cumulative += rate
-                if roll < cumulative:
-                    item_type = t
-                    break
-            if item_type is None:
-                item_type = "misc"
-            loot_item = self.generate_loot_item(item_type, monster_level)
+            # 在预先计算的累计概率上二分查找，落在全部概率之外则掉落杂项
+            index = bisect_right(self.drop_thresholds, rng.random())
+            item_type = self.drop_types[index] if index < len(self.drop_types) else "misc"
+            loot_item = self.generate_loot_item(item_type, monster_level, rng=rng)
             if loot_item:
                 loot.append(loot_item)
         return loot
 
-    def generate_loot_item(self, item_type: str, monster_level: int) -> dict:
+    def generate_loot_item(self, item_type: str, monster_level: int, rng=None) -> dict:
         """
         根据物品类型和怪物等级生成单个掉落物数据字典。
         掉落物品类型包括：
@@ -67,30 +90,33 @@ class LootManager:
         Args:
             item_type (str): 掉落物品类型。
             monster_level (int): 怪物等级，用于决定数值规模。
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
 
         Returns:
-            dict: 掉落物数据字典，包含 "type", "name", "effect", "value" 等字段。
+            dict: 紧凑的掉落物实例，包含 "proto" 原型ID 与 "value"（武器为 "damage"）等数值字段，
+                  名称与效果由原型注册表惰性渲染。
         """
+        rng = rng or random
         if item_type == "gold":
-            amount = random.randint(self.gold_range[0], self.gold_range[1]) * monster_level
-            return {"type": "gold", "name": f"{amount} 金币", "effect": "money", "value": amount}
+            amount = rng.randint(self.gold_range[0], self.gold_range[1]) * monster_level
+            return PROTOTYPES.create(PROTOTYPES.resolve("item", "gold"), value=amount)
         elif item_type == "potion":
-            heal_value = random.randint(self.potion_range[0], self.potion_range[1])
-            return {"type": "potion", "name": f"药水 (+{heal_value} HP)", "effect": "heal", "value": heal_value}
+            heal_value = rng.randint(self.potion_range[0], self.potion_range[1])
+            return PROTOTYPES.create(PROTOTYPES.resolve("item", "potion"), value=heal_value)
         elif item_type == "weapon":
             # 掉落武器的基础伤害在 3-10 之间，加上怪物等级的影响
-            damage = random.randint(3, 10) + monster_level
-            return {"type": "weapon", "name": "掉落武器", "damage": damage, "description": f"伤害 {damage}"}
+            damage = rng.randint(3, 10) + monster_level
+            return PROTOTYPES.create(PROTOTYPES.resolve("drop_weapon"), damage=damage)
         elif item_type == "rune":
             # 掉落符文， bonus 在 1-5 之间，加上怪物等级的部分影响
-            bonus = random.randint(1, 5) + monster_level // 2
-            return {"type": "rune", "name": "掉落符文", "effect": "rune", "value": bonus}
+            bonus = rng.randint(1, 5) + monster_level // 2
+            return PROTOTYPES.create(PROTOTYPES.resolve("drop_rune"), value=bonus)
         elif item_type == "treasure":
-            bonus = random.randint(1, 10) + monster_level
-            return {"type": "treasure", "name": "宝箱", "effect": "loot", "value": bonus}
+            bonus = rng.randint(1, 10) + monster_level
+            return PROTOTYPES.create(PROTOTYPES.resolve("drop_treasure"), value=bonus)
         else:
-            bonus = random.randint(1, 3)
-            return {"type": "misc", "name": "神秘物品", "effect": None, "value": bonus}
+            bonus = rng.randint(1, 3)
+            return PROTOTYPES.create(PROTOTYPES.resolve("drop_misc"), value=bonus)
 
     def describe_loot(self, loot_list: list) -> str:
         """
@@ -104,9 +130,10 @@ class LootManager:
         """
         descriptions = []
         for item in loot_list:
-            desc = f"{item['name']}"
-            if item.get("effect"):
-                desc += f" (效果: {item['effect']}, 数值: {item['value']})"
+            desc = PROTOTYPES.name(item)
+            effect = PROTOTYPES.effect(item)
+            if effect:
+                desc += f" (效果: {effect}, 数值: {item['value']})"
             descriptions.append(desc)
         return "\n".join(descriptions)
 
@@ -1,69 +1,268 @@
 from astrbot.api.all import *
-import json
-import os
-import random
+import asyncio
+import logging
+import time
+from functools import cached_property
 
 # 使用相对导入引入其它模块接口
+# 各管理器的模块在对应属性首次使用时才导入（见下方“子模块管理器”）
 from .dice import roll_dice, skill_check
-from .character import CharacterManager
-from .map_gen import MapManager
-from .combat import CombatManager
-from .weapon import WeaponManager
-from .skill import SkillManager
-from .llm_integration import LLMIntegration
-from .item import ItemManager
-from .rune import RuneManager
-from .loot import LootManager
-from .logger import get_logger  # 导入自定义日志模块
+from .prototype import PROTOTYPES
+from .settings import compile_settings
+from .leaderboard import BOARDS, DEFAULT_TOP
+from .storage import open_storage
+from .shared_world import SHARED_WORLD
+from .session_lock import SessionLockManager, SessionBusyError
+from .throttle import ThrottleManager, throttled
+from .executor import CommandExecutor, is_cpu_heavy
+from .metrics import METRICS, timed
+from .logger import get_logger, configure_logging, shutdown_logging, LogSampler  # 导入自定义日志模块
 
 # 全局常量：四个方向及其反向映射
 DIRECTIONS = ["north", "south", "east", "west"]
 OPPOSITE = {"north": "south", "south": "north", "east": "west", "west": "east"}
 
-# 持久化存储文件
-DATA_FILE = "game_data.json"
-
-def load_game_data():
-    """从 DATA_FILE 中加载游戏数据，若文件不存在则返回空字典"""
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            try:
-                return json.load(f)
-            except Exception as e:
-                return {}
-    return {}
-
-def save_game_data(data):
-    """将游戏数据保存到 DATA_FILE 中"""
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+# 会话排队命令过多时的回复
+BUSY_MESSAGE = "当前会话有太多命令正在处理，请稍后再试。"
 
 @register("rpg_bot", "Your Name", "大型RPG文字跑团插件，包含大世界地图、角色个性、物理与法术攻击、武器升级、符文与掉落物系统、持久化存储和LLM叙事", "3.2.0", "repo url")
 class RPGPlugin(Star):
     def __init__(self, context: Context, config: dict):
         super().__init__(context)
         self.config = config
-        # 从持久化文件加载游戏会话数据
-        self.game_sessions = load_game_data()
-
-        # 初始化各子模块管理器
-        self.character_manager = CharacterManager(self.config)
-        self.map_manager = MapManager(self.config)
-        self.combat_manager = CombatManager(self.config, self.game_sessions, self.character_manager, self.map_manager)
-        self.weapon_manager = WeaponManager(self.config)
-        self.skill_manager = SkillManager(self.config)
-        self.llm_integration = LLMIntegration(self.context, self.config)
-        self.item_manager = ItemManager(self.config)
-        self.rune_manager = RuneManager(self.config)
-        self.loot_manager = LootManager(self.config)
-
+        # 记录各启动阶段耗时（毫秒），初始化结束时统一输出
+        self.startup_timings = {}
+        phase_start = time.perf_counter()
+        # 启动时校验并编译一次配置，各管理器只读取编译后的只读快照（编译中的问题以默认日志级别记录）
+        self.settings = compile_settings(self.config)
+        phase_start = self._record_phase("settings", phase_start)
+        # 再按配置初始化日志管线，后续各模块的日志级别均由配置决定
+        configure_logging(self.settings)
         # 使用自定义 logger，不依赖 context.logger
         self.logger = get_logger("RPGPlugin")
-        self.logger.info("RPGPlugin 初始化完成。")
+        phase_start = self._record_phase("logging", phase_start)
+
+        # 执行器：CPU 密集的命令在工作线程中执行，JSON 存档在后台线程写入
+        self.executor = CommandExecutor(self.settings)
+        # 存档引擎：按配置选用单文件 JSON 或 SQLite，两者均只重新编码发生变化的会话
+        self.storage = open_storage(self.settings, submit=self.executor.submit_write)
+
+        # 游戏会话数据：加载完成前为空字典，加载结果原地合并，管理器持有的引用始终有效
+        self.game_sessions = {}
+        # 存档加载完成后置位，所有读写会话的命令先等待它
+        self.ready = asyncio.Event()
+        self._load_task = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            # 在事件循环中初始化（AstrBot 加载插件时）：存档在线程池中后台解析，不阻塞其它插件的加载
+            self._load_task = loop.create_task(self._load_sessions())
+            phase_start = self._record_phase("schedule_load", phase_start)
+        else:
+            self.game_sessions.update(self.storage.load())
+            self.ready.set()
+            phase_start = self._record_phase("load_game_data", phase_start)
+
+        # 会话锁：同一会话的命令串行原子执行，不同会话并行
+        self.session_locks = SessionLockManager(self.settings)
+        # 限流：每个玩家与每个会话的令牌桶，刷屏的命令在排队等待会话锁之前即被拒绝
+        self.throttle = ThrottleManager(self.settings)
+        # 可选的采样剖析：仅在配置启用时导入并挂接，未启用时不产生任何包装；解除时恢复启动时的工作线程开关
+        self.profiler = None
+        self._executor_enabled = self.executor.enabled
+        self._apply_profiling(self.settings)
+        # 全量消息钩子的调试日志按配置采样
+        self.message_sampler = LogSampler(self.settings)
+        self._record_phase("setup", phase_start)
+        self.logger.info("RPGPlugin 初始化完成，各阶段耗时：%s",
+                         "，".join(f"{name} {ms:.1f} ms" for name, ms in self.startup_timings.items()))
+
+    def _apply_profiling(self, settings):
+        """按 profiling 分组挂接、重建或解除采样剖析；分组未变化时保留现有剖析器"""
+        if self.profiler is not None:
+            if self.profiler.settings == settings.profiling:
+                return
+            self._detach_profiler()
+        if not settings.profiling.enabled:
+            return
+        from .profiling import Profiler
+        profiler = self.profiler = Profiler(settings)
+        METRICS.profiler = profiler
+        # cProfile 与内存峰值跟踪只覆盖事件循环线程，剖析期间命令不再放到工作线程
+        self.executor.enabled = False
+        if profiler.trace_allocations:
+            self.persist_data = profiler.track_allocations("persist_data", self.persist_data)
+            # 战斗管理器尚未创建时，start_battle 在 combat_manager 创建时挂接，不为此提前创建
+            manager = self.__dict__.get("combat_manager")
+            if manager is not None:
+                manager.start_battle = profiler.track_allocations("start_battle", manager.start_battle)
+        self.logger.info("已启用采样剖析：每 %d 次命令采样一次，输出目录 %s", profiler.sample_every, profiler.output_dir)
+
+    def _detach_profiler(self):
+        """解除采样剖析：移除实例上的包装、停止内存跟踪并恢复工作线程"""
+        profiler = self.profiler
+        if profiler is None:
+            return
+        self.profiler = METRICS.profiler = None
+        self.__dict__.pop("persist_data", None)
+        manager = self.__dict__.get("combat_manager")
+        if manager is not None:
+            manager.__dict__.pop("start_battle", None)
+        profiler.close()
+        self.executor.enabled = self._executor_enabled
+        self.logger.info("已关闭采样剖析")
+
+    def _record_phase(self, name: str, phase_start: float) -> float:
+        """记录一个启动阶段的耗时，返回下一阶段的起始时间"""
+        now = time.perf_counter()
+        self.startup_timings[name] = (now - phase_start) * 1000
+        return now
+
+    async def _load_sessions(self):
+        """在线程池中加载存档并合并到 game_sessions，完成后置位 ready"""
+        start = time.perf_counter()
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(None, self.storage.load)
+            self.game_sessions.update(data)
+        except Exception:
+            self.logger.exception("后台加载存档失败，将以空存档继续运行")
+        finally:
+            self.startup_timings["load_game_data"] = (time.perf_counter() - start) * 1000
+            self.ready.set()
+        self.logger.info("后台加载存档完成：%d 个会话，耗时 %.1f ms",
+                         len(self.game_sessions), self.startup_timings["load_game_data"])
+
+    # -------------------------------
+    # 子模块管理器：首次使用时才导入模块并创建
+    # -------------------------------
+    @cached_property
+    def character_manager(self):
+        from .character import CharacterManager
+        return CharacterManager(self.settings)
+
+    @cached_property
+    def map_manager(self):
+        from .map_gen import MapManager
+        return MapManager(self.settings)
+
+    @cached_property
+    def combat_manager(self):
+        from .combat import CombatManager
+        manager = CombatManager(self.settings, self.game_sessions, self.character_manager, self.map_manager)
+        profiler = self.profiler
+        if profiler is not None and profiler.trace_allocations:
+            manager.start_battle = profiler.track_allocations("start_battle", manager.start_battle)
+        return manager
+
+    @cached_property
+    def weapon_manager(self):
+        from .weapon import WeaponManager
+        return WeaponManager(self.settings)
+
+    @cached_property
+    def skill_manager(self):
+        from .skill import SkillManager
+        return SkillManager(self.settings)
+
+    @cached_property
+    def llm_integration(self):
+        from .llm_integration import LLMIntegration
+        return LLMIntegration(self.context, self.settings)
 
-    def persist_data(self):
-        """持久化当前游戏会话数据到文件"""
-        save_game_data(self.game_sessions)
+    @cached_property
+    def item_manager(self):
+        from .item import ItemManager
+        return ItemManager(self.settings)
+
+    @cached_property
+    def rune_manager(self):
+        from .rune import RuneManager
+        return RuneManager(self.settings)
+
+    @cached_property
+    def loot_manager(self):
+        from .loot import LootManager
+        return LootManager(self.settings)
+
+    @cached_property
+    def rng_service(self):
+        # 每个会话独立的随机数流，检查点随会话数据保存
+        from .rng import RNGService
+        return RNGService(self.settings.rng_seed or None)
+
+    @cached_property
+    def command_manager(self):
+        # 修改会话状态的命令统一经由事件日志分发，便于记录与重放
+        from .commands import CommandManager
+        return CommandManager(self.settings, self.character_manager, self.map_manager, self.combat_manager)
+
+    @cached_property
+    def event_log(self):
+        from .events import EventLog
+        return EventLog(self.settings, self.command_manager, self.rng_service)
+
+    @cached_property
+    def leaderboard(self):
+        # 首次查询时全量建立索引，之后随每次存档增量更新
+        from .leaderboard import LeaderboardManager
+        return LeaderboardManager(self.settings, self.game_sessions)
+
+    # 持有配置快照、支持热重载的管理器属性名
+    CONFIGURABLE_MANAGERS = ("character_manager", "map_manager", "combat_manager", "weapon_manager", "skill_manager",
+                             "llm_integration", "item_manager", "rune_manager", "loot_manager", "command_manager",
+                             "leaderboard", "throttle", "event_log", "session_locks")
+
+    def apply_settings(self, settings):
+        """切换到新的配置快照，只重新配置已创建的管理器，尚未创建的管理器首次使用时直接读取新快照"""
+        self.settings = settings
+        # 日志级别、输出方式与消息钩子的采样率
+        configure_logging(settings)
+        self.message_sampler = LogSampler(settings)
+        self._apply_profiling(settings)
+        for name in self.CONFIGURABLE_MANAGERS:
+            manager = self.__dict__.get(name)
+            if manager is not None:
+                manager.configure(settings)
+
+    async def terminate(self):
+        """插件卸载时取消未完成的存档加载，解除剖析挂接，关闭事件日志并停止日志后台线程"""
+        if self._load_task is not None and not self._load_task.done():
+            self._load_task.cancel()
+        self._detach_profiler()
+        # 等待工作线程中的命令与尚未落盘的存档写入完成
+        self.executor.shutdown()
+        self.storage.close()
+        if "event_log" in self.__dict__:
+            self.event_log.close()
+        shutdown_logging()
+
+    async def dispatch(self, session_id: str, command: str, sender_id: str, *args):
+        """
+        经由事件日志分发命令；声明为 CPU 密集的命令（见 executor.cpu_heavy）在工作线程中执行，
+        期间事件循环继续处理其它会话。调用方必须持有该会话的会话锁。
+        """
+        heavy = self.executor.enabled and is_cpu_heavy(getattr(self.command_manager, command))
+        if heavy:
+            self.storage.prepare(session_id, self.game_sessions[session_id])
+        return await self.executor.run(session_id, heavy, self.event_log.dispatch,
+                                       self.game_sessions, session_id, command, sender_id, *args)
+
+    @timed("plugin.persist_data")
+    def persist_data(self, session_id: str = None):
+        """
+        持久化游戏会话数据，并按间隔导出 Prometheus 指标文件。
+
+        命令执行后传入其会话ID，存档引擎只重新编码该会话（SQLite 引擎只写入变化的行）；
+        不传时保存全部会话，工作线程中的会话沿用上次的编码。编码在事件循环中进行，落盘在后台线程。
+        排行榜已建立时同时更新该会话的角色名次。
+        """
+        if session_id is not None and "leaderboard" in self.__dict__:
+            self.leaderboard.update_session(session_id)
+        self.storage.save(self.game_sessions, session_id, self.executor.running)
+        SHARED_WORLD.save(self.executor.submit_write)
+        METRICS.maybe_export(self.settings.metrics.prometheus_file, self.settings.metrics.export_interval)
 
     # -------------------------------
     # 命令组：rpg（所有命令均以 /rpg 开头）
@@ -76,26 +275,29 @@ class RPGPlugin(Star):
     # 以下各子命令调用各模块接口，示例代码略
 
     @rpg.command("startgame")
+    @throttled("startgame")
+    @timed("command.startgame")
     async def start_game(self, event: AstrMessageEvent):
+        # 存档仍在后台加载时，命令在此等待加载完成
+        await self.ready.wait()
         session_id = event.session_id
-        if session_id in self.game_sessions:
-            yield event.plain_result("游戏会话已存在，请使用 /rpg status 查看状态。")
-        else:
-            start_coord = (0, 0)
-            world = {start_coord: self.map_manager.generate_room(start_coord)}
-            self.game_sessions[session_id] = {
-                "players": [event.get_sender_name()],
-                "log": ["游戏开始！"],
-                "characters": {},
-                "world": world
-            }
-            self.persist_data()
-            yield event.plain_result("新游戏会话已启动！欢迎踏入这无限广阔的世界。")
+        try:
+            async with self.session_locks.hold(session_id):
+                if session_id in self.game_sessions:
+                    reply = "游戏会话已存在，请使用 /rpg status 查看状态。"
+                else:
+                    reply = await self.dispatch(session_id, "startgame", event.get_sender_id(), event.get_sender_name())
+                    self.persist_data(session_id)
+        except SessionBusyError:
+            reply = BUSY_MESSAGE
+        yield event.plain_result(reply)
 
     # -------------------------------
     # 子命令：创建角色（包括个性和属性定义）
     # -------------------------------
     @rpg.command("create_character")
+    @throttled("create_character")
+    @timed("command.create_character")
     async def create_character(self, event: AstrMessageEvent, name: str = None):
         """
         /rpg create_character [角色名]
@@ -107,65 +309,52 @@ class RPGPlugin(Star):
           - 额外属性：毒、火、冰（用于额外属性伤害或抗性）
           - 人格（temperament）：随机分配 "calm"、"neutral"、"irritable"，影响技能检定修正
         """
+        await self.ready.wait()
         session_id = event.session_id
         sender_id = event.get_sender_id()
         sender_name = event.get_sender_name()
-        if session_id not in self.game_sessions:
-            yield event.plain_result("请先启动游戏会话：/rpg startgame")
-            return
-        session = self.game_sessions[session_id]
-        if sender_id in session["characters"]:
-            yield event.plain_result("你已创建过角色。")
-            return
-        if not name:
-            name = sender_name
-        # 从配置中获取基础属性
-        hp = self.config.get("default_character_hp", 100)
-        phys_attack = self.config.get("default_character_attack", 10)
-        phys_defense = self.config.get("default_character_defense", 5)
-        mag_attack = self.config.get("default_magic_attack", 8)
-        mag_defense = self.config.get("default_magic_defense", 5)
-        # 额外属性：毒、火、冰初始抗性或伤害加成，默认设置（后续模块中可扩展升级）
-        extra_attributes = {
-            "poison": self.config.get("default_poison", 0),
-            "fire": self.config.get("default_fire", 0),
-            "ice": self.config.get("default_ice", 0)
-        }
-        temperament = random.choice(["calm", "neutral", "irritable"])
-        # 调用 CharacterManager 接口创建角色（具体实现在 character.py 中）
-        char = self.character_manager.create_character(
-            name=name,
-            hp=hp,
-            phys_attack=phys_attack,
-            phys_defense=phys_defense,
-            mag_attack=mag_attack,
-            mag_defense=mag_defense,
-            extra_attributes=extra_attributes,
-            temperament=temperament,
-            # 默认近战攻击类型，可后续通过装备或指令更改为远程
-            attack_type="melee",
-            # 初始武器、技能等由 character_manager 内部处理
-        )
-        session["characters"][sender_id] = char
-        self.persist_data()
-        yield event.plain_result(
-            f"角色创建成功！\n名称: {char['name']}\nHP: {hp}\n物理攻击: {phys_attack}  防御: {phys_defense}\n"
-            f"法术攻击: {mag_attack}  防御: {mag_defense}\n人格: {temperament}\n"
-            f"初始武器: {char['weapon']['name']}（{char['weapon']['description']}），技能: {char['skills'][0]}\n"
-            f"额外属性: 毒 {extra_attributes['poison']}，火 {extra_attributes['fire']}，冰 {extra_attributes['ice']}"
-        )
+        try:
+            async with self.session_locks.hold(session_id):
+                if session_id not in self.game_sessions:
+                    reply = "请先启动游戏会话：/rpg startgame"
+                elif sender_id in self.game_sessions[session_id]["characters"]:
+                    reply = "你已创建过角色。"
+                else:
+                    char = await self.dispatch(session_id, "create_character", sender_id, name or sender_name)
+                    self.persist_data(session_id)
+                    extra_attributes = char["extra_attributes"]
+                    reply = (
+                        f"角色创建成功！\n名称: {char['name']}\nHP: {char['hp']}\n物理攻击: {char['attack']}  防御: {char['defense']}\n"
+                        f"法术攻击: {char['magic_attack']}  防御: {char['magic_defense']}\n人格: {char['temperament']}\n"
+                        f"初始武器: {PROTOTYPES.name(char['weapon'])}（{PROTOTYPES.description(char['weapon'])}），技能: {'、'.join(sorted(char['skills']))}\n"
+                        f"额外属性: 毒 {extra_attributes['poison']}，火 {extra_attributes['fire']}，冰 {extra_attributes['ice']}"
+                    )
+        except SessionBusyError:
+            reply = BUSY_MESSAGE
+        yield event.plain_result(reply)
 
     # -------------------------------
     # 子命令：查看角色信息
     # -------------------------------
     @rpg.command("character")
+    @throttled("character")
+    @timed("command.character")
     async def character_info(self, event: AstrMessageEvent):
         """
         /rpg character
         查看你的角色信息，包括各项属性、攻击类型、额外属性及库存等。
         """
+        await self.ready.wait()
         session_id = event.session_id
         sender_id = event.get_sender_id()
+        if session_id in self.executor.running:
+            # 会话的命令正在工作线程中执行：排队等它结束再读取，避免读到战斗中途的状态
+            try:
+                async with self.session_locks.hold(session_id):
+                    pass
+            except SessionBusyError:
+                yield event.plain_result(BUSY_MESSAGE)
+                return
         if session_id not in self.game_sessions or sender_id not in self.game_sessions[session_id]["characters"]:
             yield event.plain_result("你还没有创建角色，请使用 /rpg create_character 创建。")
         else:
@@ -173,6 +362,7 @@ class RPGPlugin(Star):
             info = (
                 f"名称: {char['name']}\n"
                 f"HP: {char['hp']} / {char['max_hp']}\n"
+                f"MP: {char.get('mp', 0)} / {char.get('max_mp', 0)}\n"
                 f"物理攻击: {char['attack']}  防御: {char['defense']}\n"
                 f"法术攻击: {char['magic_attack']}  防御: {char['magic_defense']}\n"
                 f"额外属性 - 毒: {char['extra_attributes'].get('poison',0)}, "
@@ -180,13 +370,13 @@ class RPGPlugin(Star):
                 f"冰: {char['extra_attributes'].get('ice',0)}\n"
                 f"攻击类型: {char.get('attack_type','melee')}\n"
                 f"人格: {char.get('temperament','neutral')}\n"
-                f"技能: {', '.join(char['skills'])}\n"
+                f"技能: {', '.join(sorted(char['skills']))}\n"
                 f"位置: {char['position']}\n"
                 f"金币: {char.get('money',0)}\n"
-                f"当前武器: {char['weapon']['name']}\n"
+                f"当前武器: {PROTOTYPES.name(char['weapon'])}\n"
                 "库存: " + (
                     ", ".join(
-                        f"[{i}] {item['name']}（{item.get('description','')}）"
+                        f"[{i}] {PROTOTYPES.name(item)}（{PROTOTYPES.description(item)}）"
                         if isinstance(item, dict) else f"[{i}] {item}"
                         for i, item in enumerate(char["inventory"])
                     ) if char["inventory"] else "空"
@@ -198,6 +388,8 @@ class RPGPlugin(Star):
     # 子命令：移动房间（接口由 MapManager 实现）
     # -------------------------------
     @rpg.command("move")
+    @throttled("move")
+    @timed("command.move")
     async def move(self, event: AstrMessageEvent, direction: str):
         """
         /rpg move [方向]
@@ -207,65 +399,163 @@ class RPGPlugin(Star):
         if direction not in DIRECTIONS:
             yield event.plain_result("无效方向，请使用 north, south, east, west。")
             return
+        await self.ready.wait()
         session_id = event.session_id
         sender_id = event.get_sender_id()
-        session = self.game_sessions.get(session_id)
-        if not session or sender_id not in session["characters"]:
-            yield event.plain_result("你还没有创建角色，请使用 /rpg create_character 创建。")
+        batch = self.throttle.queue_move(session_id, sender_id, direction)
+        if batch is None:
+            # 已并入该玩家排队中的移动批次，由先到的命令统一执行并回复
             return
-        # 调用 MapManager 的移动接口，返回结果字符串
-        result = self.map_manager.move_character(session, sender_id, direction)
-        self.persist_data()
-        yield event.plain_result(result)
+        try:
+            async with self.session_locks.hold(session_id):
+                directions = self.throttle.take_moves(session_id, sender_id, batch)
+                session = self.game_sessions.get(session_id)
+                if not session or sender_id not in session["characters"]:
+                    reply = "你还没有创建角色，请使用 /rpg create_character 创建。"
+                else:
+                    # 调用 MapManager 的移动接口，每一步作为一个事件记录；整批移动只保存一次、回复一条消息
+                    replies = [await self.dispatch(session_id, "move", sender_id, step) for step in directions]
+                    self.persist_data(session_id)
+                    reply = "\n".join(replies)
+        except SessionBusyError:
+            reply = BUSY_MESSAGE
+        finally:
+            # 未能取得会话锁（繁忙、被取消或出错）时撤下自己的批次，之后的移动开始新的批次
+            self.throttle.take_moves(session_id, sender_id, batch)
+        yield event.plain_result(reply)
+
+    # -------------------------------
+    # 子命令：快速旅行（寻路由 MapManager 与 pathfinding 模块实现）
+    # -------------------------------
+    @rpg.command("goto")
+    @throttled("goto")
+    @timed("command.goto")
+    async def goto(self, event: AstrMessageEvent, x: int, y: int):
+        """
+        /rpg goto <x> <y>
+        沿已探索房间之间的门自动寻路，一次移动到目标房间；整段路线只保存一次、回复一条消息。
+        """
+        await self.ready.wait()
+        session_id = event.session_id
+        sender_id = event.get_sender_id()
+        try:
+            async with self.session_locks.hold(session_id):
+                session = self.game_sessions.get(session_id)
+                if not session or sender_id not in session["characters"]:
+                    reply = "你还没有创建角色，请使用 /rpg create_character 创建。"
+                else:
+                    reply = await self.dispatch(session_id, "goto", sender_id, int(x), int(y))
+                    self.persist_data(session_id)
+        except SessionBusyError:
+            reply = BUSY_MESSAGE
+        yield event.plain_result(reply)
+
+    # -------------------------------
+    # 子命令：查看小地图（渲染与分块缓存由 MapManager 与 minimap 模块实现）
+    # -------------------------------
+    @rpg.command("map")
+    @throttled("map")
+    @timed("command.map")
+    async def show_map(self, event: AstrMessageEvent):
+        """
+        /rpg map
+        以你的位置为中心显示已探索区域的 ASCII 小地图。
+        """
+        await self.ready.wait()
+        session_id = event.session_id
+        sender_id = event.get_sender_id()
+        if session_id not in self.game_sessions or sender_id not in self.game_sessions[session_id]["characters"]:
+            yield event.plain_result("你还没有创建角色，请使用 /rpg create_character 创建。")
+        else:
+            yield event.plain_result(self.map_manager.render_map(self.game_sessions[session_id], sender_id))
+
+    # -------------------------------
+    # 子命令：跨会话排行榜（有序索引由 LeaderboardManager 维护）
+    # -------------------------------
+    @rpg.command("leaderboard")
+    @throttled("leaderboard")
+    @timed("command.leaderboard")
+    async def leaderboard_cmd(self, event: AstrMessageEvent, board: str = "level", top: int = DEFAULT_TOP):
+        """
+        /rpg leaderboard [level|exp|money] [名次数]
+        查看所有会话的等级、累计经验或金币排行榜，以及你自己的名次。
+        """
+        await self.ready.wait()
+        if board not in BOARDS:
+            yield event.plain_result(f"未知的排行榜 {board}，可选：{', '.join(BOARDS)}。")
+        else:
+            yield event.plain_result(self.leaderboard.render(board, event.session_id, event.get_sender_id(), int(top)))
 
     # -------------------------------
     # 子命令：近战/远程战斗（接口由 CombatManager 实现）
     # -------------------------------
     @rpg.command("battle")
-    async def battle(self, event: AstrMessageEvent):
+    @throttled("battle")
+    @timed("command.battle")
+    async def battle(self, event: AstrMessageEvent, skill: str = None):
         """
-        /rpg battle
+        /rpg battle [技能]
         发起物理战斗（可区分近战与远程），计算伤害、经验奖励和掉落（具体逻辑由 CombatManager 实现）。
+        指定已学会的技能时，战斗中在法力与冷却允许的回合使用该技能。
         """
+        await self.ready.wait()
         session_id = event.session_id
         sender_id = event.get_sender_id()
-        session = self.game_sessions.get(session_id)
-        if not session or sender_id not in session["characters"]:
-            yield event.plain_result("你还没有创建角色，请使用 /rpg create_character 创建。")
-            return
-        battle_log = self.combat_manager.start_battle(session, sender_id, attack_mode="physical")
-        self.persist_data()
-        yield event.plain_result("\n".join(battle_log))
+        try:
+            async with self.session_locks.hold(session_id):
+                session = self.game_sessions.get(session_id)
+                if not session or sender_id not in session["characters"]:
+                    reply = "你还没有创建角色，请使用 /rpg create_character 创建。"
+                elif skill and skill not in session["characters"][sender_id]["skills"]:
+                    reply = f"你尚未学会技能 {skill}。"
+                else:
+                    battle_log = await self.dispatch(session_id, "battle", sender_id, "physical", skill)
+                    self.persist_data(session_id)
+                    reply = "\n".join(battle_log)
+        except SessionBusyError:
+            reply = BUSY_MESSAGE
+        yield event.plain_result(reply)
 
     # -------------------------------
     # 子命令：法术攻击（元素攻击，由 CombatManager 接口实现）
     # -------------------------------
     @rpg.command("cast")
+    @throttled("cast")
+    @timed("command.cast")
     async def cast_spell(self, event: AstrMessageEvent, element: str, difficulty: int = 15):
         """
         /rpg cast <元素> [难度]
-        使用法术攻击，元素可为 fire、ice、poison。
+        使用法术攻击，元素为配置 elements.names 中的元素（默认 fire、ice、poison）。
         调用 CombatManager 中的法术攻击接口，进行技能检定和伤害计算。
         """
         element = element.lower()
-        if element not in ["fire", "ice", "poison"]:
-            yield event.plain_result("无效元素，请选择 fire、ice 或 poison。")
+        elements = self.settings.elements
+        if element not in elements.index:
+            yield event.plain_result(f"无效元素，请选择 {'、'.join(elements.elements)}。")
             return
+        await self.ready.wait()
         session_id = event.session_id
         sender_id = event.get_sender_id()
-        session = self.game_sessions.get(session_id)
-        if not session or sender_id not in session["characters"]:
-            yield event.plain_result("你还没有创建角色，请使用 /rpg create_character 创建。")
-            return
-        # 调用 CombatManager 的法术攻击接口，返回战斗日志
-        log_lines = self.combat_manager.cast_spell(session, sender_id, element, difficulty)
-        self.persist_data()
-        yield event.plain_result("\n".join(log_lines))
+        try:
+            async with self.session_locks.hold(session_id):
+                session = self.game_sessions.get(session_id)
+                if not session or sender_id not in session["characters"]:
+                    reply = "你还没有创建角色，请使用 /rpg create_character 创建。"
+                else:
+                    # 调用 CombatManager 的法术攻击接口，返回战斗日志
+                    log_lines = await self.dispatch(session_id, "cast", sender_id, element, difficulty)
+                    self.persist_data(session_id)
+                    reply = "\n".join(log_lines)
+        except SessionBusyError:
+            reply = BUSY_MESSAGE
+        yield event.plain_result(reply)
 
     # -------------------------------
     # 子命令：调用 LLM 生成叙事（接口由 LLMIntegration 实现）
     # -------------------------------
     @rpg.command("narrative")
+    @throttled("narrative")
+    @timed("command.narrative")
     async def narrative(self, event: AstrMessageEvent, prompt: str):
         """
         /rpg narrative <提示>
@@ -275,28 +565,87 @@ class RPGPlugin(Star):
         if not provider:
             yield event.plain_result("未启用LLM提供商。")
             return
+        await self.ready.wait()
         session_id = event.session_id
         sender_id = event.get_sender_id()
-        session = self.game_sessions.get(session_id)
-        if not session or sender_id not in session["characters"]:
-            yield event.plain_result("你还没有创建角色，请使用 /rpg create_character 创建。")
+        try:
+            # 等待 LLM 期间持有会话锁，保证读取的房间与日志和追加叙事之间不被同会话其它命令打断
+            async with self.session_locks.hold(session_id):
+                session = self.game_sessions.get(session_id)
+                if not session or sender_id not in session["characters"]:
+                    reply = "你还没有创建角色，请使用 /rpg create_character 创建。"
+                else:
+                    narrative_text = await self.llm_integration.generate_narrative(session, sender_id, prompt)
+                    await self.dispatch(session_id, "narrative", sender_id, narrative_text)
+                    self.persist_data(session_id)
+                    reply = narrative_text
+        except SessionBusyError:
+            reply = BUSY_MESSAGE
+        yield event.plain_result(reply)
+
+    # -------------------------------
+    # 子命令：查看性能统计（仅管理员）
+    # -------------------------------
+    @rpg.command("stats")
+    @throttled("stats")
+    async def stats(self, event: AstrMessageEvent):
+        """
+        /rpg stats
+        管理员查看各命令与热点路径的耗时统计（次数、p50/p95/p99）及会话锁等待情况，
+        同时立即导出一次 Prometheus 指标文件（若已配置路径）。
+        """
+        if not event.is_admin():
+            yield event.plain_result("该命令仅限管理员使用。")
             return
-        narrative_text = await self.llm_integration.generate_narrative(session, sender_id, prompt)
-        session["log"].append(narrative_text)
-        self.persist_data()
-        yield event.plain_result(narrative_text)
+        lock_stats = self.session_locks.stats()
+        throttle_stats = self.throttle.stats()
+        prometheus_file = self.settings.metrics.prometheus_file
+        if prometheus_file:
+            METRICS.write_prometheus(prometheus_file)
+        yield event.plain_result(
+            METRICS.format_report() + "\n"
+            f"会话锁：获取 {lock_stats['acquired']} 次，拒绝 {lock_stats['rejected']} 次，"
+            f"平均等待 {lock_stats['avg_wait_ms']:.2f} ms，最长等待 {lock_stats['max_wait_ms']:.2f} ms\n"
+            f"限流：放行 {throttle_stats['admitted']} 次，拒绝 {throttle_stats['rejected']} 次，"
+            f"合并移动 {throttle_stats['batched']} 次，活跃令牌桶 {throttle_stats['active_users']} 个玩家 / "
+            f"{throttle_stats['active_sessions']} 个会话"
+        )
+
+    # -------------------------------
+    # 子命令：热重载配置（仅管理员）
+    # -------------------------------
+    @rpg.command("reload")
+    @throttled("reload")
+    async def reload(self, event: AstrMessageEvent):
+        """
+        /rpg reload
+        管理员按当前插件配置重新编译配置快照并应用到各管理器，无需重启插件。
+        配置中的问题会回退为默认值并在回复中列出；executor 与 storage 分组只在重启插件后生效。
+        """
+        if not event.is_admin():
+            yield event.plain_result("该命令仅限管理员使用。")
+            return
+        settings = compile_settings(self.config)
+        # 线程池与存档引擎在启动时创建，这两个分组的修改需重启插件
+        restart_only = [name for name in ("executor", "storage") if getattr(settings, name) != getattr(self.settings, name)]
+        self.apply_settings(settings)
+        reply = "配置已重新加载。"
+        if restart_only:
+            reply += f"\n{', '.join(restart_only)} 分组的修改需重启插件后生效。"
+        if settings.warnings:
+            reply += "\n以下配置项有问题：\n" + "\n".join(settings.warnings)
+        yield event.plain_result(reply)
 
     # -------------------------------
     # 全局事件钩子：输出调试日志
     # -------------------------------
     @event_message_type(EventMessageType.ALL)
     async def on_message(self, event: AstrMessageEvent):
-        debug_info = (
-            f"[DEBUG] 收到事件：\n"
-            f"发送者 ID: {event.get_sender_id()}\n"
-            f"发送者名称: {event.get_sender_name()}\n"
-            f"消息内容: {event.message_str}\n"
-            f"原始消息: {event.message_obj.raw_message}\n"
-            f"时间戳: {event.timestamp}"
+        # 该钩子对每条消息都会触发：先判断级别与采样，未命中时不做任何格式化
+        if not self.logger.isEnabledFor(logging.DEBUG) or not self.message_sampler.should_log():
+            return
+        self.logger.debug(
+            "收到事件：\n发送者 ID: %s\n发送者名称: %s\n消息内容: %s\n原始消息: %s\n时间戳: %s",
+            event.get_sender_id(), event.get_sender_name(), event.message_str,
+            event.message_obj.raw_message, event.timestamp
         )
-        self.context.logger.debug(debug_info)
@@ -1,61 +1,90 @@
 import random
+from .metrics import timed
+from .settings import resolve_settings
+from .pathfinding import PathFinder, summarize_path
+from .doors import DOOR_BITS, OPPOSITE_BITS, OFFSETS, DOOR_DIRECTIONS
+from .shared_world import SHARED_WORLD, WorldView
+from .minimap import MinimapRenderer
 
 # 定义四个方向及其反向映射
 DIRECTIONS = ["north", "south", "east", "west"]
 OPPOSITE = {"north": "south", "south": "north", "east": "west", "west": "east"}
 
 class MapManager:
-    def __init__(self, config: dict):
+    def __init__(self, config):
         """
         初始化地图管理器
 
         Args:
-            config (dict): 配置字典，包含房间生成的参数：
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），使用其中的地图分组：
                 - door_probability: 各方向门开启的概率（默认 0.5）
                 - item_probability: 房间内生成物品的概率（默认 0.3）
                 - room_descriptions: 房间描述列表
+                - shared_world: 是否启用共享世界模式（默认 False），启用后新开的游戏共用同一份规范世界
         """
-        self.config = config
-        self.door_probability = config.get("door_probability", 0.5)
-        self.item_probability = config.get("item_probability", 0.3)
-        self.room_descriptions = config.get("room_descriptions", [
-            "一片荒芜之地",
-            "绿意盎然的森林",
-            "神秘的遗迹",
-            "阴暗的地下室",
-            "开阔的草原",
-            "崎岖的山路",
-            "雾气缭绕的沼泽",
-            "破败的城堡遗址"
-        ])
-
-    def generate_room(self, coord: tuple, entry_direction: str = None) -> dict:
+        self.configure(resolve_settings(config))
+        # 各会话已探索地图的邻接索引与路径缓存
+        self.pathfinder = PathFinder()
+        # 各会话小地图的分块图块缓存
+        self.minimap = MinimapRenderer()
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.map
+        self.door_probability = self.settings.door_probability
+        self.item_probability = self.settings.item_probability
+        self.room_descriptions = self.settings.room_descriptions
+        self.shared_world = self.settings.shared_world
+        # 关闭 shared_world 后，此前以共享模式创建的会话仍读取共享世界，因此总是设置房间生成函数
+        SHARED_WORLD.configure(self.generate_room, settings.rng_seed or None)
+
+    @timed("map.generate_room")
+    def generate_room(self, coord: tuple, entry_direction: str = None, rng=None, world: dict = None) -> dict:
         """
         根据坐标生成一个房间数据。
+
+        门以 4 位掩码保存（见 doors.DOOR_BITS）。朝向已存在房间的方向不掷骰，
+        而是与相邻房间朝向本房间的门保持一致，因此门总是双向的；其余方向按 door_probability 随机。
+        没有入口方向的房间（起始房间）至少有一扇门。
         
         Args:
             coord (tuple): 房间坐标 (x, y)。
             entry_direction (str, optional): 如果非空，则表示玩家从该方向进入，
                                              对应反向门（OPPOSITE[entry_direction]）必须开启。
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
+            world (dict, optional): 会话地图，用于查询相邻房间的门。
         
         Returns:
             dict: 房间数据字典，包含：
                 - "coord": 坐标
                 - "description": 随机房间描述
-                - "doors": dict，键为 DIRECTIONS 中的方向，值为布尔值，表示该方向是否有门
+                - "doors": int，门掩码，某方向有门则 DOOR_BITS 中对应的位为 1
                 - "items": 列表，可能包含随机生成的物品（此处以字符串表示）
         """
-        description = random.choice(self.room_descriptions)
-        doors = {}
+        rng = rng or random
+        description = rng.choice(self.room_descriptions)
+        x, y = coord
+        doors = 0
+        free = []
         for d in DIRECTIONS:
+            dx, dy = OFFSETS[d]
+            neighbor = world.get((x + dx, y + dy)) if world else None
             if entry_direction and d == OPPOSITE.get(entry_direction):
-                doors[d] = True
+                is_open = True
+            elif neighbor is not None:
+                is_open = bool(neighbor["doors"] & OPPOSITE_BITS[d])
             else:
-                doors[d] = random.random() < self.door_probability
+                free.append(d)
+                is_open = rng.random() < self.door_probability
+            if is_open:
+                doors |= DOOR_BITS[d]
+        # 强制开启的门只能朝向尚未生成的房间，以免破坏双向一致
+        if not doors and not entry_direction and free:
+            doors = DOOR_BITS[rng.choice(free)]
         # 房间内物品：以 item_probability 概率生成 1～2 个物品（这里只用简单字符串表示，后续可调用物品模块）
         items = []
-        if random.random() < self.item_probability:
-            count = random.randint(1, 2)
+        if rng.random() < self.item_probability:
+            count = rng.randint(1, 2)
             for i in range(count):
                 items.append(f"神秘物品{i+1}")
         room = {
@@ -66,14 +95,16 @@ class MapManager:
         }
         return room
 
-    def move_character(self, session: dict, sender_id: str, direction: str) -> str:
+    @timed("map.move_character")
+    def move_character(self, session: dict, sender_id: str, direction: str, rng=None) -> str:
         """
-        根据指定方向移动角色。如果新房间不存在，则自动生成新房间，并更新角色所在位置。
+        根据指定方向移动角色。当前房间该方向没有门时拒绝移动；如果新房间不存在，则自动生成新房间，并更新角色所在位置。
 
         Args:
             session (dict): 当前会话数据，其中包含 "characters" 与 "world" 键。
             sender_id (str): 玩家ID，必须在 session["characters"] 中存在。
             direction (str): 移动方向，必须为 "north"、"south"、"east" 或 "west"。
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
 
         Returns:
             str: 移动结果描述消息，包括新房间坐标、房间描述、可通往方向以及房间内物品信息。
@@ -82,21 +113,24 @@ class MapManager:
         char = session["characters"][sender_id]
         current_pos = char["position"]
         x, y = current_pos
-        if direction == "north":
-            new_pos = (x, y - 1)
-        elif direction == "south":
-            new_pos = (x, y + 1)
-        elif direction == "east":
-            new_pos = (x + 1, y)
-        elif direction == "west":
-            new_pos = (x - 1, y)
-        else:
+        offset = OFFSETS.get(direction)
+        if offset is None:
             return "无效的方向。"
+        # 当前房间该方向没有门则无法通行（位运算检查）
+        current_room = session["world"].get(current_pos)
+        if current_room is not None and not current_room["doors"] & DOOR_BITS[direction]:
+            return f"{direction} 方向没有门，无法通行。\n可通往方向：{', '.join(DOOR_DIRECTIONS[current_room['doors']])}"
+        new_pos = (x + offset[0], y + offset[1])
         
-        # 如果新房间不存在，则生成之
-        if new_pos not in session["world"]:
-            new_room = self.generate_room(new_pos, entry_direction=direction)
-            session["world"][new_pos] = new_room
+        # 如果新房间不存在，则生成之（共享世界模式下取规范房间）；地图版本号随之递增，寻路缓存据此作废
+        world = session["world"]
+        if new_pos not in world:
+            if isinstance(world, WorldView):
+                new_room = world.explore(new_pos)
+            else:
+                new_room = self.generate_room(new_pos, entry_direction=direction, rng=rng, world=world)
+                world[new_pos] = new_room
+            self.room_changed(session, new_pos)
             session["log"].append(f"新房间 {new_pos} 被生成。")
         else:
             new_room = session["world"][new_pos]
@@ -105,12 +139,80 @@ class MapManager:
         char["position"] = new_pos
         
         # 构造返回描述信息
-        available_doors = [d for d, open_ in new_room["doors"].items() if open_]
-        message = f"你向 {direction} 移动，来到房间 {new_pos}。\n描述：{new_room['description']}\n可通往方向：{', '.join(available_doors)}"
-        if new_room["items"]:
-            message += f"\n房间内发现：{', '.join(new_room['items'])}"
+        return f"你向 {direction} 移动，来到房间 {new_pos}。\n" + self.describe_room(new_room)
+
+    def room_changed(self, session: dict, coord: tuple) -> None:
+        """
+        房间变化钩子：房间被生成、探索或修改后调用。
+
+        递增地图版本号 world_rev（寻路缓存据此作废）并作废小地图中该房间所在分块的图块。
+        """
+        session["world_rev"] = session.get("world_rev", 0) + 1
+        self.minimap.invalidate(session, coord)
+
+    def render_map(self, session: dict, sender_id: str) -> str:
+        """以角色为中心渲染已探索地图的 ASCII 小地图。"""
+        position = session["characters"][sender_id]["position"]
+        return (f"地图（你位于 {position}，北方在上）：\n{self.minimap.render(session, position)}\n"
+                "@ 你的位置 · 线条指向房间的门 · 空白为未探索区域")
+
+    def start_world(self, session: dict, rng=None, start_coord: tuple = (0, 0)) -> dict:
+        """
+        为新会话创建地图并生成起始房间。
+
+        共享世界模式下地图为共享世界的 WorldView，会话只保存已探索坐标与修改过的房间，
+        并以 session["world_mode"] = "shared" 标记，存档读回时据此还原视图；
+        已有会话保持创建时的模式，切换配置只影响之后新开的游戏。
+
+        Returns:
+            dict: 会话地图。
+        """
+        if self.shared_world:
+            world = WorldView(SHARED_WORLD)
+            world.explore(start_coord)
+            session["world_mode"] = "shared"
+        else:
+            world = {start_coord: self.generate_room(start_coord, rng=rng)}
+        session["world"] = world
+        return world
+
+    def describe_room(self, room: dict) -> str:
+        """房间描述、可通往方向以及房间内物品信息。"""
+        message = f"描述：{room['description']}\n可通往方向：{', '.join(DOOR_DIRECTIONS[room['doors']])}"
+        if room["items"]:
+            message += f"\n房间内发现：{', '.join(room['items'])}"
         return message
 
+    @timed("map.travel")
+    def travel(self, session: dict, sender_id: str, goal: tuple) -> str:
+        """
+        沿已探索房间之间的门寻找最短路线，一次性把角色移动到目标房间。
+
+        整段路线只作为一次状态转换：只更新最终位置，不生成新房间，也不消耗随机数。
+        路线由 PathFinder 求得并按会话缓存，地图生成新房间后自动作废。
+
+        Args:
+            session (dict): 当前会话数据。
+            sender_id (str): 玩家ID。
+            goal (tuple): 目标房间坐标 (x, y)。
+
+        Returns:
+            str: 移动结果描述消息，包括步数、路线概要与目标房间描述。
+        """
+        char = session["characters"][sender_id]
+        goal = tuple(goal)
+        start = char["position"]
+        if goal not in session["world"]:
+            return f"房间 {goal} 尚未探索，无法前往。"
+        if goal == start:
+            return f"你已经在房间 {goal}。"
+        path = self.pathfinder.find_path(session, start, goal)
+        if path is None:
+            return f"没有已探索的路线可以从 {start} 到达 {goal}。"
+        char["position"] = goal
+        return (f"你沿已探索的路线走了 {len(path)} 步（{summarize_path(path)}），来到房间 {goal}。\n"
+                + self.describe_room(session["world"][goal]))
+
 if __name__ == "__main__":
     # 简单测试
     config = {
@@ -131,7 +233,11 @@ if __name__ == "__main__":
         "world": {(0, 0): start_room}
     }
     
-    # 测试移动功能
-    result = mm.move_character(session, "test_id", "north")
+    # 测试移动功能：沿起始房间的第一扇门移动
+    result = mm.move_character(session, "test_id", DOOR_DIRECTIONS[start_room["doors"]][0])
     print("移动结果：")
     print(result)
+
+    # 测试快速旅行：返回起始房间
+    print("快速旅行：")
+    print(mm.travel(session, "test_id", (0, 0)))
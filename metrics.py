@@ -0,0 +1,202 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+
+class Histogram:
+    """
+    耗时直方图：累计总次数与总耗时，并保留最近 window 个样本用于计算 p50/p95/p99。
+    """
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self, window: int = 2048):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def quantiles(self, *qs: float) -> list:
+        """返回最近样本的分位数（秒），无样本时全部为 0。"""
+        return quantiles(self.samples, *qs)
+
+def quantiles(samples, *qs: float) -> list:
+    """返回样本的分位数，无样本时全部为 0。"""
+    if not samples:
+        return [0.0 for _ in qs]
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return [ordered[min(last, int(q * len(ordered)))] for q in qs]
+
+class MetricsRegistry:
+    def __init__(self, window: int = 2048):
+        """
+        初始化指标注册表，按名称管理各热点路径的耗时直方图。
+
+        Args:
+            window (int, optional): 每个直方图保留用于计算分位数的最近样本数。
+        """
+        self.window = window
+        self.histograms = {}
+        # @timed 的函数也在执行器的工作线程中运行，记录与读取直方图都需要持有此锁
+        self._lock = threading.Lock()
+        self._last_export = 0.0
+        # 可选的命令采样剖析器（profiling.Profiler），仅在配置启用剖析时设置
+        self.profiler = None
+
+    def observe(self, name: str, seconds: float) -> None:
+        """记录一次耗时（秒）。"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.window)
+            histogram.observe(seconds)
+
+    def _collect(self) -> list:
+        """在锁内复制各直方图的计数、总耗时与样本，排序与计算分位数在锁外进行。"""
+        with self._lock:
+            return [(name, histogram.count, histogram.total, list(histogram.samples))
+                    for name, histogram in sorted(self.histograms.items())]
+
+    def snapshot(self) -> dict:
+        """
+        返回全部指标的汇总。
+
+        Returns:
+            dict: {名称: {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}}，按名称排序。
+        """
+        result = {}
+        for name, count, total, samples in self._collect():
+            p50, p95, p99 = quantiles(samples, 0.5, 0.95, 0.99)
+            result[name] = {
+                "count": count,
+                "mean_ms": total / count * 1000 if count else 0.0,
+                "p50_ms": p50 * 1000,
+                "p95_ms": p95 * 1000,
+                "p99_ms": p99 * 1000
+            }
+        return result
+
+    def format_report(self) -> str:
+        """生成适合聊天消息展示的文本报表。"""
+        lines = ["名称 | 次数 | p50 / p95 / p99 (ms)"]
+        for name, stat in self.snapshot().items():
+            lines.append(f"{name} | {stat['count']} | "
+                         f"{stat['p50_ms']:.2f} / {stat['p95_ms']:.2f} / {stat['p99_ms']:.2f}")
+        return "\n".join(lines)
+
+    def render_prometheus(self, prefix: str = "rpg") -> str:
+        """按 Prometheus 文本格式导出（summary 类型，单位为秒）。"""
+        metric = f"{prefix}_duration_seconds"
+        lines = [f"# HELP {metric} RPG 插件热点路径耗时", f"# TYPE {metric} summary"]
+        for name, count, total, samples in self._collect():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for q, value in zip((0.5, 0.95, 0.99), quantiles(samples, 0.5, 0.95, 0.99)):
+                lines.append(f'{metric}{{name="{label}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{metric}_sum{{name="{label}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{name="{label}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """将 Prometheus 文本写入文件（先写临时文件再替换，避免采集方读到半截内容）。"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+        self._last_export = time.monotonic()
+
+    def maybe_export(self, path: str, interval: float) -> bool:
+        """距上次导出超过 interval 秒时写出 Prometheus 文件，返回是否写出。"""
+        if not path or time.monotonic() - self._last_export < interval:
+            return False
+        self.write_prometheus(path)
+        return True
+
+# 全局指标注册表
+METRICS = MetricsRegistry()
+
+def timed(name: str):
+    """
+    计时装饰器，将被装饰函数每次调用的耗时记录到 METRICS 中名为 name 的直方图。
+
+    支持普通函数、协程函数与异步生成器函数（/rpg 命令处理器）。对异步生成器只累计
+    生成器自身运行的时间（含其内部 await），不计入在 yield 处等待框架发送消息的时间；
+    若设置了 METRICS.profiler，命令调用还会按其采样率在 cProfile 下运行。
+    """
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def asyncgen_wrapper(*args, **kwargs):
+                profiler = METRICS.profiler
+                profile = profiler.begin(name) if profiler is not None else None
+                agen = func(*args, **kwargs)
+                elapsed = 0.0
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        try:
+                            item = await agen.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            elapsed += time.perf_counter() - start
+                        yield item
+                finally:
+                    await agen.aclose()
+                    METRICS.observe(name, elapsed)
+                    if profile is not None:
+                        profiler.end(profile, name)
+            return asyncgen_wrapper
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def coroutine_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    METRICS.observe(name, time.perf_counter() - start)
+            return coroutine_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                METRICS.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+if __name__ == "__main__":
+    # 简单测试
+    import asyncio
+
+    @timed("demo.sync")
+    def work(n):
+        return sum(range(n))
+
+    @timed("demo.command")
+    async def command():
+        await asyncio.sleep(0.001)
+        yield "回复"
+
+    for i in range(100):
+        work(1000 * (i + 1))
+
+    async def consume():
+        async for _ in command():
+            pass
+
+    asyncio.run(consume())
+    # 工作线程并发记录时计数不丢失
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda _: [METRICS.observe("demo.threads", 0.001) for _ in range(10000)], range(4)))
+    print("并发记录次数：", METRICS.snapshot()["demo.threads"]["count"])
+    print(METRICS.format_report())
+    print(METRICS.render_prometheus())
@@ -0,0 +1,112 @@
+from collections import OrderedDict
+
+# 每个缓存分块覆盖 CHUNK_SIZE x CHUNK_SIZE 个房间
+CHUNK_SIZE = 8
+
+# 小地图默认半径（以玩家为中心，显示 (2r+1) x (2r+1) 个房间）
+DEFAULT_RADIUS = 6
+
+# 同时缓存分块的会话数上限，超出时淘汰最久未使用的会话
+MAX_CACHED_SESSIONS = 256
+
+# 门掩码 -> 房间字符：线条朝向有门的方向（north=1, south=2, east=4, west=8）
+ROOM_GLYPHS = "·╵╷│╶└┌├╴┘┐┤─┴┬┼"
+UNKNOWN = " "
+PLAYER = "@"
+
+class ChunkCache:
+    """单个会话地图的分块缓存：{(分块x, 分块y): 行字符串元组}，绑定到建立时的 world 对象。"""
+    __slots__ = ("world", "tiles")
+
+    def __init__(self, world):
+        self.world = world
+        self.tiles = {}
+
+class MinimapRenderer:
+    """
+    ASCII 小地图渲染器。
+
+    每个已探索房间画成一个字符，字符的线条由房间的门掩码决定，因此一个分块的图块只取决于分块内的房间。
+    渲染时按玩家周围窗口取出相关分块的缓存图块切片拼接，只有未缓存或已作废的分块才会遍历房间重绘；
+    房间生成或修改时由 MapManager.room_changed 调用 invalidate 作废所在分块。
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, max_sessions: int = MAX_CACHED_SESSIONS):
+        self.chunk_size = chunk_size
+        self.max_sessions = max_sessions
+        self.caches = OrderedDict()
+
+    def _cache_for(self, session: dict) -> ChunkCache:
+        world = session["world"]
+        key = id(session)
+        cache = self.caches.get(key)
+        if cache is None or cache.world is not world:
+            cache = self.caches[key] = ChunkCache(world)
+            if len(self.caches) > self.max_sessions:
+                self.caches.popitem(last=False)
+        self.caches.move_to_end(key)
+        return cache
+
+    def invalidate(self, session: dict, coord: tuple) -> None:
+        """作废房间所在分块的图块（房间变化钩子）。"""
+        cache = self.caches.get(id(session))
+        if cache is not None:
+            cache.tiles.pop((coord[0] // self.chunk_size, coord[1] // self.chunk_size), None)
+
+    def _tile(self, cache: ChunkCache, chunk: tuple) -> tuple:
+        tile = cache.tiles.get(chunk)
+        if tile is None:
+            world = cache.world
+            size = self.chunk_size
+            x0, y0 = chunk[0] * size, chunk[1] * size
+            rows = []
+            for y in range(y0, y0 + size):
+                rows.append("".join(ROOM_GLYPHS[world[(x, y)]["doors"]] if (x, y) in world else UNKNOWN
+                                    for x in range(x0, x0 + size)))
+            tile = cache.tiles[chunk] = tuple(rows)
+        return tile
+
+    def render(self, session: dict, center: tuple, radius: int = DEFAULT_RADIUS) -> str:
+        """
+        渲染以 center 为中心的小地图，center 处以 "@" 标记。
+
+        Args:
+            session (dict): 会话数据。
+            center (tuple): 中心坐标（通常为玩家位置）。
+            radius (int, optional): 半径（房间数）。
+
+        Returns:
+            str: 多行字符串，北方在上。
+        """
+        cache = self._cache_for(session)
+        size = self.chunk_size
+        cx, cy = center
+        x_start, x_end = cx - radius, cx + radius + 1
+        first_chunk, last_chunk = x_start // size, (x_end - 1) // size
+        lines = []
+        for y in range(cy - radius, cy + radius + 1):
+            chunk_y, local_y = divmod(y, size)
+            row = "".join(self._tile(cache, (chunk_x, chunk_y))[local_y] for chunk_x in range(first_chunk, last_chunk + 1))
+            offset = x_start - first_chunk * size
+            row = row[offset:offset + 2 * radius + 1]
+            if y == cy:
+                row = row[:radius] + PLAYER + row[radius + 1:]
+            lines.append(row)
+        return "\n".join(lines)
+
+if __name__ == "__main__":
+    # 简单测试：随机游走后渲染，并检查缓存命中后的渲染耗时
+    import random
+    import timeit
+    from .map_gen import MapManager, DIRECTIONS
+    mm = MapManager({})
+    rng = random.Random(2)
+    session = {"log": [], "characters": {"p": {"position": (0, 0)}}}
+    mm.start_world(session, rng=rng)
+    for _ in range(2000):
+        mm.move_character(session, "p", rng.choice(DIRECTIONS), rng=rng)
+    position = session["characters"]["p"]["position"]
+    print(f"已探索 {len(session['world'])} 个房间，玩家位于 {position}")
+    print(mm.minimap.render(session, position))
+    seconds = timeit.timeit(lambda: mm.minimap.render(session, position), number=1000) / 1000
+    print(f"缓存命中时渲染耗时：{seconds * 1e6:.1f} 微秒")
@@ -0,0 +1,127 @@
+import heapq
+from collections import OrderedDict
+
+from .doors import OFFSETS, DOOR_DIRECTIONS, to_mask
+
+# 同时缓存邻接索引的会话数上限，超出时淘汰最久未使用的会话
+MAX_CACHED_SESSIONS = 256
+
+class PathIndex:
+    """
+    单个会话地图的寻路缓存：邻接索引与已求得的路径。
+
+    邻接索引只包含已探索的房间，房间的门掩码中某方向有门且该方向的相邻房间已存在时才有边。
+    索引与路径都绑定到建立时的 world 对象与 world_rev，地图变化后整体作废重建。
+    """
+    __slots__ = ("world", "rev", "adjacency", "paths")
+
+    def __init__(self, world: dict, rev: int):
+        self.world = world
+        self.rev = rev
+        self.adjacency = {}
+        for coord, room in world.items():
+            x, y = coord
+            edges = []
+            for direction in DOOR_DIRECTIONS[room["doors"]]:
+                dx, dy = OFFSETS[direction]
+                neighbor = (x + dx, y + dy)
+                if neighbor in world:
+                    edges.append((direction, neighbor))
+            self.adjacency[coord] = tuple(edges)
+        self.paths = {}
+
+    def search(self, start: tuple, goal: tuple):
+        """
+        A* 搜索（曼哈顿距离启发），结果按 (起点, 终点) 缓存。
+
+        Returns:
+            tuple | None: 依次移动的方向；起点即终点时为空元组，不可达时为 None。
+        """
+        key = (start, goal)
+        if key in self.paths:
+            return self.paths[key]
+        path = None
+        if start in self.adjacency and goal in self.adjacency:
+            gx, gy = goal
+            came_from = {start: None}
+            cost = {start: 0}
+            frontier = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start)]
+            while frontier:
+                _, steps, coord = heapq.heappop(frontier)
+                if coord == goal:
+                    path = []
+                    while came_from[coord] is not None:
+                        coord, direction = came_from[coord]
+                        path.append(direction)
+                    path = tuple(reversed(path))
+                    break
+                if steps > cost[coord]:
+                    continue
+                for direction, neighbor in self.adjacency[coord]:
+                    new_cost = steps + 1
+                    if new_cost < cost.get(neighbor, new_cost + 1):
+                        cost[neighbor] = new_cost
+                        came_from[neighbor] = (coord, direction)
+                        nx, ny = neighbor
+                        heapq.heappush(frontier, (new_cost + abs(nx - gx) + abs(ny - gy), new_cost, neighbor))
+        self.paths[key] = path
+        return path
+
+class PathFinder:
+    """按会话缓存 PathIndex，会话地图的 world_rev 变化（新房间生成）时重建。"""
+
+    def __init__(self, max_sessions: int = MAX_CACHED_SESSIONS):
+        self.max_sessions = max_sessions
+        self.indexes = OrderedDict()
+
+    def index_for(self, session: dict) -> PathIndex:
+        """取得（必要时重建）会话的寻路缓存。"""
+        world = session["world"]
+        rev = session.get("world_rev", 0)
+        key = id(session)
+        index = self.indexes.get(key)
+        if index is None or index.world is not world or index.rev != rev:
+            index = PathIndex(world, rev)
+            self.indexes[key] = index
+            if len(self.indexes) > self.max_sessions:
+                self.indexes.popitem(last=False)
+        self.indexes.move_to_end(key)
+        return index
+
+    def find_path(self, session: dict, start: tuple, goal: tuple):
+        """
+        在会话已探索的房间中寻找从 start 到 goal 的最短路线。
+
+        Args:
+            session (dict): 会话数据，需包含 world，world_rev 为地图版本号（缺省为 0）。
+            start (tuple): 起点坐标。
+            goal (tuple): 终点坐标。
+
+        Returns:
+            tuple | None: 依次移动的方向；不可达或任一端尚未探索时为 None。
+        """
+        return self.index_for(session).search(tuple(start), tuple(goal))
+
+def summarize_path(path: tuple) -> str:
+    """将方向序列压缩为 "north ×2 → east" 形式的描述。"""
+    parts = []
+    for direction in path:
+        if parts and parts[-1][0] == direction:
+            parts[-1][1] += 1
+        else:
+            parts.append([direction, 1])
+    return " → ".join(direction if count == 1 else f"{direction} ×{count}" for direction, count in parts)
+
+if __name__ == "__main__":
+    # 简单测试：3x3 网格，中间一列只有南北门
+    world = {}
+    for x in range(3):
+        for y in range(3):
+            doors = {"north": y > 0, "south": y < 2, "east": x < 2 and y != 1, "west": x > 0 and y != 1}
+            world[(x, y)] = {"coord": (x, y), "doors": to_mask(doors)}
+    session = {"world": world, "world_rev": 1}
+    finder = PathFinder()
+    path = finder.find_path(session, (0, 1), (2, 1))
+    print("路线：", summarize_path(path), path)
+    print("缓存命中：", finder.find_path(session, (0, 1), (2, 1)) is path)
+    print("未探索终点：", finder.find_path(session, (0, 0), (5, 5)))
@@ -0,0 +1,117 @@
+import cProfile
+import functools
+import os
+import time
+import tracemalloc
+
+from .logger import get_logger
+from .settings import resolve_settings
+
+class Profiler:
+    def __init__(self, config):
+        """
+        初始化采样剖析器。
+
+        仅在配置启用时由 RPGPlugin 挂接：命令处理器每 sample_every 次调用抽取一次在 cProfile 下运行，
+        persist_data 与 start_battle 在 tracemalloc 下记录内存分配峰值；剖析结果写入 output_dir，
+        超过 max_files 个文件时删除最旧的。未启用时不会挂接任何包装，没有额外开销。
+
+        注意：cProfile 在命令 await 期间同样会记录同一事件循环上其它协程的调用，分析时应留意。
+
+        Args:
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），读取其中 profiling 分组：
+                - enabled: 是否启用（默认 False）
+                - sample_every: 每多少次命令调用采样一次（默认 100）
+                - output_dir: 剖析文件输出目录（默认 "rpg_profiles"）
+                - max_files: 最多保留的剖析文件数（默认 50）
+                - trace_allocations: 是否跟踪 persist_data/start_battle 的内存峰值（默认 True）
+        """
+        settings = resolve_settings(config).profiling
+        # 挂接时使用的配置分组，热重载时据此判断是否需要重建
+        self.settings = settings
+        self.enabled = settings.enabled
+        self.sample_every = settings.sample_every
+        self.output_dir = settings.output_dir
+        self.max_files = settings.max_files
+        self.trace_allocations = settings.trace_allocations
+        self.logger = get_logger("profiling")
+        self.peaks = {}
+        self._counter = 0
+        self._active = False
+        self._started_tracing = False
+
+    def begin(self, name: str):
+        """
+        命令调用开始时调用；命中采样时返回已启用的 cProfile.Profile，否则返回 None。
+        同一时刻只剖析一个命令（cProfile 不支持多个剖析器同时启用）。
+        """
+        self._counter += 1
+        if self._counter < self.sample_every or self._active:
+            return None
+        self._counter = 0
+        self._active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def end(self, profile: cProfile.Profile, name: str) -> None:
+        """停止剖析并写出 .prof 文件（可用 pstats 或 snakeviz 离线分析）。"""
+        profile.disable()
+        self._active = False
+        path = self._artifact_path(name, "prof")
+        profile.dump_stats(path)
+        self.logger.debug("已写出剖析文件：%s", path)
+        self._rotate()
+
+    def track_allocations(self, name: str, func):
+        """
+        返回在 tracemalloc 下运行 func 的包装函数，记录每次调用的内存分配峰值；
+        出现新的最高峰值时写出分配热点报告。
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracing = True
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _, peak = tracemalloc.get_traced_memory()
+                growth = peak - before
+                if growth > self.peaks.get(name, 0):
+                    self.peaks[name] = growth
+                    self._dump_allocations(name, growth)
+        return wrapper
+
+    def close(self) -> None:
+        """解除挂接后调用：停止由本剖析器启动的 tracemalloc，之后的内存分配不再被跟踪。"""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+
+    def _dump_allocations(self, name: str, growth: int) -> None:
+        stats = tracemalloc.take_snapshot().statistics("lineno")[:25]
+        path = self._artifact_path(name, "alloc.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"{name} 峰值分配: {growth / 1024:.1f} KiB\n")
+            for stat in stats:
+                f.write(f"{stat}\n")
+        self.logger.info("%s 出现新的内存分配峰值 %.1f KiB，报告：%s", name, growth / 1024, path)
+        self._rotate()
+
+    def _artifact_path(self, name: str, suffix: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        safe_name = name.replace(".", "_")
+        return os.path.join(self.output_dir, f"{stamp}-{time.perf_counter_ns() % 1000000:06d}-{safe_name}.{suffix}")
+
+    def _rotate(self) -> None:
+        entries = [os.path.join(self.output_dir, f) for f in os.listdir(self.output_dir)]
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_files]:
+            os.remove(path)
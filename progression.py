@@ -0,0 +1,103 @@
+from bisect import bisect_right
+
+# 默认每升一级的属性成长（与早期硬编码的升级奖励一致）
+DEFAULT_STAT_GROWTH = {"max_hp": 10, "attack": 2, "defense": 1}
+
+class ProgressionTable:
+    """
+    预先计算的经验/等级曲线。
+
+    从 level 级升到 level + 1 级所需经验为 int(100 * level ^ exp_growth_factor)；
+    表中保存到达每一级所需的累计经验，一次获得大量经验时用二分查找直接定位最终等级，
+    属性成长同样按等级预先累计，跨多级升级只需一次差值计算。
+    角色数据沿用 level 与 exp（当前等级内已积累的经验）两个字段。
+    """
+    __slots__ = ("growth_factor", "max_level", "thresholds", "cumulative", "stat_totals")
+
+    def __init__(self, growth_factor: float = 1.2, max_level: int = 100,
+                 stat_growth: dict = None, level_overrides: dict = None):
+        """
+        Args:
+            growth_factor (float): 经验增长系数 exp_growth_factor。
+            max_level (int): 等级上限，达到上限后经验继续累积但不再升级。
+            stat_growth (dict, optional): 每升一级的属性成长，例如 {"max_hp": 10, "attack": 2, "defense": 1}；
+                max_hp 的成长同时恢复等量的当前 HP。
+            level_overrides (dict, optional): 特定等级的属性成长，覆盖 stat_growth，
+                键为升到的等级（整数或数字字符串），例如 {"10": {"attack": 5}}。
+        """
+        self.growth_factor = growth_factor
+        self.max_level = max(1, int(max_level))
+        stat_growth = DEFAULT_STAT_GROWTH if stat_growth is None else stat_growth
+        overrides = {int(level): gains for level, gains in (level_overrides or {}).items()}
+        # thresholds[level - 1]：从 level 级升到下一级所需经验
+        self.thresholds = tuple(int(100 * (level ** growth_factor)) for level in range(1, self.max_level))
+        # cumulative[level - 1]：从 1 级 0 经验到达 level 级所需的累计经验
+        cumulative = [0]
+        for required in self.thresholds:
+            cumulative.append(cumulative[-1] + required)
+        self.cumulative = tuple(cumulative)
+        # stat_totals[level - 1]：从 1 级升到 level 级获得的累计属性成长
+        totals = [{}]
+        for level in range(2, self.max_level + 1):
+            total = dict(totals[-1])
+            for stat, gain in overrides.get(level, stat_growth).items():
+                total[stat] = total.get(stat, 0) + gain
+            totals.append(total)
+        self.stat_totals = tuple(totals)
+
+    def required_exp(self, level: int) -> int:
+        """从 level 级升到下一级所需经验；已达等级上限时按公式计算（仅供展示）。"""
+        if 1 <= level < self.max_level:
+            return self.thresholds[level - 1]
+        return int(100 * (level ** self.growth_factor))
+
+    def level_for(self, total_exp: int) -> tuple:
+        """
+        根据累计经验定位等级。
+
+        Returns:
+            tuple: (等级, 当前等级内的剩余经验)。
+        """
+        level = bisect_right(self.cumulative, total_exp)
+        return level, total_exp - self.cumulative[level - 1]
+
+    def total_exp(self, char: dict) -> int:
+        """角色从 1 级 0 经验起累计获得的经验。"""
+        level = min(max(1, char.get("level", 1)), self.max_level)
+        return self.cumulative[level - 1] + char.get("exp", 0)
+
+    def gain_exp(self, char: dict, amount: int) -> tuple:
+        """
+        为角色增加经验并处理（可能跨越多级的）升级与属性成长，任何经验来源都应通过此方法结算。
+
+        Args:
+            char (dict): 角色数据，需包含 level 与 exp，会被原地修改。
+            amount (int): 获得的经验。
+
+        Returns:
+            tuple: (原等级, 新等级)。
+        """
+        old_level = char["level"]
+        if old_level >= self.max_level:
+            char["exp"] += amount
+            return old_level, old_level
+        total = self.cumulative[old_level - 1] + char["exp"] + amount
+        new_level, remainder = self.level_for(total)
+        char["level"] = new_level
+        char["exp"] = remainder
+        if new_level > old_level:
+            before = self.stat_totals[old_level - 1]
+            for stat, value in self.stat_totals[new_level - 1].items():
+                gain = value - before.get(stat, 0)
+                char[stat] = char.get(stat, 0) + gain
+                if stat == "max_hp":
+                    char["hp"] = char.get("hp", 0) + gain
+        return old_level, new_level
+
+if __name__ == "__main__":
+    # 简单测试：一次获得足以跨越多级的经验
+    table = ProgressionTable(1.2, max_level=50, level_overrides={"3": {"attack": 10}})
+    print("前 5 级升级所需经验：", table.thresholds[:5])
+    char = {"level": 1, "exp": 50, "hp": 100, "max_hp": 100, "attack": 10, "defense": 5}
+    print("获得 700 经验：", table.gain_exp(char, 700), char)
+    print("获得 5 经验：", table.gain_exp(char, 5), char)
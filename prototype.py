@@ -0,0 +1,175 @@
+import sys
+
+# 原型ID 以冒号分隔种类与参数，名称与描述模板以花括号填充实例字段：拼入其中的参数不能包含这些字符
+PROTOTYPE_RESERVED = (":", "{", "}")
+
+class Prototype:
+    """
+    物品原型：同一类物品共享的名称模板、描述模板与效果等不变数据。
+
+    名称与描述均为 str.format 模板，渲染时以实例字段（如 damage、bonus、value）填充。
+    """
+    __slots__ = ("proto_id", "kind", "name", "description", "effect")
+
+    def __init__(self, proto_id: str, kind: str, name: str, description: str, effect: str = None):
+        self.proto_id = proto_id
+        self.kind = kind
+        self.name = name
+        self.description = description
+        self.effect = effect
+
+class PrototypeRegistry:
+    def __init__(self):
+        """
+        初始化原型注册表。
+
+        每个物品实例只保存 {"proto": 原型ID, 以及掷出的数值和升级状态}，
+        名称与描述在展示时由原型模板惰性渲染。原型ID形如 "weapon:锋利的:剑"，
+        冒号前为种类，其余部分交给该种类的构造函数还原原型，因此从存档中读回的
+        任意原型ID 都能在不依赖当前配置的情况下被渲染。
+        """
+        self._builders = {}
+        self._prototypes = {}
+
+    def register_builder(self, kind: str, builder) -> None:
+        """
+        注册某一种类的原型构造函数。
+
+        Args:
+            kind (str): 原型种类，例如 "weapon"、"rune"、"item"。
+            builder (callable): 接收原型ID中的参数部分，返回 (名称模板, 描述模板, 效果) 三元组。
+        """
+        self._builders[kind] = builder
+
+    def resolve(self, kind: str, *parts: str) -> str:
+        """
+        返回由种类与参数组成的原型ID（驻留字符串），必要时创建原型。
+
+        Args:
+            kind (str): 原型种类。
+            *parts (str): 原型参数，例如武器的形容词与类型。
+
+        Returns:
+            str: 驻留后的原型ID。
+
+        Raises:
+            ValueError: 参数包含 PROTOTYPE_RESERVED 中的字符，拼成的原型ID 无法按原参数还原。
+        """
+        for part in parts:
+            if any(c in part for c in PROTOTYPE_RESERVED):
+                raise ValueError(f"原型参数不能包含 {' '.join(PROTOTYPE_RESERVED)}：{part}")
+        proto_id = ":".join((kind,) + parts)
+        proto = self._prototypes.get(proto_id)
+        if proto is None:
+            proto = self._build(proto_id)
+        return proto.proto_id
+
+    def get(self, proto_id: str) -> Prototype:
+        """
+        根据原型ID 获取原型，未缓存的ID 会通过对应种类的构造函数还原。
+        """
+        proto = self._prototypes.get(proto_id)
+        if proto is None:
+            proto = self._build(proto_id)
+        return proto
+
+    def _build(self, proto_id: str) -> Prototype:
+        kind, _, args = proto_id.partition(":")
+        builder = self._builders.get(kind)
+        if builder is None:
+            raise KeyError(f"未知的原型种类：{kind}")
+        parts = args.split(":") if args else []
+        name, description, effect = builder(*parts)
+        proto_id = sys.intern(proto_id)
+        proto = Prototype(proto_id, sys.intern(kind), sys.intern(name), sys.intern(description), effect)
+        self._prototypes[proto_id] = proto
+        return proto
+
+    def create(self, proto_id: str, **fields) -> dict:
+        """
+        创建一个只包含原型ID 与实例差量字段的物品实例。
+
+        Args:
+            proto_id (str): 由 resolve 返回的原型ID。
+            **fields: 实例字段，例如 damage、bonus、value、upgrade_level 等。
+
+        Returns:
+            dict: 紧凑的物品实例。
+        """
+        instance = {"proto": proto_id}
+        instance.update(fields)
+        return instance
+
+    def name(self, instance) -> str:
+        """
+        渲染物品名称。兼容旧存档中直接保存了 name 字段的完整字典以及纯字符串物品。
+        """
+        if not isinstance(instance, dict):
+            return str(instance)
+        proto_id = instance.get("proto")
+        if proto_id is None:
+            return instance.get("name", "")
+        return self.get(proto_id).name.format_map(instance)
+
+    def description(self, instance) -> str:
+        """
+        渲染物品描述；若武器附加了符文，则在描述末尾注明最后附加的符文名称。
+        """
+        if not isinstance(instance, dict):
+            return ""
+        proto_id = instance.get("proto")
+        if proto_id is None:
+            return instance.get("description", "")
+        desc = self.get(proto_id).description.format_map(instance)
+        extra_effects = instance.get("extra_effects")
+        if extra_effects:
+            desc += f", 附加 {self.name(extra_effects[-1])}"
+        return desc
+
+    def effect(self, instance):
+        """返回物品效果（例如 "heal"、"money"），兼容旧格式字典。"""
+        proto_id = instance.get("proto")
+        if proto_id is None:
+            return instance.get("effect")
+        return self.get(proto_id).effect
+
+    def kind(self, instance) -> str:
+        """返回物品种类，兼容旧格式字典中的 type 字段。"""
+        proto_id = instance.get("proto")
+        if proto_id is None:
+            return instance.get("type")
+        return self.get(proto_id).kind
+
+    def expand(self, instance: dict) -> dict:
+        """
+        将紧凑实例展开为包含 name、description、effect 的完整字典，便于展示或调试。
+        """
+        if instance.get("proto") is None:
+            return dict(instance)
+        full = dict(instance)
+        full["name"] = self.name(instance)
+        full["description"] = self.description(instance)
+        full["effect"] = self.effect(instance)
+        return full
+
+def intern_prototype_ids(obj: dict) -> dict:
+    """
+    json.load 的 object_hook：驻留读回的原型ID，使同一原型的所有实例共享同一个字符串对象。
+    """
+    proto_id = obj.get("proto")
+    if proto_id is not None:
+        obj["proto"] = sys.intern(proto_id)
+    return obj
+
+# 全局原型注册表，由各物品模块在导入时注册各自种类的构造函数
+PROTOTYPES = PrototypeRegistry()
+
+if __name__ == "__main__":
+    # 简单测试
+    registry = PrototypeRegistry()
+    registry.register_builder("weapon", lambda adjective, weapon_type: (f"{adjective}{weapon_type}", "伤害 {damage}", None))
+    pid = registry.resolve("weapon", "锋利的", "剑")
+    weapon = registry.create(pid, damage=7, level=1, upgrade_level=0)
+    print("紧凑实例：", weapon)
+    print("渲染名称：", registry.name(weapon))
+    print("展开实例：", registry.expand(weapon))
@@ -0,0 +1,120 @@
+import os
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时批量抽样退回纯 Python 实现
+    np = None
+
+class SessionRNG(random.Random):
+    """
+    单个会话独立的随机数流。
+
+    由 (seed, counter) 唯一确定：每条命令开始时 counter 加一，并以 "seed:counter" 重新播种，
+    因此只需保存这两个整数即可在任意命令处精确复现随机序列，无需保存完整的 Mersenne Twister 状态。
+    继承 random.Random，randint/random/choice 等接口与 random 模块一致，可直接替代全局 random 传入各管理器。
+    """
+
+    def __init__(self, seed: int, counter: int = 0):
+        super().__init__()
+        self.base_seed = seed
+        self.counter = counter
+        self._reseed()
+
+    def _reseed(self) -> None:
+        super().seed(f"{self.base_seed}:{self.counter}")
+
+    def advance(self) -> "SessionRNG":
+        """进入下一条命令的随机流，返回自身便于链式调用。"""
+        self.counter += 1
+        self._reseed()
+        return self
+
+    def checkpoint(self) -> dict:
+        """返回可 JSON 序列化的检查点，随会话数据一起保存。"""
+        return {"seed": self.base_seed, "counter": self.counter}
+
+    def restore(self, checkpoint: dict) -> "SessionRNG":
+        """恢复到检查点对应的命令起始位置。"""
+        self.base_seed = checkpoint["seed"]
+        self.counter = checkpoint["counter"]
+        self._reseed()
+        return self
+
+    def integers(self, low: int, high: int, size: int):
+        """
+        批量抽取 [low, high] 闭区间内的整数。
+
+        安装了 NumPy 时使用由当前流派生种子的 PCG64 生成器一次性抽样并返回 numpy 数组，
+        否则返回列表。两种实现都只消耗本会话流中的随机数，结果可复现。
+        """
+        if np is not None:
+            return np.random.Generator(np.random.PCG64(self.getrandbits(64))).integers(low, high + 1, size=size)
+        randint = self.randint
+        return [randint(low, high) for _ in range(size)]
+
+class RNGService:
+    def __init__(self, master_seed: int = None):
+        """
+        初始化随机数服务，为每个会话分配独立、可检查点的随机数流。
+
+        Args:
+            master_seed (int, optional): 主种子。设置后新会话的种子由主种子与会话ID 派生，
+                                         整个插件的随机行为完全可复现；为空时使用系统熵。
+        """
+        self.master_seed = master_seed
+        self._streams = {}
+
+    def _new_seed(self, session_id: str) -> int:
+        if self.master_seed is None:
+            return int.from_bytes(os.urandom(8), "big")
+        return random.Random(f"{self.master_seed}:{session_id}").getrandbits(64)
+
+    def for_session(self, session_id: str, session: dict) -> SessionRNG:
+        """
+        获取会话的随机数流；首次访问时从 session["rng"] 检查点恢复，没有检查点则新建并写入。
+
+        Args:
+            session_id (str): 会话ID。
+            session (dict): 会话数据，检查点保存在其 "rng" 键中。
+
+        Returns:
+            SessionRNG: 会话随机数流。
+        """
+        stream = self._streams.get(session_id)
+        if stream is None:
+            checkpoint = session.get("rng")
+            if checkpoint:
+                stream = SessionRNG(checkpoint["seed"], checkpoint["counter"])
+            else:
+                stream = SessionRNG(self._new_seed(session_id))
+                session["rng"] = stream.checkpoint()
+            self._streams[session_id] = stream
+        return stream
+
+    def begin_command(self, session_id: str, session: dict) -> SessionRNG:
+        """
+        为一条新命令推进会话随机数流，并把新的检查点写回会话数据。
+
+        Returns:
+            SessionRNG: 已定位到本条命令起点的随机数流。
+        """
+        stream = self.for_session(session_id, session).advance()
+        session["rng"] = stream.checkpoint()
+        return stream
+
+    def drop(self, session_id: str) -> None:
+        """丢弃会话的缓存随机数流（例如会话被删除时）。"""
+        self._streams.pop(session_id, None)
+
+if __name__ == "__main__":
+    # 简单测试：同一检查点复现相同的随机序列
+    service = RNGService(master_seed=42)
+    session = {}
+    rng = service.begin_command("session_test", session)
+    first = [rng.randint(1, 20) for _ in range(5)]
+    replay = SessionRNG(0).restore(session["rng"])
+    print("检查点：", session["rng"])
+    print("原始序列：", first)
+    print("复现序列：", [replay.randint(1, 20) for _ in range(5)])
+    print("批量抽样：", list(rng.integers(1, 6, 5)))
@@ -1,55 +1,70 @@
 import random
+from .prototype import PROTOTYPES
+from .settings import resolve_settings
+
+def _rune_prototype(rune_type: str, adjective: str) -> tuple:
+    """符文原型：名称由形容词和符文类型拼接而成，描述随 bonus 渲染。"""
+    return f"{adjective}{rune_type.capitalize()}符文", f"增加 {{bonus}} 点 {rune_type} 属性", rune_type
+
+PROTOTYPES.register_builder("rune", _rune_prototype)
 
 class RuneManager:
-    def __init__(self, config: dict):
+    def __init__(self, config):
         """
         初始化符文管理器。
 
         Args:
-            config (dict): 配置字典，包含符文相关参数，例如：
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），使用其中的符文分组：
                 - "rune_types": 可生成的符文类型列表，例如 ["fire", "ice", "poison", "generic"]
                 - "rune_adjectives": 符文形容词列表，例如 ["炽热的", "寒冰的", "剧毒的", "神秘的"]
                 - "bonus_range": 数值范围，例如 [1, 5]，表示符文增加的数值范围
                 - "rune_upgrade_factor": 符文升级时增加的倍率，例如 1.2
                 - "max_rune_upgrade_level": 符文最大升级次数，例如 5
         """
-        self.config = config
-        self.rune_types = config.get("rune_types", ["fire", "ice", "poison", "generic"])
-        self.rune_adjectives = config.get("rune_adjectives", ["炽热的", "寒冰的", "剧毒的", "神秘的"])
-        self.bonus_range = config.get("bonus_range", [1, 5])
-        self.rune_upgrade_factor = config.get("rune_upgrade_factor", 1.2)
-        self.max_rune_upgrade_level = config.get("max_rune_upgrade_level", 5)
-
-    def generate_rune(self, rune_type: str = None) -> dict:
+        self.configure(resolve_settings(config))
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.rune
+        self.rune_types = self.settings.rune_types
+        self.rune_adjectives = self.settings.rune_adjectives
+        self.bonus_range = self.settings.bonus_range
+        self.rune_upgrade_factor = self.settings.rune_upgrade_factor
+        self.max_rune_upgrade_level = self.settings.max_rune_upgrade_level
+
+    def generate_rune(self, rune_type: str = None, rng=None) -> dict:
         """
         随机生成一个符文数据字典。
 
         Args:
-            rune_type (str, optional): 指定符文类型，例如 "fire", "ice", "poison", "generic"；若未指定则随机选择。
+            rune_type (str, optional): 指定符文类型，必须是配置的 rune_types 之一，例如 "fire", "ice", "poison", "generic"；
+                                       若未指定则随机选择。
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
 
         Returns:
-            dict: 包含以下字段：
-                - "type": 符文类型
-                - "name": 符文名称，由形容词和符文类型拼接而成
+            dict: 紧凑的符文实例，名称与描述由原型注册表惰性渲染，包含以下字段：
+                - "proto": 原型ID，对应符文类型与形容词（名称如 "炽热的Fire符文"，描述如 "增加 X 点 fire 属性"），
+                           符文类型即原型的效果字段，可通过 PROTOTYPES.effect 获取
                 - "bonus": 增加的数值（例如额外伤害加成）
-                - "description": 描述符文效果，如 "增加 X 点 fire 属性"
                 - "level": 符文当前级别（初始 1）
                 - "upgrade_level": 已升级次数（初始 0）
+
+        Raises:
+            ValueError: 指定的符文类型不在配置的 rune_types 中（类型会拼入原型ID，未经配置校验的名称可能使其无法解析）。
         """
+        rng = rng or random
         if not rune_type:
-            rune_type = random.choice(self.rune_types)
-        adjective = random.choice(self.rune_adjectives)
-        bonus = random.randint(self.bonus_range[0], self.bonus_range[1])
-        name = f"{adjective}{rune_type.capitalize()}符文"
-        description = f"增加 {bonus} 点 {rune_type} 属性"
-        rune = {
-            "type": rune_type,
-            "name": name,
-            "bonus": bonus,
-            "description": description,
-            "level": 1,
-            "upgrade_level": 0
-        }
+            rune_type = rng.choice(self.rune_types)
+        elif rune_type not in self.rune_types:
+            raise ValueError(f"未知的符文类型：{rune_type}，可选类型：{', '.join(self.rune_types)}")
+        adjective = rng.choice(self.rune_adjectives)
+        bonus = rng.randint(self.bonus_range[0], self.bonus_range[1])
+        rune = PROTOTYPES.create(
+            PROTOTYPES.resolve("rune", rune_type, adjective),
+            bonus=bonus,
+            level=1,
+            upgrade_level=0
+        )
         return rune
 
     def upgrade_rune(self, rune: dict, upgrade_points: int) -> dict:
@@ -74,8 +89,9 @@ class RuneManager:
         new_bonus = int(rune["bonus"] * (self.rune_upgrade_factor ** upgrade_times))
         rune["bonus"] = new_bonus
         rune["upgrade_level"] = current_upgrade + upgrade_times
-        # 更新描述文本
-        rune["description"] = f"增加 {new_bonus} 点 {rune['type']} 属性"
+        # 旧格式字典需更新描述文本，紧凑实例的描述由原型惰性渲染
+        if "proto" not in rune:
+            rune["description"] = f"增加 {new_bonus} 点 {rune['type']} 属性"
         return rune
 
     def describe_rune(self, rune: dict) -> str:
@@ -88,8 +104,8 @@ class RuneManager:
         Returns:
             str: 符文描述信息。
         """
-        return (f"{rune['name']} (等级: {rune['level']}, 升级次数: {rune['upgrade_level']}, "
-                f"效果: {rune['description']})")
+        return (f"{PROTOTYPES.name(rune)} (等级: {rune['level']}, 升级次数: {rune['upgrade_level']}, "
+                f"效果: {PROTOTYPES.description(rune)})")
 
 if __name__ == "__main__":
     # 简单测试示例
@@ -109,3 +125,8 @@ if __name__ == "__main__":
     upgraded_rune = rm.upgrade_rune(rune, upgrade_points=3)
     print("升级后的符文：")
     print(rm.describe_rune(upgraded_rune))
+    # 未配置的符文类型（包括含原型ID 分隔符的名称）被拒绝
+    try:
+        rm.generate_rune("fire:x")
+    except ValueError as e:
+        print("拒绝：", e)
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from .settings import resolve_settings
+
+class SessionBusyError(Exception):
+    """会话排队中的命令已达上限时抛出。"""
+
+class SessionLockManager:
+    def __init__(self, config):
+        """
+        初始化会话锁管理器。
+
+        每个会话一把 asyncio.Lock（先到先得），同一会话的命令串行、原子地执行，
+        不同会话之间完全并行。每个会话同时排队（含正在执行）的命令数有上限，
+        超出时直接拒绝，避免刷屏命令无限堆积。
+
+        Args:
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），读取其中 session_lock 分组：
+                - max_pending_commands: 单个会话允许排队的最大命令数（默认 8）
+        """
+        self.configure(resolve_settings(config))
+        self._locks = {}
+        self._pending = {}
+        # 等待时间统计（秒）
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照：新的排队上限对之后进入的命令生效，已排队的命令不受影响"""
+        self.max_pending = settings.session_lock.max_pending_commands
+
+    @asynccontextmanager
+    async def hold(self, session_id: str):
+        """
+        在会话锁内执行一段代码：async with manager.hold(session_id) as wait: ...
+
+        Args:
+            session_id (str): 会话ID。
+
+        Yields:
+            float: 本次获取锁的等待时间（秒）。
+
+        Raises:
+            SessionBusyError: 会话排队命令数已达上限。
+        """
+        pending = self._pending.get(session_id, 0)
+        if pending >= self.max_pending:
+            self.rejected += 1
+            raise SessionBusyError(session_id)
+        self._pending[session_id] = pending + 1
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        start = time.perf_counter()
+        try:
+            await lock.acquire()
+        except BaseException:
+            self._release_slot(session_id)
+            raise
+        wait = time.perf_counter() - start
+        self.acquired += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+        try:
+            yield wait
+        finally:
+            lock.release()
+            self._release_slot(session_id)
+
+    def _release_slot(self, session_id: str) -> None:
+        pending = self._pending[session_id] - 1
+        if pending:
+            self._pending[session_id] = pending
+        else:
+            # 没有执行中或排队的命令时回收锁，避免会话数增长导致锁表无限膨胀
+            del self._pending[session_id]
+            self._locks.pop(session_id, None)
+
+    def pending(self, session_id: str) -> int:
+        """返回会话当前排队（含正在执行）的命令数。"""
+        return self._pending.get(session_id, 0)
+
+    def stats(self) -> dict:
+        """
+        返回锁等待统计。
+
+        Returns:
+            dict: acquired（获取次数）、rejected（被拒绝次数）、avg_wait_ms、max_wait_ms、active_sessions。
+        """
+        return {
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.total_wait / self.acquired * 1000 if self.acquired else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+            "active_sessions": len(self._locks)
+        }
+
+if __name__ == "__main__":
+    # 简单测试：同一会话串行，不同会话并行
+    from .settings import compile_settings
+
+    async def demo():
+        manager = SessionLockManager({"session_lock": {"max_pending_commands": 3}})
+        order = []
+
+        async def command(session_id, tag):
+            try:
+                async with manager.hold(session_id):
+                    order.append(f"{tag} 开始")
+                    await asyncio.sleep(0.01)
+                    order.append(f"{tag} 结束")
+            except SessionBusyError:
+                order.append(f"{tag} 被拒绝")
+
+        await asyncio.gather(*(command("A", f"A{i}") for i in range(4)), command("B", "B0"))
+        # 热重载放宽上限后，同样的突发不再被拒绝
+        manager.configure(compile_settings({"session_lock": {"max_pending_commands": 4}}))
+        await asyncio.gather(*(command("A", f"A{i}") for i in range(4, 8)))
+        print("\n".join(order))
+        print("统计：", manager.stats())
+
+    asyncio.run(demo())
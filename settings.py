@@ -0,0 +1,566 @@
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+
+from .element import ElementModel
+from .logger import get_logger
+from .progression import ProgressionTable
+from .prototype import PROTOTYPE_RESERVED
+from .skill_engine import compile_skill_db
+
+# 配置模式文件，与插件代码位于同一目录
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_conf_schema.json")
+
+# 整体替换而非逐项合并的 object 配置（数据表），其余 object 配置视为设置分组
+DATA_TABLES = {"skill_db"}
+
+# 旧版配置键名 -> 模式中的键名
+ALIASES = {"default_skill_db": "skill_db"}
+
+logger = get_logger("settings")
+
+@dataclass(frozen=True)
+class CharacterSettings:
+    hp: int
+    attack: int
+    defense: int
+    magic_attack: int
+    magic_defense: int
+    poison: int
+    fire: int
+    ice: int
+    default_weapon_damage: int
+    starting_skill: str
+    mp: int
+
+@dataclass(frozen=True)
+class WeaponSettings:
+    weapon_types: tuple
+    weapon_adjectives: tuple
+    damage_range: tuple
+    upgrade_factor: float
+    max_upgrade_level: int
+
+@dataclass(frozen=True)
+class MapSettings:
+    door_probability: float
+    item_probability: float
+    room_descriptions: tuple
+    shared_world: bool
+
+@dataclass(frozen=True)
+class ItemSettings:
+    potion_range: tuple
+    gold_range: tuple
+    skill_list: tuple
+    item_types: tuple
+
+@dataclass(frozen=True)
+class RuneSettings:
+    rune_types: tuple
+    rune_adjectives: tuple
+    bonus_range: tuple
+    rune_upgrade_factor: float
+    max_rune_upgrade_level: int
+
+@dataclass(frozen=True)
+class LootSettings:
+    drop_rates: MappingProxyType
+    # 累计掉落概率（升序）及对应的物品类型，按随机数二分查找掉落类型
+    drop_thresholds: tuple
+    drop_types: tuple
+    gold_range: tuple
+    potion_range: tuple
+
+@dataclass(frozen=True)
+class SkillSettings:
+    skill_db: MappingProxyType
+    # 技能名 -> skill_engine.CompiledSkill，释放技能时直接执行编译好的效果管线
+    compiled: MappingProxyType
+
+@dataclass(frozen=True)
+class LLMSettings:
+    system_prompt: str
+    temperature: float
+
+@dataclass(frozen=True)
+class CombatSettings:
+    exp_growth_factor: float
+    dice_sides: int
+    mp_regen: int
+
+@dataclass(frozen=True)
+class MetricsSettings:
+    prometheus_file: str
+    export_interval: float
+
+@dataclass(frozen=True)
+class ExecutorSettings:
+    # 线程池在插件启动时创建，修改后需重启插件
+    enabled: bool
+    max_workers: int
+    offload_threshold_ms: float
+
+@dataclass(frozen=True)
+class StorageSettings:
+    # 存档引擎在插件启动时打开，修改后需重启插件
+    engine: str
+    sqlite_file: str
+
+@dataclass(frozen=True)
+class ThrottleSettings:
+    enabled: bool
+    user_rate: float
+    user_burst: int
+    session_rate: float
+    session_burst: int
+    # 命令名 -> 消耗的令牌数（模式默认值与配置合并）
+    costs: MappingProxyType
+    batch_moves: bool
+
+@dataclass(frozen=True)
+class EventLogSettings:
+    enabled: bool
+    snapshot_interval: int
+    max_file_mb: int
+
+@dataclass(frozen=True)
+class SessionLockSettings:
+    max_pending_commands: int
+
+@dataclass(frozen=True)
+class LoggingSettings:
+    # 日志级别已解析为 logging 模块的数值级别
+    level: int
+    # 模块名 -> 日志级别
+    levels: MappingProxyType
+    message_sample_rate: float
+    # 是否由插件自行输出到 stdout（不再传播到宿主的日志处理器）
+    console: bool
+
+@dataclass(frozen=True)
+class ProfilingSettings:
+    enabled: bool
+    sample_every: int
+    output_dir: str
+    max_files: int
+    trace_allocations: bool
+
+@dataclass(frozen=True)
+class GameSettings:
+    """编译后的只读配置快照，各管理器在初始化或热重载时从中取出自己的分组。"""
+    character: CharacterSettings
+    weapon: WeaponSettings
+    map: MapSettings
+    item: ItemSettings
+    rune: RuneSettings
+    loot: LootSettings
+    skill: SkillSettings
+    llm: LLMSettings
+    combat: CombatSettings
+    # 经验/等级曲线，战斗及其它经验来源共用
+    progression: ProgressionTable
+    # 元素伤害模型（元素顺序与抗性矩阵）
+    elements: ElementModel
+    metrics: MetricsSettings
+    executor: ExecutorSettings
+    storage: StorageSettings
+    throttle: ThrottleSettings
+    event_log: EventLogSettings
+    session_lock: SessionLockSettings
+    logging: LoggingSettings
+    profiling: ProfilingSettings
+    rng_seed: int
+    # 归一化后配置的摘要，事件日志快照据此判断重放时的配置是否与记录时一致
+    fingerprint: str = ""
+    # 校验过程中发现并已回退为默认值的问题
+    warnings: tuple = ()
+
+@lru_cache(maxsize=None)
+def load_schema() -> dict:
+    """读取配置模式（只读取一次）。"""
+    with open(SCHEMA_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _type_matches(value, default) -> bool:
+    """以默认值的类型作为期望类型：整数可用于浮点配置，布尔值不视为数字。"""
+    if isinstance(default, bool) or isinstance(value, bool):
+        return isinstance(value, bool) and isinstance(default, bool)
+    if isinstance(default, float):
+        return isinstance(value, (int, float))
+    if isinstance(default, int):
+        return isinstance(value, int)
+    if default is None:
+        return True
+    return isinstance(value, type(default))
+
+def _check(path: str, value, default, warnings: list):
+    """类型不符时记录问题并回退为默认值。"""
+    if _type_matches(value, default):
+        return value
+    warnings.append(f"{path} 类型应为 {type(default).__name__}，实际为 {type(value).__name__}，已使用默认值")
+    return default
+
+def normalize_config(config: dict) -> tuple:
+    """
+    按配置模式校验并归一化配置。
+
+    支持两种写法：模式中的嵌套分组（如 config["map"]["door_probability"]），
+    以及旧版的扁平键（如 config["door_probability"]），嵌套分组中的值优先。
+    旧键名 default_skill_db 视为 skill_db 的别名。缺失项使用模式默认值，类型不符时回退为默认值。
+
+    Args:
+        config (dict): 原始配置（AstrBot 传入的插件配置或测试用的字典）。
+
+    Returns:
+        tuple: (normalized, warnings)，normalized 与模式同结构且每一项都已填充，warnings 为问题描述列表。
+    """
+    schema = load_schema()
+    config = dict(config or {})
+    for alias, key in ALIASES.items():
+        if alias in config and key not in config:
+            config[key] = config[alias]
+    normalized = {}
+    warnings = []
+    for key, spec in schema.items():
+        default = spec.get("default")
+        if spec.get("type") == "object" and key not in DATA_TABLES:
+            group = config.get(key)
+            if not isinstance(group, dict):
+                if group is not None:
+                    warnings.append(f"{key} 应为分组对象，已忽略")
+                group = {}
+            merged = {}
+            for sub_key, sub_default in default.items():
+                if sub_key in group:
+                    value = group[sub_key]
+                else:
+                    value = config.get(sub_key, sub_default)
+                merged[sub_key] = _check(f"{key}.{sub_key}", value, sub_default, warnings)
+            for sub_key in group.keys() - default.keys():
+                warnings.append(f"未知配置项 {key}.{sub_key}，已忽略")
+            normalized[key] = merged
+        else:
+            normalized[key] = _check(key, config.get(key, default), default, warnings)
+    return normalized, warnings
+
+def _range(path: str, value, default, warnings: list) -> tuple:
+    """校验 [最小值, 最大值] 形式的范围配置。"""
+    if len(value) == 2 and all(isinstance(v, (int, float)) for v in value) and value[0] <= value[1]:
+        return tuple(value)
+    warnings.append(f"{path} 应为 [最小值, 最大值]，已使用默认值")
+    return tuple(default)
+
+def _probability(path: str, value, default, warnings: list) -> float:
+    if 0 <= value <= 1:
+        return value
+    warnings.append(f"{path} 应在 0 到 1 之间，已使用默认值")
+    return default
+
+def _non_empty(path: str, value, default, warnings: list) -> tuple:
+    if value:
+        return tuple(value)
+    warnings.append(f"{path} 不能为空，已使用默认值")
+    return tuple(default)
+
+def _prototype_parts(path: str, value, default, warnings: list) -> tuple:
+    """
+    校验会拼入原型ID 与名称模板的名称列表（武器、符文、物品类型等）：原型ID 以冒号分隔参数，
+    名称模板以花括号填充实例字段，因此名称不能包含这些字符；不合法的名称被忽略，全部被忽略时使用默认值。
+    """
+    parts = tuple(part for part in value if isinstance(part, str) and not any(c in part for c in PROTOTYPE_RESERVED))
+    if len(parts) < len(value):
+        warnings.append(f"{path} 中的名称必须为字符串且不能包含 {' '.join(PROTOTYPE_RESERVED)}，已忽略不合法的名称")
+    return _non_empty(path, parts, default, warnings)
+
+def _positive(path: str, value, default, warnings: list):
+    if value > 0:
+        return value
+    warnings.append(f"{path} 必须大于 0，已使用默认值")
+    return default
+
+def _at_least(path: str, value, minimum, default, warnings: list):
+    """校验数值下限（含），不满足时回退为默认值。"""
+    if value >= minimum:
+        return value
+    warnings.append(f"{path} 不能小于 {minimum}，已使用默认值")
+    return default
+
+def _stat_table(path: str, value: dict, default: dict, warnings: list) -> dict:
+    """校验 {属性: 成长值} 形式的属性成长表。"""
+    if all(isinstance(gain, (int, float)) and not isinstance(gain, bool) for gain in value.values()):
+        return dict(value)
+    warnings.append(f"{path} 的成长值必须为数字，已使用默认值")
+    return dict(default)
+
+def _element_model(group: dict, default: dict, warnings: list) -> ElementModel:
+    """校验元素列表与交叉抗性权重并构建元素模型。"""
+    names = group["names"]
+    if not names or not all(isinstance(name, str) for name in names) or len(set(names)) != len(names):
+        warnings.append("elements.names 应为不重复的元素名称列表，已使用默认值")
+        names = default["names"]
+    cross = {}
+    for attack, row in group["cross_resistance"].items():
+        if attack not in names or not isinstance(row, dict):
+            warnings.append(f"elements.cross_resistance.{attack} 不是已配置的元素或不是 {{抗性元素: 权重}}，已忽略")
+            continue
+        for resist, weight in row.items():
+            if resist in names and isinstance(weight, (int, float)) and not isinstance(weight, bool):
+                cross.setdefault(attack, {})[resist] = weight
+            else:
+                warnings.append(f"elements.cross_resistance.{attack}.{resist} 无效，已忽略")
+    return ElementModel(tuple(names), cross)
+
+def _log_level(path: str, value, default: int, warnings: list) -> int:
+    """校验日志级别名称（如 "DEBUG"），返回数值级别。"""
+    level = logging.getLevelName(value.upper()) if isinstance(value, str) else None
+    if isinstance(level, int):
+        return level
+    warnings.append(f"{path} 不是有效的日志级别：{value}，已使用默认值")
+    return default
+
+def _throttle_costs(value: dict, default: dict, warnings: list) -> dict:
+    """校验 {命令: 令牌数} 形式的命令代价表，与默认代价合并。"""
+    costs = dict(default)
+    for command, cost in value.items():
+        if isinstance(cost, (int, float)) and not isinstance(cost, bool) and cost >= 0:
+            costs[command] = cost
+        else:
+            warnings.append(f"throttle.costs.{command} 应为非负数，已使用默认值")
+    return costs
+
+def compile_settings(config: dict) -> GameSettings:
+    """
+    将原始配置编译为只读的 GameSettings：校验模式、合并扁平与嵌套写法、
+    把列表冻结为元组，预先计算累计掉落概率、经验/等级曲线与元素抗性矩阵，并把技能编译为效果管线。
+    发现的问题会记录为警告日志并回退为默认值，不会中断插件启动。
+
+    Args:
+        config (dict): 原始配置。
+
+    Returns:
+        GameSettings: 编译后的配置快照。
+    """
+    schema = load_schema()
+    defaults = {key: spec.get("default") for key, spec in schema.items()}
+    values, warnings = normalize_config(config)
+    weapon, map_group, item, rune, loot, llm, metrics = (
+        values["weapon"], values["map"], values["item"], values["rune"],
+        values["loot"], values["llm"], values["metrics"])
+
+    item_skills = _non_empty("item.skill_list", item["skill_list"], defaults["item"]["skill_list"], warnings)
+    character = CharacterSettings(
+        hp=values["default_character_hp"],
+        attack=values["default_character_attack"],
+        defense=values["default_character_defense"],
+        magic_attack=values["default_magic_attack"],
+        magic_defense=values["default_magic_defense"],
+        poison=values["default_poison"],
+        fire=values["default_fire"],
+        ice=values["default_ice"],
+        default_weapon_damage=weapon["default_weapon_damage"],
+        starting_skill=item_skills[0],
+        mp=values["default_character_mp"]
+    )
+    weapon_settings = WeaponSettings(
+        weapon_types=_prototype_parts("weapon.weapon_types", weapon["weapon_types"], defaults["weapon"]["weapon_types"], warnings),
+        weapon_adjectives=_prototype_parts("weapon.weapon_adjectives", weapon["weapon_adjectives"], defaults["weapon"]["weapon_adjectives"], warnings),
+        damage_range=_range("weapon.damage_range", weapon["damage_range"], defaults["weapon"]["damage_range"], warnings),
+        upgrade_factor=_positive("weapon.upgrade_factor", weapon["upgrade_factor"], defaults["weapon"]["upgrade_factor"], warnings),
+        max_upgrade_level=_at_least("weapon.max_upgrade_level", weapon["max_upgrade_level"], 0,
+                                    defaults["weapon"]["max_upgrade_level"], warnings)
+    )
+    map_settings = MapSettings(
+        door_probability=_probability("map.door_probability", map_group["door_probability"], defaults["map"]["door_probability"], warnings),
+        item_probability=_probability("map.item_probability", map_group["item_probability"], defaults["map"]["item_probability"], warnings),
+        room_descriptions=_non_empty("map.room_descriptions", map_group["room_descriptions"], defaults["map"]["room_descriptions"], warnings),
+        shared_world=map_group["shared_world"]
+    )
+    item_settings = ItemSettings(
+        potion_range=_range("item.potion_range", item["potion_range"], defaults["item"]["potion_range"], warnings),
+        gold_range=_range("item.gold_range", item["gold_range"], defaults["item"]["gold_range"], warnings),
+        skill_list=item_skills,
+        item_types=_prototype_parts("item.item_types", item["item_types"], defaults["item"]["item_types"], warnings)
+    )
+    rune_settings = RuneSettings(
+        rune_types=_prototype_parts("rune.rune_types", rune["rune_types"], defaults["rune"]["rune_types"], warnings),
+        rune_adjectives=_prototype_parts("rune.rune_adjectives", rune["rune_adjectives"], defaults["rune"]["rune_adjectives"], warnings),
+        bonus_range=_range("rune.bonus_range", rune["bonus_range"], defaults["rune"]["bonus_range"], warnings),
+        rune_upgrade_factor=_positive("rune.rune_upgrade_factor", rune["rune_upgrade_factor"], defaults["rune"]["rune_upgrade_factor"], warnings),
+        max_rune_upgrade_level=_at_least("rune.max_rune_upgrade_level", rune["max_rune_upgrade_level"], 0,
+                                         defaults["rune"]["max_rune_upgrade_level"], warnings)
+    )
+
+    drop_rates = loot["drop_rates"]
+    if not all(isinstance(rate, (int, float)) and rate >= 0 for rate in drop_rates.values()):
+        warnings.append("loot.drop_rates 的概率必须为非负数，已使用默认值")
+        drop_rates = defaults["loot"]["drop_rates"]
+    if sum(drop_rates.values()) > 1 + 1e-9:
+        warnings.append("loot.drop_rates 概率之和超过 1，排在后面的类型将无法掉落")
+    thresholds = []
+    cumulative = 0.0
+    for rate in drop_rates.values():
+        cumulative += rate
+        thresholds.append(cumulative)
+    loot_settings = LootSettings(
+        drop_rates=MappingProxyType(dict(drop_rates)),
+        drop_thresholds=tuple(thresholds),
+        drop_types=tuple(drop_rates),
+        gold_range=_range("loot.gold_range", loot["gold_range"], defaults["loot"]["gold_range"], warnings),
+        potion_range=_range("loot.potion_range", loot["potion_range"], defaults["loot"]["potion_range"], warnings)
+    )
+    skill_db = {}
+    for name, spec in values["skill_db"].items():
+        if isinstance(spec, dict):
+            skill_db[name] = spec
+        else:
+            warnings.append(f"skill_db.{name} 应为技能定义对象，已忽略")
+    element_model = _element_model(values["elements"], defaults["elements"], warnings)
+    skill_settings = SkillSettings(
+        skill_db=MappingProxyType({name: MappingProxyType(dict(spec)) for name, spec in skill_db.items()}),
+        compiled=MappingProxyType(compile_skill_db(skill_db, warnings, element_model))
+    )
+    llm_settings = LLMSettings(system_prompt=llm["llm_system_prompt"], temperature=llm["llm_temperature"])
+    combat_settings = CombatSettings(exp_growth_factor=values["exp_growth_factor"], dice_sides=values["default_dice_sides"],
+                                     mp_regen=values["mp_regen_per_round"])
+    progression = values["progression"]
+    stat_growth = _stat_table("progression.stat_growth", progression["stat_growth"],
+                              defaults["progression"]["stat_growth"], warnings)
+    level_overrides = {}
+    for level, gains in progression["level_overrides"].items():
+        if str(level).isdigit() and isinstance(gains, dict):
+            level_overrides[int(level)] = _stat_table(f"progression.level_overrides.{level}", gains, {}, warnings)
+        else:
+            warnings.append(f"progression.level_overrides.{level} 应为 等级: {{属性: 成长}}，已忽略")
+    max_level = progression["max_level"]
+    if max_level < 1:
+        # 等级上限小于 1 时升级表为空，任何角色都无法升级
+        warnings.append(f"progression.max_level 不能小于 1（实际为 {max_level}），已按 1 处理")
+        max_level = 1
+    progression_table = ProgressionTable(
+        values["exp_growth_factor"],
+        max_level=max_level,
+        stat_growth=stat_growth,
+        level_overrides=level_overrides
+    )
+    metrics_settings = MetricsSettings(prometheus_file=metrics["prometheus_file"], export_interval=metrics["export_interval"])
+    executor, storage, throttle = values["executor"], values["storage"], values["throttle"]
+    executor_defaults, throttle_defaults = defaults["executor"], defaults["throttle"]
+    executor_settings = ExecutorSettings(
+        enabled=executor["enabled"],
+        max_workers=_at_least("executor.max_workers", executor["max_workers"], 1, executor_defaults["max_workers"], warnings),
+        offload_threshold_ms=_at_least("executor.offload_threshold_ms", executor["offload_threshold_ms"], 0,
+                                       executor_defaults["offload_threshold_ms"], warnings)
+    )
+    engine = storage["engine"]
+    if engine not in ("json", "sqlite"):
+        warnings.append(f"storage.engine 应为 json 或 sqlite，实际为 {engine}，已使用 json")
+        engine = "json"
+    storage_settings = StorageSettings(
+        engine=engine,
+        sqlite_file=storage["sqlite_file"] or defaults["storage"]["sqlite_file"]
+    )
+    event_log, session_lock, logging_group, profiling = (
+        values["event_log"], values["session_lock"], values["logging"], values["profiling"])
+    event_log_defaults, logging_defaults, profiling_defaults = defaults["event_log"], defaults["logging"], defaults["profiling"]
+    event_log_settings = EventLogSettings(
+        enabled=event_log["enabled"],
+        snapshot_interval=_at_least("event_log.snapshot_interval", event_log["snapshot_interval"], 1,
+                                    event_log_defaults["snapshot_interval"], warnings),
+        max_file_mb=_at_least("event_log.max_file_mb", event_log["max_file_mb"], 0, event_log_defaults["max_file_mb"], warnings)
+    )
+    max_pending_commands = session_lock["max_pending_commands"]
+    if max_pending_commands < 1:
+        # 上限小于 1 时每条命令都会被拒绝
+        warnings.append(f"session_lock.max_pending_commands 不能小于 1（实际为 {max_pending_commands}），已按 1 处理")
+        max_pending_commands = 1
+    session_lock_settings = SessionLockSettings(max_pending_commands=max_pending_commands)
+    default_level = logging.getLevelName(logging_defaults["level"])
+    logging_settings = LoggingSettings(
+        level=_log_level("logging.level", logging_group["level"], default_level, warnings),
+        levels=MappingProxyType({name: _log_level(f"logging.levels.{name}", level, default_level, warnings)
+                                 for name, level in logging_group["levels"].items()}),
+        message_sample_rate=_probability("logging.message_sample_rate", logging_group["message_sample_rate"],
+                                         logging_defaults["message_sample_rate"], warnings),
+        console=logging_group["console"]
+    )
+    profiling_settings = ProfilingSettings(
+        enabled=profiling["enabled"],
+        sample_every=_at_least("profiling.sample_every", profiling["sample_every"], 1, profiling_defaults["sample_every"], warnings),
+        output_dir=profiling["output_dir"] or profiling_defaults["output_dir"],
+        max_files=_at_least("profiling.max_files", profiling["max_files"], 1, profiling_defaults["max_files"], warnings),
+        trace_allocations=profiling["trace_allocations"]
+    )
+    throttle_settings = ThrottleSettings(
+        enabled=throttle["enabled"],
+        user_rate=_positive("throttle.user_rate", throttle["user_rate"], throttle_defaults["user_rate"], warnings),
+        user_burst=_at_least("throttle.user_burst", throttle["user_burst"], 1, throttle_defaults["user_burst"], warnings),
+        session_rate=_positive("throttle.session_rate", throttle["session_rate"], throttle_defaults["session_rate"], warnings),
+        session_burst=_at_least("throttle.session_burst", throttle["session_burst"], 1,
+                                throttle_defaults["session_burst"], warnings),
+        costs=MappingProxyType(_throttle_costs(throttle["costs"], throttle_defaults["costs"], warnings)),
+        batch_moves=throttle["batch_moves"]
+    )
+
+    for warning in warnings:
+        logger.warning("配置问题：%s", warning)
+    return GameSettings(
+        character=character,
+        weapon=weapon_settings,
+        map=map_settings,
+        item=item_settings,
+        rune=rune_settings,
+        loot=loot_settings,
+        skill=skill_settings,
+        llm=llm_settings,
+        combat=combat_settings,
+        progression=progression_table,
+        elements=element_model,
+        metrics=metrics_settings,
+        executor=executor_settings,
+        storage=storage_settings,
+        throttle=throttle_settings,
+        event_log=event_log_settings,
+        session_lock=session_lock_settings,
+        logging=logging_settings,
+        profiling=profiling_settings,
+        rng_seed=values["rng_seed"],
+        fingerprint=hashlib.sha1(json.dumps(values, sort_keys=True, ensure_ascii=False, default=str)
+                                 .encode("utf-8")).hexdigest()[:12],
+        warnings=tuple(warnings)
+    )
+
+def resolve_settings(config) -> GameSettings:
+    """管理器入口：已编译的 GameSettings 原样返回，原始配置字典则先编译。"""
+    if isinstance(config, GameSettings):
+        return config
+    return compile_settings(config)
+
+if __name__ == "__main__":
+    # 简单测试：扁平旧写法与嵌套写法混用，并包含一个错误类型
+    settings = compile_settings({
+        "door_probability": 0.8,
+        "loot": {"drop_rates": {"weapon": 0.5, "gold": 0.5}},
+        "weapon": {"upgrade_factor": "快", "max_upgrade_level": -1},
+        "rune": {"rune_upgrade_factor": 0.0},
+        "throttle": {"costs": {"battle": "贵", "move": 0.5}, "user_burst": -1},
+        "progression": {"max_level": 0},
+        "event_log": {"snapshot_interval": "50"},
+        "session_lock": {"max_pending_commands": 0},
+        "logging": {"level": "LOUD", "levels": {"combat": "DEBUG"}},
+        "profiling": {"sample_every": 0},
+        "default_skill_db": {"重击": {"type": "physical", "base_multiplier": 2.0, "cost": 0, "description": "全力一击。"}}
+    })
+    print("门概率：", settings.map.door_probability)
+    print("武器升级：", settings.weapon.upgrade_factor, settings.weapon.max_upgrade_level, "符文升级系数：", settings.rune.rune_upgrade_factor)
+    print("累计掉落概率：", settings.loot.drop_thresholds, settings.loot.drop_types)
+    print("前 5 级升级经验：", settings.progression.thresholds[:5], "等级上限：", settings.progression.max_level)
+    print("技能：", list(settings.skill.skill_db))
+    print("限流代价：", dict(settings.throttle.costs), "玩家突发量：", settings.throttle.user_burst)
+    print("快照间隔：", settings.event_log.snapshot_interval, "日志级别：", settings.logging.level, dict(settings.logging.levels),
+          "剖析采样间隔：", settings.profiling.sample_every, "会话排队上限：", settings.session_lock.max_pending_commands)
+    print("问题：", settings.warnings)
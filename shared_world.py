@@ -0,0 +1,201 @@
+import json
+import os
+import random
+from collections.abc import MutableMapping
+
+from .doors import to_mask
+
+# 共享世界的持久化文件：种子与已生成的规范房间
+SHARED_WORLD_FILE = "shared_world.json"
+
+def encode_rooms(rooms: dict) -> dict:
+    """{坐标: 房间} 转换为 JSON 可用的 {"x,y": 房间}。"""
+    return {f"{x},{y}": room for (x, y), room in rooms.items()}
+
+def decode_rooms(data: dict) -> dict:
+    """encode_rooms 的逆操作：坐标键、房间坐标恢复为元组，门恢复为掩码（原地修改房间）。"""
+    rooms = {}
+    for key, room in data.items():
+        x, y = key.split(",")
+        coord = (int(x), int(y))
+        room["coord"] = coord
+        room["doors"] = to_mask(room["doors"])
+        rooms[coord] = room
+    return rooms
+
+class SharedWorld:
+    """
+    所有会话共用的规范世界。
+
+    房间在任一会话首次探索到某坐标时生成一次，之后所有会话读取同一份房间数据。
+    每个坐标使用由世界种子与坐标派生的独立随机数流生成，不消耗会话自己的随机数流；
+    门与已生成的相邻房间保持一致（规则同 MapManager.generate_room）。
+    规范房间只读，会话需要修改房间时写入自己的覆盖层（见 WorldView.__setitem__）。
+    """
+
+    def __init__(self, path: str = SHARED_WORLD_FILE):
+        self.path = path
+        self.seed = None
+        self.rooms = {}
+        # 生成新房间的函数 (coord, rng, world) -> room，由 MapManager 在配置时设置
+        self.factory = None
+        self.loaded = False
+        self.dirty = False
+        self._default_seed = None
+
+    def configure(self, factory, seed: int = None) -> None:
+        """
+        设置房间生成函数与默认种子；种子只在共享世界文件不存在时使用。
+
+        Args:
+            factory: 房间生成函数，签名同 MapManager.generate_room(coord, rng=..., world=...)。
+            seed (int, optional): 新建共享世界时使用的种子，为空时使用系统熵。
+        """
+        self.factory = factory
+        self._default_seed = seed
+
+    def load(self) -> None:
+        """读取共享世界文件（只读取一次）；文件不存在时以默认种子新建。"""
+        if self.loaded:
+            return
+        self.loaded = True
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.seed = data["seed"]
+                self.rooms.update(decode_rooms(data["rooms"]))
+                return
+            except Exception:
+                self.rooms.clear()
+        self.seed = self._default_seed if self._default_seed is not None else int.from_bytes(os.urandom(8), "big")
+        self.dirty = True
+
+    def save(self, submit=None) -> None:
+        """
+        有新生成的房间时写回共享世界文件。文本在调用方线程编码，写入可交给后台线程。
+
+        Args:
+            submit (optional): 后台写入函数 submit(write, text)（例如 CommandExecutor.submit_write），
+                               为空时在调用方线程直接写入。
+        """
+        if not self.dirty:
+            return
+        data = {"seed": self.seed, "rooms": encode_rooms(self.rooms)}
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        self.dirty = False
+        if submit is not None:
+            submit(self.write, text)
+        else:
+            self.write(text)
+
+    def write(self, text: str) -> None:
+        """先写临时文件再原子替换，写入中途崩溃不会损坏所有会话共用的规范世界。"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+    def room(self, coord: tuple) -> dict:
+        """取得规范房间，尚未生成时按坐标派生的随机数流生成。"""
+        room = self.rooms.get(coord)
+        if room is None:
+            self.load()
+            room = self.rooms.get(coord)
+            if room is None:
+                x, y = coord
+                rng = random.Random(f"{self.seed}:{x},{y}")
+                room = self.rooms[coord] = self.factory(coord, rng=rng, world=self.rooms)
+                self.dirty = True
+        return room
+
+# 插件全局的共享世界
+SHARED_WORLD = SharedWorld()
+
+class WorldView(MutableMapping):
+    """
+    共享世界模式下单个会话的地图视图，接口与普通的 {坐标: 房间} 字典一致。
+
+    会话只保存已探索的坐标集合与被修改过的房间（覆盖层）：读取时覆盖层优先，否则返回规范房间；
+    写入只进入覆盖层。成员判断、遍历与长度都只针对本会话已探索的房间，寻路等逻辑无需区分模式。
+    """
+    __slots__ = ("canonical", "explored", "overlay")
+
+    def __init__(self, canonical: SharedWorld, explored=(), overlay: dict = None):
+        self.canonical = canonical
+        self.explored = set(explored)
+        self.overlay = overlay or {}
+
+    def __getitem__(self, coord):
+        room = self.overlay.get(coord)
+        if room is not None:
+            return room
+        if coord in self.explored:
+            return self.canonical.room(coord)
+        raise KeyError(coord)
+
+    def __contains__(self, coord) -> bool:
+        return coord in self.explored
+
+    def __setitem__(self, coord, room) -> None:
+        self.overlay[coord] = room
+        self.explored.add(coord)
+
+    def __delitem__(self, coord) -> None:
+        self.explored.remove(coord)
+        self.overlay.pop(coord, None)
+
+    def __iter__(self):
+        return iter(self.explored)
+
+    def __len__(self) -> int:
+        return len(self.explored)
+
+    def explore(self, coord: tuple) -> dict:
+        """将坐标标记为已探索并返回房间（必要时在规范世界中生成）。"""
+        room = self[coord] if coord in self.explored else self.canonical.room(coord)
+        self.explored.add(coord)
+        return room
+
+    def encode(self) -> dict:
+        """可 JSON 序列化的形式：已探索坐标列表与覆盖层房间。"""
+        return {"explored": sorted([x, y] for x, y in self.explored),
+                "overlay": encode_rooms(self.overlay)}
+
+    @classmethod
+    def decode(cls, data: dict, canonical: SharedWorld = None) -> "WorldView":
+        """encode 的逆操作。"""
+        overlay = decode_rooms(data.get("overlay", {}))
+        return cls(canonical or SHARED_WORLD, (tuple(coord) for coord in data.get("explored", ())), overlay)
+
+if __name__ == "__main__":
+    # 简单测试：两个会话共享规范房间，其中一个替换房间后只影响自己；
+    # 以共享模式创建的会话在关闭 shared_world 并重启后仍能探索新房间
+    import tempfile
+    # 以模块方式运行时本文件是 __main__，MapManager 与存档使用的是包内模块的全局共享世界
+    from .map_gen import MapManager, SHARED_WORLD as PLUGIN_WORLD
+    from .storage import dumps_session, loads_session
+    from .doors import DOOR_DIRECTIONS
+    world = SharedWorld(os.path.join(tempfile.mkdtemp(), SHARED_WORLD_FILE))
+    world.configure(MapManager({}).generate_room, seed=7)
+    a, b = WorldView(world), WorldView(world)
+    start = a.explore((0, 0))
+    b.explore((0, 0))
+    print("起始房间相同：", a[(0, 0)] is b[(0, 0)], DOOR_DIRECTIONS[start["doors"]])
+    a[(0, 0)] = dict(start, items=start["items"] + ["会话 A 留下的火把"])
+    print("A 的房间物品：", a[(0, 0)]["items"], "B 的房间物品：", b[(0, 0)]["items"])
+    print("A 存档：", a.encode())
+    world.save()
+    print("共享世界文件大小：", os.path.getsize(world.path), "字节")
+
+    PLUGIN_WORLD.path = os.path.join(tempfile.mkdtemp(), SHARED_WORLD_FILE)
+    session = {"characters": {"hero": {"position": (0, 0)}}, "log": []}
+    MapManager({"map": {"shared_world": True}}).start_world(session)
+    saved = dumps_session(session)
+    PLUGIN_WORLD.save()
+    # 模拟重启：共享世界重新读取文件，shared_world 已关闭
+    PLUGIN_WORLD.__init__(PLUGIN_WORLD.path)
+    manager = MapManager({"map": {"shared_world": False}})
+    session = loads_session(saved)
+    direction = DOOR_DIRECTIONS[session["world"][(0, 0)]["doors"]][0]
+    print("关闭共享世界后移动：", manager.move_character(session, "hero", direction).splitlines()[0])
@@ -1,35 +1,26 @@
 import random
-from .dice import skill_check
+from .skill_engine import SkillContext
+from .status import StatusBoard
+from .settings import resolve_settings
 
 class SkillManager:
-    def __init__(self, config: dict):
+    def __init__(self, config):
         """
         初始化技能管理器。
 
         Args:
-            config (dict): 配置字典，包含默认技能列表等参数。
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译）。
+                技能数据库取自配置项 skill_db（旧键名 default_skill_db 视为别名），
+                未配置时使用 _conf_schema.json 中的默认技能。
                 示例：
                   {
-                    "skill_list": ["斩击", "火球术", "穿刺", "防御"],
-                    "default_skill_db": {
+                    "skill_db": {
                         "斩击": {
                             "type": "physical",
                             "base_multiplier": 1.2,
                             "cost": 0,
                             "description": "挥剑攻击，伤害略高于普通攻击。"
                         },
-                        "火球术": {
-                            "type": "magic",
-                            "base_multiplier": 1.5,
-                            "cost": 10,
-                            "description": "发射火球，对敌人造成火属性法术伤害。"
-                        },
-                        "穿刺": {
-                            "type": "physical",
-                            "base_multiplier": 1.1,
-                            "cost": 0,
-                            "description": "快速穿刺，攻击速度快，但伤害较低。"
-                        },
                         "防御": {
                             "type": "buff",
                             "base_multiplier": 0,
@@ -39,34 +30,13 @@ class SkillManager:
                     }
                   }
         """
-        self.config = config
-        # 默认技能数据库，可从配置中扩展
-        self.skill_db = config.get("default_skill_db", {
-            "斩击": {
-                "type": "physical",
-                "base_multiplier": 1.2,
-                "cost": 0,
-                "description": "挥剑攻击，伤害略高于普通攻击。"
-            },
-            "火球术": {
-                "type": "magic",
-                "base_multiplier": 1.5,
-                "cost": 10,
-                "description": "发射火球，对敌人造成火属性法术伤害。"
-            },
-            "穿刺": {
-                "type": "physical",
-                "base_multiplier": 1.1,
-                "cost": 0,
-                "description": "快速穿刺，攻击速度快，但伤害较低。"
-            },
-            "防御": {
-                "type": "buff",
-                "base_multiplier": 0,
-                "cost": 0,
-                "description": "加强防御，减少受到的伤害。"
-            }
-        })
+        self.configure(resolve_settings(config))
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.skill
+        self.skill_db = self.settings.skill_db
+        self.compiled = self.settings.compiled
 
     def get_skill_info(self, skill_name: str) -> dict:
         """
@@ -86,67 +56,59 @@ class SkillManager:
             "description": "未知技能"
         })
 
-    def use_skill(self, character: dict, skill_name: str, target: dict, difficulty: int) -> dict:
+    def use_skill(self, character: dict, skill_name: str, target: dict, difficulty: int, rng=None) -> dict:
         """
-        模拟角色使用技能。根据技能类型，进行技能检定后计算伤害。
-        
-        对于攻击技能（physical 或 magic），伤害计算公式示例：
-          damage = max(0, (角色攻击属性 * base_multiplier + 检定总值) - (目标防御 + 目标相应抗性))
-        检定采用 dice 模块的 skill_check 函数。
-        
+        模拟角色在战斗之外对目标使用一次技能：执行技能编译后的效果管线（伤害、持续伤害、增益等），
+        扣除法力并从目标 HP 中扣除直接伤害。持续效果只以描述形式记录在返回结果中，不在此结算。
+
+        伤害效果的计算公式示例：
+          damage = max(0, (角色攻击属性 * multiplier + 检定总值) - (目标防御 + 目标相应抗性))
+        检定采用 dice 模块的 skill_check 函数，检定失败时倍率减半。
+
         Args:
             character (dict): 使用技能的角色数据。
             skill_name (str): 使用的技能名称。
-            target (dict): 目标（例如怪物）的数据字典，需包含相应防御值（physical_defense 或 magic_defense）以及额外抗性（例如 fire、ice、poison）。
+            target (dict): 目标（例如怪物）的数据字典，需包含 name、hp 与相应防御值（physical_defense 或 magic_defense），
+                可选 elemental_resistances 元素抗性（按元素顺序排列的向量，或 {元素: 抗性} 字典）。
             difficulty (int): 技能检定难度。
-        
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
+
         Returns:
-            dict: 包含技能使用过程详细信息，包括检定结果、计算后的伤害和最终效果描述。
+            dict: 包含技能使用过程详细信息，包括检定结果（check）、造成的直接伤害（damage）、
+                  新增的持续效果描述（statuses）和效果描述（outcome）。
         """
-        # 检查角色是否拥有该技能
-        if skill_name not in character.get("skills", []):
+        # 检查角色是否拥有该技能（技能为集合，成员判断为 O(1)）
+        if skill_name not in character.get("skills", ()):
             return {"error": f"你尚未学会技能 {skill_name}。"}
-        
-        skill_info = self.get_skill_info(skill_name)
-        result = {}
-        
-        # 根据技能类型选择使用对应的攻击属性
-        if skill_info["type"] == "physical":
-            base_value = character.get("attack", 0)
-            target_defense = target.get("physical_defense", 0)
-        elif skill_info["type"] == "magic":
-            base_value = character.get("magic_attack", 0)
-            target_defense = target.get("magic_defense", 0)
-        else:
-            # buff 或其他技能类型直接返回描述信息
-            result["outcome"] = f"你使用了 {skill_name}，效果：{skill_info['description']}"
-            return result
-        
-        # 进行技能检定：使用 dice.skill_check 函数
-        check = skill_check(modifier=base_value, difficulty=difficulty, dice_sides=20)
-        result["check"] = check
-        
-        # 根据检定结果调整伤害：若检定失败则伤害降低
-        multiplier = skill_info.get("base_multiplier", 1.0)
-        if not check["success"]:
-            multiplier *= 0.5
-        
-        # 计算伤害（此处为简化公式，后续可根据具体要求调整）
-        damage = max(0, int((base_value * multiplier) + check["total"] - target_defense))
-        result["damage"] = damage
-        
-        # 生成效果描述
-        if damage >= target.get("hp", 0):
-            outcome = f"你使用 {skill_name} 击败了 {target['name']}，造成 {damage} 点伤害！"
-        else:
-            outcome = f"你使用 {skill_name} 对 {target['name']} 造成 {damage} 点伤害。（目标剩余 HP: {max(target.get('hp', 0) - damage, 0)}）"
-        result["outcome"] = outcome
-        
+        skill = self.compiled.get(skill_name)
+        if skill is None:
+            return {"outcome": f"你使用了 {skill_name}，效果：未知技能"}
+        if character.get("mp", 0) < skill.cost:
+            return {"error": f"法力不足，{skill_name} 需要 {skill.cost} 点法力。"}
+
+        log = []
+        statuses = StatusBoard()
+        # 战斗之外没有后续回合，增益等属性修正只在本次结算中生效，结算结束（包括出错）时还原
+        try:
+            ctx = skill.apply(SkillContext(character, target, rng, log, statuses, difficulty))
+            result = {"damage": ctx.damage, "statuses": statuses.describe(target) + statuses.describe(character)}
+        finally:
+            statuses.clear()
+        if ctx.check is not None:
+            result["check"] = ctx.check
+        if not skill.pipeline:
+            log.append(f"你使用了 {skill_name}，效果：{skill.description}")
+        elif ctx.check is not None:
+            if target.get("hp", 0) <= 0:
+                log.append(f"你使用 {skill_name} 击败了 {target['name']}！")
+            else:
+                log.append(f"（目标剩余 HP: {target['hp']}）")
+        result["outcome"] = "\n".join(log)
         return result
 
     def learn_skill(self, character: dict, skill_name: str) -> str:
         """
-        使角色学习新技能，若角色尚未拥有该技能，则加入技能列表。
+        使角色学习新技能，若角色尚未拥有该技能，则加入技能集合。
 
         Args:
             character (dict): 角色数据字典。
@@ -155,9 +117,10 @@ class SkillManager:
         Returns:
             str: 学习结果描述。
         """
-        if skill_name in character.get("skills", []):
+        skills = character.setdefault("skills", set())
+        if skill_name in skills:
             return f"你已经学会了 {skill_name}。"
-        character.setdefault("skills", []).append(skill_name)
+        skills.add(skill_name)
         return f"你成功学会了 {skill_name}！"
 
 if __name__ == "__main__":
@@ -197,7 +160,8 @@ if __name__ == "__main__":
         "name": "TestHero",
         "attack": 10,
         "magic_attack": 8,
-        "skills": ["斩击"],
+        "mp": 20,
+        "skills": {"斩击", "火球术"},
     }
     # 模拟目标数据
     target = {
@@ -210,4 +174,4 @@ if __name__ == "__main__":
     print("技能使用结果：", result)
     learn_result = sm.learn_skill(character, "防御")
     print("学习技能结果：", learn_result)
-    print("当前技能列表：", character["skills"])
+    print("当前技能：", sorted(character["skills"]))
@@ -0,0 +1,209 @@
+import random
+from .dice import skill_check
+from .element import DEFAULT_MODEL
+from .status import DOT, MODIFIER, StatusBoard
+
+# 技能检定使用的骰子面数
+CHECK_DICE_SIDES = 20
+
+# 旧式技能类型对应的攻击属性与防御属性
+TYPE_STATS = {
+    "physical": ("attack", "physical_defense"),
+    "magic": ("magic_attack", "magic_defense"),
+}
+
+class SkillContext:
+    """
+    一次技能释放的上下文，效果管线中的每个效果函数都读写它。
+
+    statuses 为本场战斗的 StatusBoard，DoT 与增益登记在其中，由调用方在每回合推进；
+    difficulty 为技能检定难度；damage 累计本次释放对目标造成的直接伤害。
+    """
+    __slots__ = ("caster", "target", "rng", "log", "statuses", "difficulty", "check", "damage")
+
+    def __init__(self, caster: dict, target: dict, rng, log: list, statuses: StatusBoard, difficulty: int = 15):
+        self.caster = caster
+        self.target = target
+        self.rng = rng or random
+        self.log = log
+        self.statuses = statuses
+        self.difficulty = difficulty
+        self.check = None
+        self.damage = 0
+
+class CompiledSkill:
+    """
+    由 skill_db 中一条技能定义编译出的效果管线。
+
+    pipeline 为按顺序执行的效果函数元组，释放技能只需一次字典查找取得 CompiledSkill，
+    再依次调用各效果函数，多效果技能不需要再按类型分支。
+    """
+    __slots__ = ("name", "description", "cost", "cooldown", "check_stat", "pipeline")
+
+    def __init__(self, name: str, description: str, cost: int, cooldown: int, check_stat: str, pipeline: tuple):
+        self.name = name
+        self.description = description
+        self.cost = cost
+        self.cooldown = cooldown
+        # 含伤害效果的技能在执行管线前以该属性为修正值进行一次检定，不含伤害效果时为 None
+        self.check_stat = check_stat
+        self.pipeline = pipeline
+
+    def ready(self, caster: dict, cooldowns: dict, round_num: int) -> bool:
+        """法力足够且不在冷却中时可以释放。"""
+        return caster.get("mp", 0) >= self.cost and cooldowns.get(self.name, 0) <= round_num
+
+    def apply(self, ctx: SkillContext, cooldowns: dict = None, round_num: int = 0) -> SkillContext:
+        """
+        释放技能：扣除法力、进行一次技能检定（若含伤害效果），依次执行效果管线并记录冷却。
+
+        Args:
+            ctx (SkillContext): 释放上下文。
+            cooldowns (dict, optional): 技能名 -> 可再次释放的回合，释放后更新。
+            round_num (int, optional): 当前回合。
+
+        Returns:
+            SkillContext: 同一个上下文，damage 与 log 已更新。
+        """
+        if self.cost:
+            ctx.caster["mp"] = ctx.caster.get("mp", 0) - self.cost
+        if self.check_stat is not None:
+            ctx.check = skill_check(ctx.caster.get(self.check_stat, 0), ctx.difficulty,
+                                    dice_sides=CHECK_DICE_SIDES, rng=ctx.rng)
+        for effect in self.pipeline:
+            effect(ctx)
+        if self.cooldown and cooldowns is not None:
+            cooldowns[self.name] = round_num + self.cooldown + 1
+        return ctx
+
+def _damage_effect(name: str, spec: dict, stat: str, defense: str, elements):
+    multiplier = float(spec.get("multiplier", 1.0))
+    element = spec.get("element")
+    # 编译时取出元素在抗性矩阵中的行（非零项），每次命中只做一次加权求和；未知元素没有抗性
+    i = elements.index.get(element) if element else None
+    row = elements.rows[i] if i is not None else ()
+
+    def damage(ctx: SkillContext) -> None:
+        base = ctx.caster.get(stat, 0)
+        # 检定失败时伤害减半
+        factor = multiplier if ctx.check.success else multiplier * 0.5
+        if row:
+            target_resist = elements.resistance_vector(ctx.target)
+            resist = sum(weight * target_resist[j] for j, weight in row)
+        else:
+            resist = 0
+        amount = max(0, int(base * factor + ctx.check.total - ctx.target.get(defense, 0) - resist))
+        ctx.target["hp"] -= amount
+        ctx.damage += amount
+        ctx.log.append(f"你使用 {name} 对 {ctx.target['name']} 造成 {amount} 点伤害。")
+    return damage
+
+def _dot_effect(name: str, spec: dict):
+    element = spec.get("element", "poison")
+    per_round = int(spec.get("damage", 3))
+    rounds = int(spec.get("rounds", 3))
+
+    def dot(ctx: SkillContext) -> None:
+        ctx.statuses.apply(ctx.target, name, DOT, per_round, rounds, element=element)
+        ctx.log.append(f"{ctx.target['name']} 陷入 {element} 持续伤害（每回合 {per_round} 点，持续 {rounds} 回合）。")
+    return dot
+
+def _buff_effect(name: str, spec: dict):
+    stat = spec.get("stat", "defense")
+    amount = int(spec.get("amount", 5))
+    rounds = int(spec.get("rounds", 3))
+
+    def buff(ctx: SkillContext) -> None:
+        ctx.statuses.apply(ctx.caster, name, MODIFIER, amount, rounds, stat=stat)
+        ctx.log.append(f"你使用 {name}，{stat} 提升 {amount} 点，持续 {rounds} 回合。")
+    return buff
+
+def _heal_effect(name: str, spec: dict):
+    amount = int(spec.get("amount", 10))
+
+    def heal(ctx: SkillContext) -> None:
+        caster = ctx.caster
+        caster["hp"] = min(caster.get("max_hp", caster["hp"]), caster["hp"] + amount)
+        ctx.log.append(f"你使用 {name}，恢复 {amount} 点 HP。")
+    return heal
+
+def compile_skill(name: str, spec: dict, warnings: list = None, elements=None) -> CompiledSkill:
+    """
+    将一条技能定义编译为效果管线。
+
+    技能定义可以显式给出 "effects" 列表，每个效果为 {"kind": ..., 参数...}：
+      - damage: 直接伤害，参数 stat / defense（默认按技能 type 推断）、multiplier、element
+      - dot: 持续伤害，参数 element、damage（每回合）、rounds
+      - buff: 属性增益，参数 stat、amount、rounds，到期后自动还原
+      - heal: 恢复 HP，参数 amount
+    未给出 effects 时按旧式字段推断：physical / magic 为一次倍率 base_multiplier 的伤害，buff 为防御增益。
+    "cost" 为释放消耗的法力，"cooldown" 为释放后需等待的回合数。
+
+    Args:
+        name (str): 技能名称。
+        spec (dict): 技能定义。
+        warnings (list, optional): 收集无法识别的效果等问题。
+        elements (ElementModel, optional): 元素模型，伤害效果按其抗性矩阵计算元素抵御，默认为 DEFAULT_MODEL。
+
+    Returns:
+        CompiledSkill: 编译后的技能。
+    """
+    skill_type = spec.get("type", "physical")
+    effects = spec.get("effects")
+    if effects is None:
+        if skill_type in TYPE_STATS:
+            effects = [{"kind": "damage", "multiplier": spec.get("base_multiplier", 1.0)}]
+        elif skill_type == "buff":
+            effects = [{"kind": "buff"}]
+        else:
+            effects = []
+    stat, defense = TYPE_STATS.get(skill_type, TYPE_STATS["physical"])
+    elements = elements or DEFAULT_MODEL
+    pipeline = []
+    check_stat = None
+    for effect in effects:
+        kind = effect.get("kind")
+        if kind == "damage":
+            damage_stat = effect.get("stat", stat)
+            element = effect.get("element")
+            if element is not None and element not in elements.index and warnings is not None:
+                warnings.append(f"技能 {name} 的元素 {element} 未在 elements.names 中配置，不计算元素抗性")
+            pipeline.append(_damage_effect(name, effect, damage_stat, effect.get("defense", defense), elements))
+            check_stat = check_stat or damage_stat
+        elif kind == "dot":
+            pipeline.append(_dot_effect(name, effect))
+        elif kind == "buff":
+            pipeline.append(_buff_effect(name, effect))
+        elif kind == "heal":
+            pipeline.append(_heal_effect(name, effect))
+        elif warnings is not None:
+            warnings.append(f"技能 {name} 的效果类型 {kind} 无法识别，已忽略")
+    return CompiledSkill(name, spec.get("description", ""), int(spec.get("cost", 0)),
+                         int(spec.get("cooldown", 0)), check_stat, tuple(pipeline))
+
+def compile_skill_db(skill_db: dict, warnings: list = None, elements=None) -> dict:
+    """编译整个技能数据库，返回 {技能名: CompiledSkill}。"""
+    return {name: compile_skill(name, spec, warnings, elements) for name, spec in skill_db.items()}
+
+if __name__ == "__main__":
+    # 简单测试：多效果技能
+    skills = compile_skill_db({
+        "烈焰斩": {"type": "physical", "cost": 5, "cooldown": 2, "effects": [
+            {"kind": "damage", "multiplier": 1.3, "element": "fire"},
+            {"kind": "dot", "element": "fire", "damage": 4, "rounds": 2}
+        ]},
+        "防御": {"type": "buff"}
+    })
+    caster = {"name": "勇者", "hp": 100, "max_hp": 100, "attack": 12, "defense": 5, "mp": 20}
+    target = {"name": "骷髅", "hp": 80, "physical_defense": 3, "elemental_resistances": {"fire": 1}}
+    statuses, log, cooldowns = StatusBoard(), [], {}
+    rng = random.Random(1)
+    for round_num in range(1, 4):
+        for name in ("烈焰斩", "防御"):
+            skill = skills[name]
+            if skill.ready(caster, cooldowns, round_num):
+                skill.apply(SkillContext(caster, target, rng, log, statuses), cooldowns, round_num)
+        statuses.advance(log)
+    statuses.clear()
+    print("\n".join(log))
+    print("施法者：", caster)
@@ -0,0 +1,418 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+from .logger import get_logger
+from .prototype import intern_prototype_ids
+from .shared_world import WorldView
+from .storage import decode_session, json_default
+
+# SQLite 存档文件
+SQLITE_FILE = "game_data.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS characters (
+    session_id TEXT NOT NULL,
+    sender_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, sender_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS inventory (
+    session_id TEXT NOT NULL,
+    sender_id TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (session_id, sender_id, slot)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rooms (
+    session_id TEXT NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    data TEXT,
+    PRIMARY KEY (session_id, x, y)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS log (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    entry TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+# 写入语句（参数化，由 sqlite3 的语句缓存复用编译结果）
+UPSERT_SESSION = "INSERT OR REPLACE INTO sessions (session_id, data) VALUES (?, ?)"
+UPSERT_CHARACTER = "INSERT OR REPLACE INTO characters (session_id, sender_id, data) VALUES (?, ?, ?)"
+DELETE_CHARACTER = "DELETE FROM characters WHERE session_id = ? AND sender_id = ?"
+UPSERT_ITEM = "INSERT OR REPLACE INTO inventory (session_id, sender_id, slot, item) VALUES (?, ?, ?, ?)"
+DELETE_ITEM = "DELETE FROM inventory WHERE session_id = ? AND sender_id = ? AND slot = ?"
+UPSERT_ROOM = "INSERT OR REPLACE INTO rooms (session_id, x, y, data) VALUES (?, ?, ?, ?)"
+DELETE_ROOM = "DELETE FROM rooms WHERE session_id = ? AND x = ? AND y = ?"
+INSERT_LOG = "INSERT OR REPLACE INTO log (session_id, seq, entry) VALUES (?, ?, ?)"
+DELETE_LOG = "DELETE FROM log WHERE session_id = ?"
+DELETE_SESSION = [f"DELETE FROM {table} WHERE session_id = ?"
+                  for table in ("sessions", "characters", "inventory", "rooms", "log")]
+
+# 等待其它连接释放数据库锁的时长（秒），以及写入事务失败后的重试次数与间隔（秒，按次数递增）
+BUSY_TIMEOUT = 5.0
+WRITE_ATTEMPTS = 3
+RETRY_DELAY = 0.2
+
+# 会话行中不保存的字段：它们各自存放在独立的表中
+SPLIT_FIELDS = ("world", "characters", "log")
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=json_default)
+
+def _loads(text: str):
+    return json.loads(text, object_hook=intern_prototype_ids)
+
+class SessionRows:
+    """一个会话最近一次写入数据库的各行内容，用于计算下一次保存的差异。"""
+    __slots__ = ("session", "characters", "inventory", "rooms", "world_rev", "log_length")
+
+    def __init__(self):
+        self.session = None
+        self.characters = {}
+        self.inventory = {}
+        # 坐标 -> 房间JSON（共享世界模式下未修改的房间为 None）
+        self.rooms = {}
+        # 上次比较房间时的地图版本号，版本号未变时跳过房间比较
+        self.world_rev = None
+        self.log_length = 0
+
+class SQLiteStorage:
+    def __init__(self, path: str = SQLITE_FILE):
+        """
+        初始化 SQLite 存档引擎。
+
+        会话数据按实体拆分到规范化的表中：sessions（会话级字段）、characters（角色，不含背包）、
+        inventory（背包，每格一行）、rooms（房间，主键为会话与坐标）与 log（游戏日志，每条一行）。
+        引擎记住每个会话最近写入的各行内容，保存时只生成发生变化的行的写入：
+        移动到已探索的房间只更新角色与会话两行，生成新房间再多一行房间与一行日志。
+        地图版本号 world_rev 未变化时不比较房间（房间的生成与修改都经由 MapManager.room_changed 递增版本号）。
+
+        行内容在调用方线程（事件循环）中编码与比较，写入由专用写入线程执行：
+        写入线程每次取出队列中积压的全部写入，合并在一个事务中提交。数据库使用 WAL 日志模式，
+        读取存档不会阻塞写入。事务重试后仍失败时，比较基准已与数据库不符：涉及的会话被标记为失效，
+        下一次保存时先删除它们在各表中的行，再按内存中的状态完整重写。
+
+        Args:
+            path (str, optional): 数据库文件路径。
+        """
+        self.path = path
+        self.logger = get_logger("storage")
+        self.rows = {}
+        self.busy_timeout = BUSY_TIMEOUT
+        self.retry_delay = RETRY_DELAY
+        # 写入失败、需要完整重写的会话ID（写入线程添加，事件循环取出）
+        self._stale = set()
+        self._stale_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self.transactions = 0
+        self.statements = 0
+        self.failures = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    # -------------------------------
+    # 读取
+    # -------------------------------
+    def load(self) -> dict:
+        """
+        读取全部会话，并记录各行内容作为之后保存的比较基准。
+
+        Returns:
+            dict: {会话ID: 会话数据}，与 storage.load_game_data 的结果格式相同。
+        """
+        conn = self._connect()
+        try:
+            encoded = {}
+            rows = {}
+            for session_id, data in conn.execute("SELECT session_id, data FROM sessions"):
+                encoded[session_id] = dict(_loads(data), characters={}, log=[])
+                state = rows[session_id] = SessionRows()
+                state.session = data
+            for session_id, sender_id, data in conn.execute("SELECT session_id, sender_id, data FROM characters"):
+                if session_id in encoded:
+                    encoded[session_id]["characters"][sender_id] = dict(_loads(data), inventory=[])
+                    rows[session_id].characters[sender_id] = data
+            for session_id, sender_id, slot, item in conn.execute(
+                    "SELECT session_id, sender_id, slot, item FROM inventory ORDER BY session_id, sender_id, slot"):
+                char = encoded.get(session_id, {}).get("characters", {}).get(sender_id)
+                if char is not None:
+                    char["inventory"].append(_loads(item))
+                    rows[session_id].inventory[(sender_id, slot)] = item
+            for session_id, x, y, data in conn.execute("SELECT session_id, x, y, data FROM rooms"):
+                session = encoded.get(session_id)
+                if session is None:
+                    continue
+                shared = session.get("world_mode") == "shared"
+                world = session.setdefault("world", {"explored": [], "overlay": {}} if shared else {})
+                if shared:
+                    world["explored"].append([x, y])
+                    if data is not None:
+                        world["overlay"][f"{x},{y}"] = _loads(data)
+                else:
+                    world[f"{x},{y}"] = _loads(data)
+                rows[session_id].rooms[(x, y)] = data
+            for session_id, entry in conn.execute("SELECT session_id, entry FROM log ORDER BY session_id, seq"):
+                session = encoded.get(session_id)
+                if session is not None:
+                    session["log"].append(entry)
+                    rows[session_id].log_length += 1
+        finally:
+            conn.close()
+        sessions = {}
+        for session_id, data in encoded.items():
+            sessions[session_id] = decode_session(data)
+            rows[session_id].world_rev = data.get("world_rev", 0)
+        self.rows = rows
+        return sessions
+
+    # -------------------------------
+    # 保存
+    # -------------------------------
+    def prepare(self, session_id: str, session: dict) -> None:
+        """会话交给工作线程之前调用；保存只读取被保存的会话，无需预先编码。"""
+
+    def save(self, sessions: dict, session_id: str = None, busy=()) -> None:
+        """
+        保存会话的变化：指定 session_id 时只比较该会话，否则比较全部会话（跳过 busy 中的会话）
+        并删除已不存在的会话。写入交给写入线程异步执行。
+
+        Args:
+            sessions (dict): 全部会话数据。
+            session_id (str, optional): 刚执行完命令的会话ID。
+            busy: 正在工作线程中执行命令的会话ID 集合。
+        """
+        ops, touched = [], set()
+        with self._stale_lock:
+            stale, self._stale = self._stale, set()
+        for sid in stale:
+            if sid in busy:
+                self._mark_stale((sid,))
+                continue
+            # 上次写入失败：数据库中该会话的内容未知，删除后按内存状态完整重写
+            self.rows.pop(sid, None)
+            ops.extend((sql, [(sid,)]) for sql in DELETE_SESSION)
+            touched.add(sid)
+            if sid in sessions:
+                self._diff(sid, sessions[sid], ops)
+        if session_id is not None:
+            session = sessions.get(session_id)
+            if session is not None and session_id not in touched:
+                self._diff(session_id, session, ops)
+                touched.add(session_id)
+        else:
+            for sid, session in sessions.items():
+                if sid not in busy and sid not in touched:
+                    self._diff(sid, session, ops)
+                    touched.add(sid)
+            for sid in [sid for sid in self.rows if sid not in sessions]:
+                del self.rows[sid]
+                ops.extend((sql, [(sid,)]) for sql in DELETE_SESSION)
+                touched.add(sid)
+        if ops:
+            self._submit((touched, ops))
+
+    def _mark_stale(self, session_ids) -> None:
+        with self._stale_lock:
+            self._stale.update(session_ids)
+
+    def _diff(self, session_id: str, session: dict, ops: list) -> None:
+        state = self.rows.get(session_id)
+        if state is None:
+            state = self.rows[session_id] = SessionRows()
+
+        data = _dumps({key: value for key, value in session.items() if key not in SPLIT_FIELDS})
+        if data != state.session:
+            state.session = data
+            ops.append((UPSERT_SESSION, [(session_id, data)]))
+
+        upserts, deletes, item_upserts, item_deletes = [], [], [], []
+        characters = session.get("characters", {})
+        for sender_id, char in characters.items():
+            data = _dumps({key: value for key, value in char.items() if key != "inventory"})
+            if data != state.characters.get(sender_id):
+                state.characters[sender_id] = data
+                upserts.append((session_id, sender_id, data))
+            inventory = char.get("inventory", [])
+            for slot, item in enumerate(inventory):
+                text = _dumps(item)
+                if text != state.inventory.get((sender_id, slot)):
+                    state.inventory[(sender_id, slot)] = text
+                    item_upserts.append((session_id, sender_id, slot, text))
+        for sender_id in [sender_id for sender_id in state.characters if sender_id not in characters]:
+            del state.characters[sender_id]
+            deletes.append((session_id, sender_id))
+        for key in [key for key in state.inventory
+                    if key[0] not in characters or key[1] >= len(characters[key[0]].get("inventory", ()))]:
+            del state.inventory[key]
+            item_deletes.append((session_id,) + key)
+        if upserts:
+            ops.append((UPSERT_CHARACTER, upserts))
+        if deletes:
+            ops.append((DELETE_CHARACTER, deletes))
+        if item_upserts:
+            ops.append((UPSERT_ITEM, item_upserts))
+        if item_deletes:
+            ops.append((DELETE_ITEM, item_deletes))
+
+        world = session.get("world")
+        world_rev = session.get("world_rev", 0)
+        if world is not None and world_rev != state.world_rev:
+            state.world_rev = world_rev
+            upserts, deletes = [], []
+            if isinstance(world, WorldView):
+                current = {coord: _dumps(world.overlay[coord]) if coord in world.overlay else None
+                           for coord in world.explored}
+            else:
+                current = {coord: _dumps(room) for coord, room in world.items()}
+            for (x, y), data in current.items():
+                if (x, y) not in state.rooms or data != state.rooms[(x, y)]:
+                    upserts.append((session_id, x, y, data))
+            for x, y in [coord for coord in state.rooms if coord not in current]:
+                deletes.append((session_id, x, y))
+            state.rooms = current
+            if upserts:
+                ops.append((UPSERT_ROOM, upserts))
+            if deletes:
+                ops.append((DELETE_ROOM, deletes))
+
+        log = session.get("log", [])
+        if len(log) != state.log_length:
+            start = state.log_length
+            if len(log) < start:
+                # 日志被截短（正常流程中日志只追加）：整体重写
+                ops.append((DELETE_LOG, [(session_id,)]))
+                start = 0
+            ops.append((INSERT_LOG, [(session_id, seq, entry) for seq, entry in enumerate(log[start:], start)]))
+            state.log_length = len(log)
+
+    def _submit(self, item: tuple) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="rpg-sqlite-writer", daemon=True)
+            self._thread.start()
+        self._queue.put(item)
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # 合并积压的写入，一个事务提交
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = None in batch
+                items = [item for item in batch if item is not None]
+                try:
+                    if items:
+                        self._commit(conn, items)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, items: list) -> None:
+        """在一个事务中执行一批写入，失败时重试；仍失败则将涉及的会话标记为失效。"""
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                conn.execute("BEGIN")
+                for _, ops in items:
+                    for sql, params in ops:
+                        conn.executemany(sql, params)
+                        self.statements += 1
+                conn.execute("COMMIT")
+                self.transactions += 1
+                return
+            except sqlite3.Error:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                if attempt == WRITE_ATTEMPTS:
+                    self.logger.exception("写入 SQLite 存档失败（已重试 %d 次），涉及的会话将在下次保存时完整重写",
+                                          WRITE_ATTEMPTS)
+                    self._mark_stale(set().union(*(session_ids for session_ids, _ in items)))
+                    self.failures += 1
+                    return
+                time.sleep(self.retry_delay * attempt)
+
+    def flush(self) -> None:
+        """等待已提交的写入全部落盘。"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """写完积压的写入并停止写入线程。"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+if __name__ == "__main__":
+    # 简单测试：保存、只写入变化的行、重新读取后与原数据一致
+    import os
+    import random
+    import tempfile
+    from .commands import CommandManager
+    from .character import CharacterManager
+    from .combat import CombatManager
+    from .map_gen import MapManager
+    from .doors import DOOR_DIRECTIONS
+    character_manager, map_manager = CharacterManager({}), MapManager({})
+    commands = CommandManager({}, character_manager, map_manager, CombatManager({}, {}, character_manager, map_manager))
+    rng = random.Random(1)
+    sessions = {}
+    for i in range(3):
+        session = sessions[f"group_{i}"] = {}
+        commands.startgame(session, "p", rng, "玩家")
+        commands.create_character(session, "p", rng, "勇者")
+        for _ in range(20):
+            commands.move(session, "p", rng, rng.choice(["north", "south", "east", "west"]))
+        commands.battle(session, "p", rng)
+    storage = SQLiteStorage(os.path.join(tempfile.mkdtemp(), SQLITE_FILE))
+    storage.save(sessions)
+    storage.flush()
+    statements = storage.statements
+    session = sessions["group_0"]
+    room = session["world"][session["characters"]["p"]["position"]]
+    commands.move(session, "p", rng, DOOR_DIRECTIONS[room["doors"]][0])
+    storage.save(sessions, "group_0")
+    storage.flush()
+    print(f"首次保存 {statements} 条批量语句，一次移动后写入 {storage.statements - statements} 条")
+    storage.close()
+    loaded = SQLiteStorage(storage.path).load()
+    print("读回一致：", loaded == sessions)
+
+    # 写入失败：另一个连接持有写锁时事务重试后仍失败，锁释放后的下一次保存完整重写该会话
+    storage = SQLiteStorage(storage.path)
+    storage.load()
+    storage.busy_timeout, storage.retry_delay = 0.05, 0.01
+    blocker = sqlite3.connect(storage.path, isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+    sessions["group_1"]["characters"]["p"]["money"] = 999
+    storage.save(sessions, "group_1")
+    storage.flush()
+    blocker.execute("ROLLBACK")
+    blocker.close()
+    storage.save(sessions)
+    storage.close()
+    loaded = SQLiteStorage(storage.path).load()
+    print(f"写入失败 {storage.failures} 次，重写后读回一致：", loaded == sessions)
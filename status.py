@@ -0,0 +1,182 @@
+import heapq
+
+# 状态种类：持续伤害每回合结算一次；属性修正在施加时生效、到期时还原
+DOT = "dot"
+MODIFIER = "modifier"
+
+# 堆中事件类型，同一回合内先结算伤害再处理到期
+TICK = 0
+EXPIRE = 1
+
+# 元素 -> (状态名称, 种类, 持续回合, 强度系数)；冰的减速以负数修正目标攻击
+ELEMENT_STATUS = {
+    "poison": ("中毒", DOT, 3, 1),
+    "fire": ("灼烧", DOT, 2, 2),
+    "ice": ("减速", MODIFIER, 2, -1),
+}
+
+class Status:
+    """单个状态效果：名称、种类、强度、到期回合，以及修正的属性或造成伤害的元素。"""
+    __slots__ = ("name", "kind", "magnitude", "expires", "stat", "element")
+
+    def __init__(self, name: str, kind: str, magnitude: int, expires: int, stat: str = None, element: str = None):
+        self.name = name
+        self.kind = kind
+        self.magnitude = magnitude
+        self.expires = expires
+        self.stat = stat
+        self.element = element
+
+class StatusBoard:
+    """
+    一场战斗中所有战斗者的状态效果。
+
+    每个战斗者的状态以 {状态名: Status} 保存，同名状态再次施加时刷新持续时间并保留较强的强度，而不是叠加。
+    持续伤害的下一次结算与所有状态的到期都作为 (回合, 事件类型, 序号, 战斗者, 状态名) 压入最小堆，
+    每回合只弹出当回合到期的事件，处理代价与到期事件数成正比，而不必扫描全部生效中的状态。
+    刷新后旧的到期事件不会从堆中删除，弹出时与状态当前的到期回合不符即被忽略。
+    """
+    __slots__ = ("round", "combatants", "effects", "heap", "_seq")
+
+    def __init__(self):
+        self.round = 0
+        self.combatants = {}
+        self.effects = {}
+        self.heap = []
+        self._seq = 0
+
+    def _push(self, due: int, event: int, key: int, name: str) -> None:
+        self._seq += 1
+        heapq.heappush(self.heap, (due, event, self._seq, key, name))
+
+    def apply(self, combatant: dict, name: str, kind: str, magnitude: int, duration: int,
+              stat: str = None, element: str = None) -> Status:
+        """
+        为战斗者施加（或刷新）状态。
+
+        Args:
+            combatant (dict): 角色或怪物数据；属性修正直接作用于其中的 stat 字段。
+            name (str): 状态名称，同一战斗者的同名状态只保留一个。
+            kind (str): DOT 或 MODIFIER。
+            magnitude (int): 持续伤害每回合的伤害，或属性修正值（可为负）。
+            duration (int): 持续回合数，从下一回合起计算。
+            stat (str, optional): MODIFIER 修正的属性名。
+            element (str, optional): 状态所属元素。
+
+        Returns:
+            Status: 生效中的状态。
+        """
+        key = id(combatant)
+        self.combatants[key] = combatant
+        effects = self.effects.setdefault(key, {})
+        expires = self.round + duration
+        status = effects.get(name)
+        if status is None:
+            status = effects[name] = Status(name, kind, magnitude, expires, stat, element)
+            if kind == MODIFIER:
+                combatant[stat] = combatant.get(stat, 0) + magnitude
+            else:
+                self._push(self.round + 1, TICK, key, name)
+        else:
+            if abs(magnitude) > abs(status.magnitude):
+                if kind == MODIFIER:
+                    combatant[stat] += magnitude - status.magnitude
+                status.magnitude = magnitude
+            if expires <= status.expires:
+                return status
+            status.expires = expires
+        self._push(expires, EXPIRE, key, name)
+        return status
+
+    def advance(self, log: list) -> None:
+        """
+        进入下一回合：结算当回合的持续伤害，移除到期的状态并还原其属性修正。
+
+        Args:
+            log (list): 战斗日志。
+        """
+        self.round += 1
+        heap = self.heap
+        while heap and heap[0][0] <= self.round:
+            due, event, _, key, name = heapq.heappop(heap)
+            effects = self.effects[key]
+            status = effects.get(name)
+            if status is None:
+                continue
+            combatant = self.combatants[key]
+            if event == TICK:
+                if combatant["hp"] > 0:
+                    combatant["hp"] -= status.magnitude
+                    log.append(f"{combatant['name']} 受到{status.name}伤害 {status.magnitude} 点。（剩余 HP: {max(combatant['hp'], 0)}）")
+                if due < status.expires:
+                    self._push(due + 1, TICK, key, name)
+            elif due == status.expires:
+                del effects[name]
+                if status.kind == MODIFIER:
+                    combatant[status.stat] -= status.magnitude
+
+    def clear(self) -> None:
+        """战斗结束：还原所有仍在生效的属性修正并清空状态。"""
+        for key, effects in self.effects.items():
+            combatant = self.combatants[key]
+            for status in effects.values():
+                if status.kind == MODIFIER:
+                    combatant[status.stat] -= status.magnitude
+        self.effects.clear()
+        self.combatants.clear()
+        self.heap.clear()
+
+    def describe(self, combatant: dict) -> list:
+        """返回战斗者生效中的状态描述，例如 ["中毒(剩余 2 回合)"]。"""
+        return [f"{status.name}(剩余 {status.expires - self.round} 回合)"
+                for status in self.effects.get(id(combatant), {}).values()]
+
+    def __bool__(self) -> bool:
+        return bool(self.heap)
+
+def apply_element(board: StatusBoard, target: dict, element: str, power: int, log: list,
+                  attack_stat: str = "physical_attack"):
+    """
+    按元素对目标施加对应状态：毒为中毒、火为灼烧（持续伤害），冰为减速（降低目标攻击）。
+
+    Args:
+        board (StatusBoard): 本场战斗的状态表。
+        target (dict): 目标数据。
+        element (str): 元素。
+        power (int): 元素强度，决定状态强度。
+        log (list): 战斗日志。
+        attack_stat (str, optional): 减速修正的目标攻击属性名（怪物为 physical_attack，角色为 attack）。
+
+    Returns:
+        Status | None: 施加的状态；元素无对应状态或强度不足时为 None。
+    """
+    spec = ELEMENT_STATUS.get(element)
+    if spec is None or power <= 0:
+        return None
+    name, kind, duration, factor = spec
+    magnitude = power * factor
+    # 已在生效的同名状态只刷新，不重复记录日志
+    fresh = name not in board.effects.get(id(target), ())
+    status = board.apply(target, name, kind, magnitude, duration,
+                         stat=attack_stat if kind == MODIFIER else None, element=element)
+    if fresh and kind == MODIFIER:
+        log.append(f"{target['name']} 陷入{name}，攻击 {magnitude:+d}，持续 {duration} 回合。")
+    elif fresh:
+        log.append(f"{target['name']} 陷入{name}，每回合受到 {status.magnitude} 点伤害，持续 {duration} 回合。")
+    return status
+
+if __name__ == "__main__":
+    # 简单测试：中毒与减速同时生效，中途刷新中毒
+    board = StatusBoard()
+    monster = {"name": "哥布林", "hp": 50, "physical_attack": 8}
+    log = []
+    apply_element(board, monster, "poison", 3, log)
+    apply_element(board, monster, "ice", 2, log)
+    for round_num in range(1, 6):
+        log.append(f"【回合 {round_num}】攻击 {monster['physical_attack']}，状态 {board.describe(monster)}")
+        if round_num == 2:
+            apply_element(board, monster, "poison", 4, log)
+        board.advance(log)
+    board.clear()
+    print("\n".join(log))
+    print("战斗结束后：", monster)
@@ -0,0 +1,204 @@
+import json
+import os
+
+from .doors import to_mask
+from .prototype import intern_prototype_ids
+from .settings import resolve_settings
+from .shared_world import SHARED_WORLD, WorldView
+
+# 持久化存储文件
+DATA_FILE = "game_data.json"
+
+def json_default(value):
+    """json 的 default 钩子：集合（例如角色技能）写为排序后的列表，保证输出稳定。"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def encode_session(session: dict) -> dict:
+    """
+    将内存中的会话数据转换为可 JSON 序列化的形式。
+
+    内存中地图以 (x, y) 元组为键，JSON 只允许字符串键，因此 world 的键编码为 "x,y"；
+    共享世界模式的会话只写入已探索坐标与覆盖层（见 WorldView.encode）。
+    其余字段（例如角色位置元组、技能集合）由 json 写成列表，读回时由 decode_session 还原。
+
+    Args:
+        session (dict): 会话数据。
+
+    Returns:
+        dict: 可直接 json.dump 的会话数据（浅拷贝，不修改原数据）。
+    """
+    encoded = dict(session)
+    world = session.get("world")
+    if isinstance(world, WorldView):
+        encoded["world"] = world.encode()
+    elif world is not None:
+        encoded["world"] = {f"{x},{y}": room for (x, y), room in world.items()}
+    return encoded
+
+def decode_session(data: dict) -> dict:
+    """
+    将 encode_session 的结果还原为内存中的会话数据：world 键、房间坐标与角色位置恢复为元组，角色技能恢复为集合。
+    旧存档中以 {方向: 布尔值} 保存的房间门转换为门掩码。
+
+    Args:
+        data (dict): 从 JSON 读回的会话数据，会被原地修改。
+
+    Returns:
+        dict: 会话数据。
+    """
+    world = data.get("world")
+    if data.get("world_mode") == "shared":
+        data["world"] = WorldView.decode(world or {})
+    elif world is not None:
+        decoded = {}
+        for key, room in world.items():
+            x, y = key.split(",") if isinstance(key, str) else key
+            coord = (int(x), int(y))
+            if "coord" in room:
+                room["coord"] = coord
+            if isinstance(room.get("doors"), dict):
+                room["doors"] = to_mask(room["doors"])
+            decoded[coord] = room
+        data["world"] = decoded
+    for char in data.get("characters", {}).values():
+        if "position" in char:
+            char["position"] = tuple(char["position"])
+        if "skills" in char:
+            char["skills"] = set(char["skills"])
+    return data
+
+def dumps_session(session: dict) -> str:
+    """将会话数据序列化为紧凑的 JSON 字符串（用于快照）。"""
+    return json.dumps(encode_session(session), ensure_ascii=False, separators=(",", ":"), default=json_default)
+
+def loads_session(text: str) -> dict:
+    """dumps_session 的逆操作。"""
+    return decode_session(json.loads(text, object_hook=intern_prototype_ids))
+
+def load_game_data(path: str = None):
+    """从 path（默认 DATA_FILE）中加载游戏数据，若文件不存在则返回空字典；读回的物品原型ID 会被驻留共享"""
+    path = path or DATA_FILE
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f, object_hook=intern_prototype_ids)
+            except Exception as e:
+                return {}
+        return {session_id: decode_session(session) for session_id, session in data.items()}
+    return {}
+
+class GameDataWriter:
+    """
+    按会话缓存编码结果的存档写入器。
+
+    每个会话单独编码为 JSON 文本并缓存，拼接后的存档与 json.dump(indent=2) 的输出完全一致。
+    保存时只重新编码发生变化的会话，其余会话沿用缓存；正在工作线程中执行命令的会话
+    （状态可能处于中间态）同样不读取其数据，命令结束后的下一次保存会写入它的新状态。
+    编码在调用方线程（事件循环）中完成，write 只负责把文本落盘，可以放到后台线程执行。
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or DATA_FILE
+        self.encoded = {}
+
+    def encode(self, session_id: str, session: dict) -> str:
+        """编码一个会话并更新缓存。"""
+        text = json.dumps(encode_session(session), ensure_ascii=False, indent=2, default=json_default)
+        self.encoded[session_id] = text
+        return text
+
+    def prime(self, session_id: str, session: dict) -> None:
+        """会话交给工作线程之前调用：确保缓存中已有它的编码结果。"""
+        if session_id not in self.encoded:
+            self.encode(session_id, session)
+
+    def render(self, data: dict, changed=None, busy=()) -> str:
+        """
+        编码会话并拼接为存档文本。
+
+        Args:
+            data (dict): 全部会话数据。
+            changed (optional): 自上次保存以来发生变化的会话ID 集合，其余已缓存的会话沿用缓存；
+                                为空时重新编码全部会话。
+            busy: 正在工作线程中执行命令的会话ID 集合，这些会话沿用缓存的编码结果。
+
+        Returns:
+            str: 存档文本。
+        """
+        if not data:
+            return "{}"
+        parts = []
+        for session_id, session in data.items():
+            text = self.encoded.get(session_id)
+            if text is None or (session_id not in busy and (changed is None or session_id in changed)):
+                text = self.encode(session_id, session)
+            key = json.dumps(session_id, ensure_ascii=False)
+            parts.append(f"  {key}: " + text.replace("\n", "\n  "))
+        return "{\n" + ",\n".join(parts) + "\n}"
+
+    def write(self, text: str) -> None:
+        """先写临时文件再原子替换，后台写入中途失败也不会留下半个存档。"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+class JSONStorage:
+    """
+    单文件 JSON 存档引擎（默认）：每次保存重写整个 DATA_FILE，只有发生变化的会话被重新编码。
+
+    Args:
+        path (str, optional): 存档文件路径，默认 DATA_FILE。
+        submit (optional): 后台写入函数 submit(write, text)（例如 CommandExecutor.submit_write），
+                           为空时在调用方线程直接写入。
+    """
+
+    def __init__(self, path: str = None, submit=None):
+        self.writer = GameDataWriter(path)
+        self.submit = submit
+
+    def load(self) -> dict:
+        return load_game_data(self.writer.path)
+
+    def prepare(self, session_id: str, session: dict) -> None:
+        """会话交给工作线程之前调用：确保缓存中已有它的编码结果。"""
+        self.writer.prime(session_id, session)
+
+    def save(self, sessions: dict, session_id: str = None, busy=()) -> None:
+        """保存全部会话；指定 session_id 时只重新编码该会话。"""
+        text = self.writer.render(sessions, None if session_id is None else (session_id,), busy)
+        if self.submit is not None:
+            self.submit(self.writer.write, text)
+        else:
+            self.writer.write(text)
+
+    def close(self) -> None:
+        """后台写入由 submit 的提供者负责等待。"""
+
+def open_storage(config, submit=None):
+    """
+    按配置创建存档引擎。存档引擎在插件启动时打开，storage 分组的修改需重启插件后生效。
+
+    Args:
+        config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），读取其中 storage 分组：
+            - engine: "json"（默认，单文件 game_data.json）或 "sqlite"（规范化表、只写入变化的行）
+            - sqlite_file: SQLite 数据库路径（默认 game_data.db）
+        submit (optional): JSON 引擎的后台写入函数。
+
+    Returns:
+        JSONStorage | SQLiteStorage: 存档引擎，接口为 load / prepare / save / close。
+    """
+    settings = resolve_settings(config).storage
+    if settings.engine == "sqlite":
+        # 仅在选用时导入 SQLite 引擎
+        from .sqlite_storage import SQLiteStorage
+        return SQLiteStorage(settings.sqlite_file)
+    return JSONStorage(submit=submit)
+
+def save_game_data(data):
+    """将游戏数据保存到 DATA_FILE 中；共享世界有新生成的房间时一并写回"""
+    writer = GameDataWriter()
+    writer.write(writer.render(data))
+    SHARED_WORLD.save()
@@ -0,0 +1,182 @@
+import functools
+import math
+import time
+
+from .settings import resolve_settings
+
+# 清理已回满的令牌桶的最小间隔（秒）
+SWEEP_INTERVAL = 60.0
+
+# 被限流时的回复；同一玩家连续被限流时只回复一次
+THROTTLED_MESSAGE = "操作太频繁，请 {retry} 秒后再试。"
+
+class ThrottleManager:
+    def __init__(self, config):
+        """
+        初始化命令限流器。
+
+        每个玩家（跨会话）与每个会话各有一个令牌桶，命令按配置的代价消耗两个桶中的令牌，
+        任一桶不足时拒绝，拒绝的命令不消耗令牌、不排队等待会话锁。令牌桶以 GCRA 的形式保存：
+        每个桶只记录一个浮点数（令牌回满的时刻 tat），回满的桶与从未使用的桶等价，
+        定期清理，因此内存只与最近活跃的玩家与会话数成正比。
+
+        Args:
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），读取其中 throttle 分组：
+                - enabled: 是否启用限流（默认 True）
+                - user_rate / user_burst: 玩家令牌桶每秒恢复的令牌数与容量（默认 0.5 / 8）
+                - session_rate / session_burst: 会话令牌桶每秒恢复的令牌数与容量（默认 2 / 20）
+                - costs: 各命令消耗的令牌数，未列出的命令消耗 1，0 表示不限流（默认战斗、施法、寻路 2，叙事 3）
+                - batch_moves: 是否合并同一玩家排队中的移动命令（默认 False）
+        """
+        self.configure(resolve_settings(config))
+        # 发送者ID / 会话ID -> 令牌回满的时刻（time.monotonic）
+        self.users = {}
+        self.sessions = {}
+        # 已收到限流提示、尚未再次放行的玩家
+        self.warned = set()
+        # (会话ID, 发送者ID) -> 排队中待合并执行的移动方向
+        self.moves = {}
+        self.admitted = 0
+        self.rejected = 0
+        self.batched = 0
+        self._last_sweep = time.monotonic()
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照；已有的令牌桶状态保留"""
+        settings = settings.throttle
+        self.enabled = settings.enabled
+        # 每个令牌的恢复间隔与桶容量对应的时长（秒）
+        self.user_interval = 1.0 / settings.user_rate
+        self.user_window = self.user_interval * settings.user_burst
+        self.session_interval = 1.0 / settings.session_rate
+        self.session_window = self.session_interval * settings.session_burst
+        self.costs = settings.costs
+        self.batch_moves = settings.batch_moves
+
+    def admit(self, session_id: str, sender_id: str, command: str, now: float = None) -> float:
+        """
+        为一条命令扣除令牌。
+
+        Args:
+            session_id (str): 会话ID。
+            sender_id (str): 发送者ID。
+            command (str): 命令名，决定消耗的令牌数。
+            now (float, optional): 当前时刻（time.monotonic），默认读取时钟。
+
+        Returns:
+            float: 0 表示放行；否则为需要等待的秒数，命令被拒绝且不消耗令牌。
+        """
+        cost = self.costs.get(command, 1)
+        if not self.enabled or cost <= 0:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep(now)
+        user_tat = max(self.users.get(sender_id, now), now) + cost * self.user_interval
+        session_tat = max(self.sessions.get(session_id, now), now) + cost * self.session_interval
+        retry = max(user_tat - self.user_window, session_tat - self.session_window) - now
+        if retry > 0:
+            self.rejected += 1
+            return retry
+        self.users[sender_id] = user_tat
+        self.sessions[session_id] = session_tat
+        self.warned.discard(sender_id)
+        self.admitted += 1
+        return 0.0
+
+    def sweep(self, now: float = None) -> None:
+        """清理已回满的令牌桶。"""
+        if now is None:
+            now = time.monotonic()
+        self._last_sweep = now
+        for buckets in (self.users, self.sessions):
+            for key in [key for key, tat in buckets.items() if tat <= now]:
+                del buckets[key]
+        self.warned.intersection_update(self.users)
+
+    def should_warn(self, sender_id: str) -> bool:
+        """玩家被限流时是否回复提示：连续被限流时只有第一次回复，避免提示本身刷屏。"""
+        if sender_id in self.warned:
+            return False
+        self.warned.add(sender_id)
+        return True
+
+    def queue_move(self, session_id: str, sender_id: str, direction: str):
+        """
+        登记一条移动命令。启用 batch_moves 且该玩家已有排队中（尚未取得会话锁）的移动时，
+        方向并入该批次，由先到的命令统一执行与回复。
+
+        Returns:
+            list | None: 调用方负责执行的批次（移动方向列表）；None 表示已并入排队中的批次。
+        """
+        if not self.batch_moves:
+            return [direction]
+        key = (session_id, sender_id)
+        batch = self.moves.get(key)
+        if batch is not None:
+            batch.append(direction)
+            self.batched += 1
+            return None
+        batch = self.moves[key] = [direction]
+        return batch
+
+    def take_moves(self, session_id: str, sender_id: str, batch: list) -> list:
+        """
+        撤下 queue_move 返回的批次并返回它：取得会话锁后调用，之后到达的移动开始新的批次。
+        可重复调用，批次已被撤下时不影响该玩家之后的批次。
+        """
+        key = (session_id, sender_id)
+        if self.moves.get(key) is batch:
+            del self.moves[key]
+        return batch
+
+    def stats(self) -> dict:
+        """
+        返回限流统计。
+
+        Returns:
+            dict: admitted（放行次数）、rejected（拒绝次数）、batched（并入批次的移动数）、
+                active_users、active_sessions（未回满的令牌桶数）。
+        """
+        return {
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "batched": self.batched,
+            "active_users": len(self.users),
+            "active_sessions": len(self.sessions)
+        }
+
+def throttled(command: str):
+    """
+    /rpg 命令处理器的限流装饰器：在处理器运行前经由所属插件的 throttle（ThrottleManager）扣除令牌，
+    被拒绝时回复等待时间（连续被拒绝时不再回复）而不执行处理器。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, event, *args, **kwargs):
+            sender_id = event.get_sender_id()
+            retry = self.throttle.admit(event.session_id, sender_id, command)
+            if retry:
+                if self.throttle.should_warn(sender_id):
+                    yield event.plain_result(THROTTLED_MESSAGE.format(retry=math.ceil(retry)))
+                return
+            async for result in func(self, event, *args, **kwargs):
+                yield result
+        return wrapper
+    return decorator
+
+if __name__ == "__main__":
+    # 简单测试：突发量用完后被拒绝，等待恢复后放行；会话令牌桶限制整个群的总速率
+    manager = ThrottleManager({"throttle": {"user_rate": 1, "user_burst": 3, "session_rate": 2, "session_burst": 4}})
+    print("玩家 A 连续战斗：", [manager.admit("group", "A", "battle", now=0.0) for _ in range(3)])
+    print("1 秒后移动：", manager.admit("group", "A", "move", now=1.0))
+    print("玩家 B 移动（会话令牌桶）：", [round(manager.admit("group", "B", "move", now=1.0), 2) for _ in range(4)])
+    manager.batch_moves = True
+    leader = manager.queue_move("group", "A", "north")
+    print("并入批次：", manager.queue_move("group", "A", "east") is None, leader)
+    # 批次的所有者未取得会话锁就退出：撤下批次后，之后的移动开始新的批次
+    manager.take_moves("group", "A", leader)
+    print("撤下后新批次：", manager.queue_move("group", "A", "south"), manager.moves)
+    manager.sweep(now=100.0)
+    print("清理后：", manager.stats())
@@ -0,0 +1,254 @@
+"""
+离线平衡性扫描：对配置参数网格（经验增长系数、武器伤害范围、武器/符文升级系数、掉落概率）做批量战斗模拟，
+用 ProcessPoolExecutor 把各参数点的模拟批次分发到全部 CPU 核心，汇总升级耗时、每小时金币收入与各等级胜率。
+
+每个模拟角色使用由 (种子, 参数点, 角色序号) 派生的独立随机数流，结果与进程数、批次划分无关，可复现。
+模拟模型：角色连续战斗，每场战斗按 --battle-seconds 计时；战斗后回满 HP，按配置掉落结算金币，
+掉落的符文升级一次后附到武器上（最多 MAX_RUNES 个），每次升级为武器升级一次。
+
+输出两份表：汇总表（每个参数点一行）与分等级胜率表（文件名追加 _by_level）。
+输出文件以 .parquet 结尾且安装了 pyarrow 时写 Parquet，否则写 CSV。
+
+用法：
+    python tools/balance.py [--exp-growth-factor 1.1 1.2 1.3] [--damage-range 2-8 4-10]
+                            [--upgrade-factor 1.1] [--rune-upgrade-factor 1.2]
+                            [--drop-rates '{"gold": 0.5, "weapon": 0.2}']
+                            [--runs 50] [--battles 200] [--batch 10] [--workers N]
+                            [--seed 1] [--battle-seconds 60] [--output balance.csv]
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# 与基准脚本共用 benchmarks/_bootstrap.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from _bootstrap import plugin_module
+
+settings_module = plugin_module("settings")
+character = plugin_module("character")
+combat = plugin_module("combat")
+commands = plugin_module("commands")
+loot = plugin_module("loot")
+rune = plugin_module("rune")
+weapon = plugin_module("weapon")
+prototype = plugin_module("prototype")
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet 输出为可选功能
+    pyarrow = None
+
+# 记录到达这些等级所需的模拟时长
+LEVEL_MILESTONES = (5, 10, 20)
+
+# 武器上最多附加的符文数
+MAX_RUNES = 3
+
+# 汇总表的参数列
+PARAM_COLUMNS = ("exp_growth_factor", "damage_range", "upgrade_factor", "rune_upgrade_factor", "drop_rates")
+
+def build_config(params: dict) -> dict:
+    """将一个参数点转换为插件配置（嵌套分组写法）。"""
+    config = {"exp_growth_factor": params["exp_growth_factor"],
+              "weapon": {"damage_range": list(params["damage_range"]), "upgrade_factor": params["upgrade_factor"]},
+              "rune": {"rune_upgrade_factor": params["rune_upgrade_factor"]}}
+    if params["drop_rates"] is not None:
+        config["loot"] = {"drop_rates": params["drop_rates"]}
+    return config
+
+def simulate_batch(task: tuple) -> tuple:
+    """
+    工作进程入口：在一个参数点上模拟一批角色。
+
+    Args:
+        task (tuple): (参数点序号, 参数, 角色序号范围起点, 角色数, 每个角色的战斗场数, 种子)。
+
+    Returns:
+        tuple: (参数点序号, 可累加的统计字典)。
+    """
+    point, params, first_run, runs, battles, seed = task
+    settings = settings_module.compile_settings(build_config(params))
+    character_manager = character.CharacterManager(settings)
+    combat_manager = combat.CombatManager(settings, {}, character_manager, None)
+    command_manager = commands.CommandManager(settings, character_manager, None, combat_manager)
+    loot_manager = loot.LootManager(settings)
+    rune_manager = rune.RuneManager(settings)
+    weapon_manager = weapon.WeaponManager(settings)
+    gold_item = prototype.PROTOTYPES.resolve("item", "gold")
+    rune_drop = prototype.PROTOTYPES.resolve("drop_rune")
+
+    stats = {"runs": 0, "battles": 0, "wins": 0, "gold": 0, "final_levels": 0,
+             "by_level": {}, "milestones": {level: [] for level in LEVEL_MILESTONES}}
+    for run in range(first_run, first_run + runs):
+        rng = random.Random(f"{seed}:{point}:{run}")
+        session = {"characters": {}}
+        char = command_manager.create_character(session, "sim", rng, "模拟角色")
+        reached = set()
+        for battle in range(1, battles + 1):
+            level = char["level"]
+            bucket = stats["by_level"].setdefault(level, [0, 0])
+            bucket[0] += 1
+            combat_manager.start_battle(session, "sim", rng=rng)
+            # 战斗奖励的武器不参与模拟，避免库存无限增长
+            char["inventory"].clear()
+            won = char["hp"] > 0
+            char["hp"] = char["max_hp"]
+            char["mp"] = char["max_mp"]
+            if won:
+                bucket[1] += 1
+                stats["wins"] += 1
+                for item in loot_manager.generate_loot(level, rng=rng):
+                    proto = item.get("proto")
+                    if proto == gold_item:
+                        stats["gold"] += item["value"]
+                    elif proto == rune_drop and len(char["weapon"].get("extra_effects", ())) < MAX_RUNES:
+                        new_rune = rune_manager.upgrade_rune(rune_manager.generate_rune(rng=rng), 1)
+                        weapon_manager.apply_rune(char["weapon"], new_rune)
+            if char["level"] > level:
+                weapon_manager.upgrade_weapon(char["weapon"], char["level"] - level)
+                for milestone in LEVEL_MILESTONES:
+                    if char["level"] >= milestone and milestone not in reached:
+                        reached.add(milestone)
+                        stats["milestones"][milestone].append(battle)
+        stats["runs"] += 1
+        stats["battles"] += battles
+        stats["final_levels"] += char["level"]
+    return point, stats
+
+def merge(total: dict, part: dict) -> dict:
+    """合并两个批次的统计。"""
+    if not total:
+        return part
+    for key in ("runs", "battles", "wins", "gold", "final_levels"):
+        total[key] += part[key]
+    for level, (battles, wins) in part["by_level"].items():
+        bucket = total["by_level"].setdefault(level, [0, 0])
+        bucket[0] += battles
+        bucket[1] += wins
+    for milestone, battles in part["milestones"].items():
+        total["milestones"][milestone].extend(battles)
+    return total
+
+def summarize(point: int, params: dict, stats: dict, battle_seconds: float) -> tuple:
+    """把一个参数点的统计转换为汇总行与分等级胜率行。"""
+    hours = stats["battles"] * battle_seconds / 3600
+    row = {"point": point}
+    for column in PARAM_COLUMNS:
+        value = params[column]
+        row[column] = json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, tuple)) else value
+    row.update({
+        "runs": stats["runs"],
+        "battles": stats["battles"],
+        "win_rate": round(stats["wins"] / stats["battles"], 4) if stats["battles"] else 0,
+        "gold_per_hour": round(stats["gold"] / hours, 2) if hours else 0,
+        "mean_final_level": round(stats["final_levels"] / stats["runs"], 2) if stats["runs"] else 0,
+    })
+    for milestone in LEVEL_MILESTONES:
+        battles = stats["milestones"][milestone]
+        # 只统计到达该等级的角色；reached_level_N 为到达比例
+        row[f"hours_to_level_{milestone}"] = round(sum(battles) / len(battles) * battle_seconds / 3600, 3) if battles else ""
+        row[f"reached_level_{milestone}"] = round(len(battles) / stats["runs"], 4) if stats["runs"] else 0
+    level_rows = [{"point": point, "level": level, "battles": battles, "wins": wins,
+                   "win_rate": round(wins / battles, 4)}
+                  for level, (battles, wins) in sorted(stats["by_level"].items())]
+    return row, level_rows
+
+def write_table(path: str, rows: list) -> str:
+    """写出表格：.parquet 且安装了 pyarrow 时写 Parquet，否则写 CSV。返回实际写入的路径。"""
+    if not rows:
+        return path
+    stem, ext = os.path.splitext(path)
+    if ext == ".parquet":
+        if pyarrow is not None:
+            columns = {key: [row[key] for row in rows] for key in rows[0]}
+            pyarrow.parquet.write_table(pyarrow.table(columns), path)
+            return path
+        print("未安装 pyarrow，改为输出 CSV")
+        path = stem + ".csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+def parse_range(text: str) -> tuple:
+    low, high = text.split("-")
+    return int(low), int(high)
+
+def positive_int(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"必须为正整数：{text}")
+    return value
+
+def positive_float(text: str) -> float:
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"必须为正数：{text}")
+    return value
+
+def build_grid(args) -> list:
+    """参数网格的笛卡尔积；未指定的参数取 _conf_schema.json 的默认值。"""
+    defaults = settings_module.load_schema()
+    weapon_defaults = defaults["weapon"]["default"]
+    grid = {
+        "exp_growth_factor": args.exp_growth_factor or [defaults["exp_growth_factor"]["default"]],
+        "damage_range": args.damage_range or [tuple(weapon_defaults["damage_range"])],
+        "upgrade_factor": args.upgrade_factor or [weapon_defaults["upgrade_factor"]],
+        "rune_upgrade_factor": args.rune_upgrade_factor or [defaults["rune"]["default"]["rune_upgrade_factor"]],
+        "drop_rates": [json.loads(text) for text in args.drop_rates] if args.drop_rates else [None],
+    }
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+def main():
+    parser = argparse.ArgumentParser(description="离线平衡性参数扫描")
+    parser.add_argument("--exp-growth-factor", type=float, nargs="+")
+    parser.add_argument("--damage-range", type=parse_range, nargs="+", help="形如 2-8")
+    parser.add_argument("--upgrade-factor", type=float, nargs="+")
+    parser.add_argument("--rune-upgrade-factor", type=float, nargs="+")
+    parser.add_argument("--drop-rates", nargs="+", help='JSON，例如 \'{"gold": 0.5, "weapon": 0.2}\'')
+    parser.add_argument("--runs", type=positive_int, default=50, help="每个参数点模拟的角色数")
+    parser.add_argument("--battles", type=positive_int, default=200, help="每个角色的战斗场数")
+    parser.add_argument("--batch", type=positive_int, default=10, help="每个任务模拟的角色数")
+    parser.add_argument("--workers", type=positive_int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--battle-seconds", type=positive_float, default=60, help="每场战斗折算的游戏时长（秒）")
+    parser.add_argument("--output", default="balance.csv")
+    args = parser.parse_args()
+
+    grid = build_grid(args)
+    tasks = [(point, params, first, min(args.batch, args.runs - first), args.battles, args.seed)
+             for point, params in enumerate(grid)
+             for first in range(0, args.runs, args.batch)]
+    print(f"{len(grid)} 个参数点 × {args.runs} 个角色 × {args.battles} 场战斗，{len(tasks)} 个任务，{args.workers} 个进程")
+    start = time.perf_counter()
+    totals = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for point, stats in pool.map(simulate_batch, tasks):
+            totals[point] = merge(totals.get(point), stats)
+    elapsed = time.perf_counter() - start
+
+    summary, by_level = [], []
+    for point, params in enumerate(grid):
+        row, level_rows = summarize(point, params, totals[point], args.battle_seconds)
+        summary.append(row)
+        by_level.extend(level_rows)
+    stem, ext = os.path.splitext(args.output)
+    summary_path = write_table(args.output, summary)
+    level_path = write_table(f"{stem}_by_level{ext}", by_level)
+    total_battles = sum(stats["battles"] for stats in totals.values())
+    print(f"模拟 {total_battles:,} 场战斗，耗时 {elapsed:.1f} 秒（{total_battles / elapsed:,.0f} 场/秒）")
+    print(f"汇总表：{summary_path}\n分等级胜率：{level_path}")
+    for row in summary:
+        print(f"  参数点 {row['point']}: 胜率 {row['win_rate']:.1%}，每小时金币 {row['gold_per_hour']}，"
+              f"平均最终等级 {row['mean_final_level']}，到达 5 级 {row['hours_to_level_5'] or '-'} 小时")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+将 JSON 存档（game_data.json）导入 SQLite 存档引擎的数据库。
+
+导入后在插件配置中设置 storage.engine = "sqlite"（sqlite_file 与 --db 一致）即可切换引擎；
+原 JSON 文件不会被修改。目标数据库已有会话时需指定 --replace，数据库内容将与 JSON 存档完全一致
+（JSON 中不存在的会话会被删除）。
+
+用法：
+    python tools/migrate_json_to_sqlite.py [--json game_data.json] [--db game_data.db] [--replace] [--no-verify]
+"""
+import argparse
+import os
+import sys
+import time
+
+# 与基准脚本共用 benchmarks/_bootstrap.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from _bootstrap import plugin_module
+
+storage = plugin_module("storage")
+sqlite_storage = plugin_module("sqlite_storage")
+
+def main():
+    parser = argparse.ArgumentParser(description="将 JSON 存档导入 SQLite 数据库")
+    parser.add_argument("--json", default=storage.DATA_FILE, help="JSON 存档路径")
+    parser.add_argument("--db", default=sqlite_storage.SQLITE_FILE, help="SQLite 数据库路径")
+    parser.add_argument("--replace", action="store_true", help="目标数据库已有会话时覆盖")
+    parser.add_argument("--no-verify", action="store_true", help="导入后不重新读取校验")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.json):
+        sys.exit(f"找不到 JSON 存档：{args.json}")
+    start = time.perf_counter()
+    sessions = storage.load_game_data(args.json)
+    if not sessions and os.path.getsize(args.json) > 2:
+        sys.exit(f"无法解析 JSON 存档：{args.json}")
+    print(f"读取 {len(sessions)} 个会话，耗时 {time.perf_counter() - start:.2f} 秒")
+
+    engine = sqlite_storage.SQLiteStorage(args.db)
+    existing = engine.load()
+    if existing and not args.replace:
+        sys.exit(f"数据库 {args.db} 中已有 {len(existing)} 个会话，如需覆盖请指定 --replace")
+    start = time.perf_counter()
+    engine.save(sessions)
+    engine.close()
+    print(f"写入 {args.db}：{engine.statements} 条批量语句，耗时 {time.perf_counter() - start:.2f} 秒")
+
+    if not args.no_verify:
+        loaded = sqlite_storage.SQLiteStorage(args.db).load()
+        # 按存档编码比较：共享世界会话只比较已探索坐标与覆盖层，不读取共享世界
+        mismatched = [session_id for session_id in sessions if session_id not in loaded or
+                      storage.encode_session(loaded[session_id]) != storage.encode_session(sessions[session_id])]
+        if mismatched or len(loaded) != len(sessions):
+            sys.exit(f"校验失败：{len(mismatched)} 个会话与 JSON 存档不一致，例如 {mismatched[:5]}")
+        print(f"校验通过：{len(loaded)} 个会话与 JSON 存档一致")
+    print(f"请在插件配置中设置 storage.engine = \"sqlite\"，storage.sqlite_file = \"{args.db}\"")
+
+if __name__ == "__main__":
+    main()
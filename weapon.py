@@ -1,12 +1,20 @@
 import random
+from .prototype import PROTOTYPES
+from .settings import resolve_settings
+
+def _weapon_prototype(adjective: str, weapon_type: str) -> tuple:
+    """随机生成武器的原型：名称由形容词与武器类型拼接而成。"""
+    return f"{adjective}{weapon_type}", "伤害 {damage}", None
+
+PROTOTYPES.register_builder("weapon", _weapon_prototype)
 
 class WeaponManager:
-    def __init__(self, config: dict):
+    def __init__(self, config):
         """
         初始化武器管理器。
 
         Args:
-            config (dict): 配置字典，包含默认武器生成参数、升级参数等。
+            config (GameSettings | dict): 编译后的配置快照，或原始配置字典（将先被编译），使用其中的武器分组，
                       例如：
                         - "weapon_types": ["剑", "斧", "锤", "弓", "匕首"]
                         - "weapon_adjectives": ["锋利的", "重型的", "轻盈的", "破旧的", "神秘的"]
@@ -14,38 +22,44 @@ class WeaponManager:
                         - "upgrade_factor": 1.1  (每次升级伤害提升系数)
                         - "max_upgrade_level": 10
         """
-        self.config = config
-        self.weapon_types = config.get("weapon_types", ["剑", "斧", "锤", "弓", "匕首"])
-        self.weapon_adjectives = config.get("weapon_adjectives", ["锋利的", "重型的", "轻盈的", "破旧的", "神秘的"])
-        self.damage_range = config.get("damage_range", [2, 8])
-        self.upgrade_factor = config.get("upgrade_factor", 1.1)
-        self.max_upgrade_level = config.get("max_upgrade_level", 10)
-
-    def generate_weapon(self) -> dict:
+        self.configure(resolve_settings(config))
+
+    def configure(self, settings):
+        """应用（热重载）编译后的配置快照"""
+        self.settings = settings.weapon
+        self.weapon_types = self.settings.weapon_types
+        self.weapon_adjectives = self.settings.weapon_adjectives
+        self.damage_range = self.settings.damage_range
+        self.upgrade_factor = self.settings.upgrade_factor
+        self.max_upgrade_level = self.settings.max_upgrade_level
+
+    def generate_weapon(self, rng=None) -> dict:
         """
         随机生成一把武器。
 
-        返回一个武器数据字典，包含以下字段：
-            - name: 武器名称，由随机形容词与武器类型拼接而成
+        Args:
+            rng (random.Random, optional): 随机数流（通常为会话的 SessionRNG），默认使用全局 random 模块。
+
+        返回一个紧凑的武器实例字典（名称与描述由原型注册表惰性渲染），包含以下字段：
+            - proto: 原型ID，对应 "随机形容词 + 武器类型" 的名称模板和 "伤害 X" 的描述模板
             - damage: 武器基础伤害，在配置的 damage_range 内随机生成
-            - description: 描述字符串，例如 "伤害 X"
             - level: 武器初始等级，默认为 1
             - exp: 武器经验，初始为 0
             - upgrade_level: 当前升级次数，初始为 0
             - extra_effects: 可扩展字段，用于存储符文或其他附加效果（初始为空列表）
         """
-        weapon_type = random.choice(self.weapon_types)
-        adjective = random.choice(self.weapon_adjectives)
-        damage = random.randint(self.damage_range[0], self.damage_range[1])
-        weapon = {
-            "name": f"{adjective}{weapon_type}",
-            "damage": damage,
-            "description": f"伤害 {damage}",
-            "level": 1,
-            "exp": 0,
-            "upgrade_level": 0,
-            "extra_effects": []  # 例如符文附加效果
-        }
+        rng = rng or random
+        weapon_type = rng.choice(self.weapon_types)
+        adjective = rng.choice(self.weapon_adjectives)
+        damage = rng.randint(self.damage_range[0], self.damage_range[1])
+        weapon = PROTOTYPES.create(
+            PROTOTYPES.resolve("weapon", adjective, weapon_type),
+            damage=damage,
+            level=1,
+            exp=0,
+            upgrade_level=0,
+            extra_effects=[]  # 例如符文附加效果
+        )
         return weapon
 
     def upgrade_weapon(self, weapon: dict, upgrade_points: int) -> dict:
@@ -72,9 +86,10 @@ class WeaponManager:
         # 升级计算：武器伤害乘以 upgrade_factor^upgrade_times
         new_damage = int(weapon["damage"] * (self.upgrade_factor ** upgrade_times))
         weapon["damage"] = new_damage
-        weapon["description"] = f"伤害 {new_damage}"
+        if "proto" not in weapon:
+            weapon["description"] = f"伤害 {new_damage}"
         weapon["upgrade_level"] = current_level + upgrade_times
-        weapon["level"] += upgrade_times  # 简单地将武器等级与升级次数挂钩
+        weapon["level"] = weapon.get("level", 0) + upgrade_times  # 简单地将武器等级与升级次数挂钩
         return weapon
 
     def apply_rune(self, weapon: dict, rune: dict) -> dict:
@@ -98,7 +113,9 @@ class WeaponManager:
         # 示例：将符文 bonus 加到武器伤害上
         bonus = rune.get("bonus", 0)
         weapon["damage"] += bonus
-        weapon["description"] = f"伤害 {weapon['damage']}, 附加 {rune.get('name')}"
+        # 紧凑实例的描述由原型惰性渲染（自动注明附加的符文），旧格式字典仍直接改写描述
+        if "proto" not in weapon:
+            weapon["description"] = f"伤害 {weapon['damage']}, 附加 {PROTOTYPES.name(rune)}"
         return weapon
 
 if __name__ == "__main__":
@@ -113,7 +130,7 @@ if __name__ == "__main__":
     wm = WeaponManager(config)
     weapon = wm.generate_weapon()
     print("生成武器：")
-    print(weapon)
+    print(weapon, PROTOTYPES.name(weapon))
     # 模拟升级
     upgraded_weapon = wm.upgrade_weapon(weapon, upgrade_points=3)
     print("升级后武器：")
@@ -122,4 +139,4 @@ if __name__ == "__main__":
     rune = {"name": "火焰符文", "effect": "fire_bonus", "bonus": 4}
     weapon_with_rune = wm.apply_rune(upgraded_weapon, rune)
     print("附加符文后的武器：")
-    print(weapon_with_rune)
+    print(PROTOTYPES.expand(weapon_with_rune))